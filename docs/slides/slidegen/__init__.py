@@ -0,0 +1,27 @@
+"""
+omakase.ai slide generation engine
+
+Decks are data (slidegen.decks), model access goes through pluggable
+backends (slidegen.backends) and SlideEngine generates any number of decks
+in one process with a shared client, cache and concurrency limit.
+"""
+
+from .backends import Backend, GenaiBackend, LegacyBackend, create_backend, register_backend
+from .cache import ResponseCache
+from .deck import Deck, Slide
+from .decks import DECKS, get_deck
+from .engine import SlideEngine
+
+__all__ = [
+    "Backend",
+    "DECKS",
+    "Deck",
+    "GenaiBackend",
+    "LegacyBackend",
+    "ResponseCache",
+    "Slide",
+    "SlideEngine",
+    "create_backend",
+    "get_deck",
+    "register_backend",
+]
@@ -0,0 +1,118 @@
+"""
+Pluggable model backends
+
+A backend turns a prompt into an SDK response. ``genai`` uses the
+google-genai client (shared per process, so every deck reuses one connection
+pool); ``legacy`` wraps google.generativeai.GenerativeModel. Other backends
+can be added with register_backend().
+
+The SDKs are imported lazily so decks can be listed without them installed.
+"""
+
+from functools import lru_cache
+
+from .config import api_key
+from .deck import Deck
+from .discovery import ModelResolver
+
+
+class Backend:
+    """Base class: generate() returns an SDK response for a single prompt"""
+
+    model_name = ""
+    # Included in the response cache key
+    config = None
+
+    async def prepare(self) -> None:
+        """Finish blocking set-up (such as model discovery) without stalling the event loop"""
+
+    async def generate(self, prompt: str):
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=None)
+def shared_client(key: str = None):
+    """One google-genai Client per API key for the whole process"""
+    from google import genai
+
+    return genai.Client(api_key=key or api_key())
+
+
+class GenaiBackend(Backend):
+    """google-genai backend; ``model`` is a model name or a ModelResolver"""
+
+    def __init__(self, client, model, config=None):
+        from google.genai import types
+
+        self.client = client
+        self._model = model
+        self.config = config or types.GenerateContentConfig(
+            response_modalities=['IMAGE', 'TEXT'],
+        )
+
+    @property
+    def model_name(self) -> str:
+        if isinstance(self._model, ModelResolver):
+            return self._model.resolve()
+        return self._model
+
+    async def prepare(self) -> None:
+        if isinstance(self._model, ModelResolver):
+            await self._model.resolve_async()
+
+    @classmethod
+    def from_deck(cls, deck: Deck) -> "GenaiBackend":
+        from google.genai import types
+
+        client = shared_client()
+        model = deck.model
+        if deck.model_candidates:
+            # Resolved on first use (or from the discovery cache), not here
+            model = ModelResolver(lambda: client, deck.model_candidates, deck.model)
+        config = types.GenerateContentConfig(**deck.generation_config) if deck.generation_config else None
+        return cls(client, model, config)
+
+    async def generate(self, prompt: str):
+        return await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=[prompt],
+            config=self.config,
+        )
+
+
+class LegacyBackend(Backend):
+    def __init__(self, model_name: str, generation_config: dict = None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key())
+        self.model = genai.GenerativeModel(model_name)
+        self.model_name = self.model.model_name
+        self.config = generation_config
+
+    @classmethod
+    def from_deck(cls, deck: Deck) -> "LegacyBackend":
+        return cls(deck.model, deck.generation_config)
+
+    async def generate(self, prompt: str):
+        if self.config is None:
+            return await self.model.generate_content_async(prompt)
+        return await self.model.generate_content_async(prompt, generation_config=self.config)
+
+
+BACKENDS = {
+    "genai": GenaiBackend.from_deck,
+    "legacy": LegacyBackend.from_deck,
+}
+
+
+def register_backend(name: str, factory) -> None:
+    """Register a callable taking a Deck and returning a Backend"""
+    BACKENDS[name] = factory
+
+
+def create_backend(deck: Deck) -> Backend:
+    try:
+        factory = BACKENDS[deck.backend]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{deck.backend}' for deck '{deck.name}'") from None
+    return factory(deck)
@@ -0,0 +1,234 @@
+"""
+Offline pipeline benchmark against a simulated image model
+
+    python -m slidegen.bench                          # every profile
+    python -m slidegen.bench --profile bursts --slides 48 --size-kb 4096
+
+SimulatedBackend stands in for the model: it answers after a log-normal
+latency with a noise PNG of the configured size, fails a fraction of
+requests with 500, rejects requests beyond a server-side concurrency
+``capacity`` with 429 and, with ``burst_every``, answers everything with 429
+plus Retry-After during periodic bursts. The real SlideEngine (AIMD
+scheduler, retries, streaming writes, manifest) drives it against a synthetic
+deck in a temporary directory, without the response cache.
+
+Each profile runs in a fresh interpreter; wall time, throughput, peak RSS
+(VmHWM) and CPU time (user + system) are reported for the whole run.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from types import SimpleNamespace
+
+from .backends import Backend
+from .deck import Deck, Slide
+from .engine import SlideEngine
+from .iobench import _rss_kb
+from .retry import RetryPolicy
+from .scheduler import AIMDScheduler
+from .synthetic import synthetic_png
+
+
+@dataclass
+class SimulationConfig:
+    slides: int = 24
+    size_kb: int = 1024
+    # Log-normal latency: median and shape (0 = fixed latency)
+    latency_ms: float = 200.0
+    sigma: float = 0.3
+    # Fraction of requests failing with a retryable 500
+    error_rate: float = 0.0
+    # Requests beyond this many in flight get 429 (0 = unlimited)
+    capacity: int = 0
+    # Every `burst_every` seconds, all requests get 429 for `burst_seconds`
+    burst_every: float = 0.0
+    burst_seconds: float = 0.0
+    retry_after: float = 0.2
+    initial_concurrency: float = 2
+    max_concurrency: float = 16
+    max_attempts: int = 8
+    base_delay: float = 0.05
+    seed: int = 0
+
+
+PROFILES = {
+    "baseline": {},
+    "large-images": {"size_kb": 8192},
+    "slow-tail": {"latency_ms": 400.0, "sigma": 1.0},
+    "flaky": {"error_rate": 0.2},
+    "throttled": {"capacity": 4},
+    "bursts": {"burst_every": 1.0, "burst_seconds": 0.3},
+}
+
+
+class SimulatedError(Exception):
+    """Shaped like an SDK APIError: an HTTP ``code`` and response headers"""
+
+    def __init__(self, code: int, message: str, retry_after: float = None):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        headers = {"retry-after": f"{retry_after:g}"} if retry_after else {}
+        self.response = SimpleNamespace(status_code=code, headers=headers)
+
+
+class SimulatedBackend(Backend):
+    model_name = "simulated"
+
+    def __init__(self, config: SimulationConfig):
+        self.sim = config
+        self.rng = random.Random(config.seed)
+        self.png = synthetic_png(config.size_kb * 1024, seed=config.seed)
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def _latency(self) -> float:
+        median = self.sim.latency_ms / 1000
+        if not self.sim.sigma:
+            return median
+        return median * math.exp(self.rng.gauss(0, self.sim.sigma))
+
+    def _in_burst(self) -> bool:
+        if not self.sim.burst_every:
+            return False
+        return (time.monotonic() - self.started) % self.sim.burst_every < self.sim.burst_seconds
+
+    def _response(self, prompt: str):
+        # A fresh copy per response, as the SDK allocates one per decoded payload
+        image = SimpleNamespace(inline_data=SimpleNamespace(data=bytes(bytearray(self.png)), mime_type="image/png"),
+                                text=None)
+        text = SimpleNamespace(inline_data=None, text=f"simulated image for a {len(prompt)}-char prompt")
+        usage = SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=1290,
+                                total_token_count=len(prompt) // 4 + 1290)
+        return SimpleNamespace(parts=[image, text], candidates=[], prompt_feedback=None, usage_metadata=usage)
+
+    async def generate(self, prompt: str):
+        self.calls += 1
+        if self._in_burst() or (self.sim.capacity and self.in_flight >= self.sim.capacity):
+            self.rejected += 1
+            await asyncio.sleep(0.005)
+            raise SimulatedError(429, "RESOURCE_EXHAUSTED", self.sim.retry_after)
+
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self._latency())
+            if self.rng.random() < self.sim.error_rate:
+                self.errors += 1
+                raise SimulatedError(500, "INTERNAL")
+            return self._response(prompt)
+        finally:
+            self.in_flight -= 1
+
+
+def simulated_deck(config: SimulationConfig, output_dir: Path) -> Deck:
+    slides = [Slide(f"{i:02d}_bench", f"Bench {i}", f"Benchmark slide {i}\n" * 20) for i in range(1, config.slides + 1)]
+    return Deck(name="bench", title="Simulated deck", style_prefix="STYLE\n", slides=slides,
+                output_dir=output_dir, backend="simulated", model="simulated")
+
+
+def run_simulation(config: SimulationConfig) -> dict:
+    """Generate one simulated deck in this process and measure it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SimulatedBackend(config)
+        engine = SlideEngine(
+            scheduler=AIMDScheduler(initial=config.initial_concurrency, maximum=config.max_concurrency),
+            retry=RetryPolicy(max_attempts=config.max_attempts, base_delay=config.base_delay,
+                              max_delay=config.retry_after * 10),
+            backend_factory=lambda deck: backend,
+            manifest_dir=Path(tmp) / "manifests",
+        )
+        deck = simulated_deck(config, Path(tmp) / "out")
+
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = engine.generate([deck])[deck.name]
+        wall = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        written = sum(path.stat().st_size for path in deck.output_dir.glob("*.png"))
+
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return {
+        "wall_s": wall,
+        "slides_ok": sum(results),
+        "slides_failed": len(results) - sum(results),
+        "throughput": sum(results) / wall if wall else 0.0,
+        "mb_per_s": written / wall / 1024 / 1024 if wall else 0.0,
+        "cpu_s": cpu,
+        "cpu_pct": cpu / wall * 100 if wall else 0.0,
+        "peak_rss_mb": _rss_kb("VmHWM") / 1024,
+        "calls": backend.calls,
+        "rejected_429": backend.rejected,
+        "errors_500": backend.errors,
+        "final_window": engine.scheduler.window,
+    }
+
+
+def measure(name: str, config: SimulationConfig) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-m", "slidegen.bench", "--worker", json.dumps(asdict(config))],
+        capture_output=True, text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    if proc.returncode != 0:
+        return {"profile": name, "error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return {"profile": name, **asdict(config), **json.loads(proc.stdout)}
+
+
+def report(results: list) -> None:
+    print(f"{'profile':<13} {'wall s':>7} {'slides/s':>9} {'MB/s':>7} {'CPU s':>6} {'CPU%':>5} "
+          f"{'peak MB':>8} {'ok/fail':>8} {'calls':>6} {'429':>5} {'500':>5} {'window':>7}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['profile']:<13} failed: {r['error']}")
+            continue
+        print(f"{r['profile']:<13} {r['wall_s']:>7.2f} {r['throughput']:>9.2f} {r['mb_per_s']:>7.1f} "
+              f"{r['cpu_s']:>6.2f} {r['cpu_pct']:>5.0f} {r['peak_rss_mb']:>8.1f} "
+              f"{r['slides_ok']:>4}/{r['slides_failed']:<3} {r['calls']:>6} {r['rejected_429']:>5} "
+              f"{r['errors_500']:>5} {r['final_window']:>7.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="slidegen.bench", description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", action="append", choices=PROFILES, default=[],
+                        help="repeatable; default: every profile")
+    for name, default in asdict(SimulationConfig()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=None,
+                            help=f"override the profile value (default {default})")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_simulation(SimulationConfig(**json.loads(args.worker)))))
+        return 0
+
+    overrides = {name: value for name in asdict(SimulationConfig())
+                 if (value := getattr(args, name)) is not None}
+    results = []
+    for name in args.profile or PROFILES:
+        config = replace(SimulationConfig(**PROFILES[name]), **overrides)
+        results.append(measure(name, config))
+    report(results)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Request/token/cost budget with a persisted deferral queue
+
+Preflight: plan() estimates requests, input tokens and cost for a set of
+decks from their style prefix and slide prompts (before anything is sent).
+
+Live: a BudgetTracker is consulted before every request and charged with
+each response's usage metadata. Every request reserves its estimated tokens
+and cost before it is sent, and the check counts reservations still in
+flight, so concurrent requests and best-of-N candidates cannot pass it
+together and overshoot a limit; charge() replaces the estimate with the
+actual usage, release() drops it (and gives the request back if it was never
+sent, e.g. a best-of or hedge attempt cancelled while queued). Usage is persisted in .cache/budget.json per
+quota window (a calendar day in the API's quota timezone), so separate runs
+on the same day share it. Once a limit is reached no new request is sent:
+slides that have not started are appended to the deferred queue in the same
+file and can be run in the next window with ``--run-deferred``. Every update
+re-reads the file under an exclusive lock, so concurrent processes (e.g.
+--worker) share the budget without losing each other's usage.
+"""
+
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from .config import CACHE_DIR
+from .deck import Deck
+from .output import atomic_write, locked
+
+DEFAULT_BUDGET_PATH = CACHE_DIR / "budget.json"
+# Daily quotas of the Gemini API reset at midnight Pacific time
+QUOTA_TIMEZONE = "America/Los_Angeles"
+# Output tokens billed per generated 1K/2K image
+IMAGE_OUTPUT_TOKENS = 1290
+# Reservations of a crashed process stop counting after this long
+RESERVATION_TTL = 3600.0
+
+# Estimated USD prices: (per generated image, per million input tokens), matched by substring
+PRICES = {
+    "gemini-3-pro-image": (0.134, 2.00),
+    "gemini-2.5-flash-image": (0.039, 0.30),
+    "gemini-2.0-flash": (0.039, 0.10),
+}
+
+
+class BudgetExhausted(Exception):
+    """No budget left in the current quota window (not retryable)"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input token count: ~4 ASCII characters per token, ~1 token per CJK character"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def price(model: str) -> tuple:
+    for name, prices in PRICES.items():
+        if name in model:
+            return prices
+    return 0.0, 0.0
+
+
+def request_cost(model: str, prompt_tokens: int, images: int = 1) -> float:
+    per_image, per_mtok = price(model)
+    return images * per_image + prompt_tokens * per_mtok / 1_000_000
+
+
+def plan(decks: list, attempts_per_slide: float = 1.0) -> list:
+    """Per deck: slides, expected requests, estimated input tokens and cost"""
+    rows = []
+    for deck in decks:
+        tokens = sum(estimate_tokens(deck.full_prompt(slide)) for slide in deck.slides)
+        requests = len(deck.slides) * attempts_per_slide
+        rows.append({
+            "deck": deck.name,
+            "model": deck.model,
+            "slides": len(deck.slides),
+            "requests": requests,
+            "input_tokens": round(tokens * attempts_per_slide),
+            "output_tokens": round(requests * IMAGE_OUTPUT_TOKENS),
+            "cost": request_cost(deck.model, round(tokens * attempts_per_slide), round(requests)),
+        })
+    return rows
+
+
+def quota_window(now: float = None) -> str:
+    try:
+        from zoneinfo import ZoneInfo
+
+        tz = ZoneInfo(QUOTA_TIMEZONE)
+    except Exception:
+        tz = None
+    return datetime.fromtimestamp(time.time() if now is None else now, tz).strftime("%Y-%m-%d")
+
+
+@dataclass
+class Budget:
+    """Limits per quota window; None means unlimited"""
+
+    max_requests: int = None
+    max_tokens: int = None
+    max_cost: float = None
+
+    @property
+    def limited(self) -> bool:
+        return any(limit is not None for limit in (self.max_requests, self.max_tokens, self.max_cost))
+
+
+class BudgetTracker:
+    def __init__(self, budget: Budget, path: Path = DEFAULT_BUDGET_PATH):
+        self.budget = budget
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.stopped = False
+        self.state = self._load()
+
+    def _load(self) -> dict:
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("deferred", [])
+        state.setdefault("reserved", {})
+        if state.get("window") != quota_window():
+            state.update(window=quota_window(), requests=0, prompt_tokens=0, output_tokens=0, cost=0.0, reserved={})
+        return state
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, json.dumps(self.state, indent=2, ensure_ascii=False).encode("utf-8"))
+
+    @contextmanager
+    def transaction(self):
+        """Re-read the state under an exclusive lock and write it back unless the block raises"""
+        with locked(self.lock_path):
+            window = self.state.get("window")
+            self.state = self._load()
+            if self.state["window"] != window:
+                # A new quota window lifts an earlier hard stop
+                self.stopped = False
+            yield self.state
+            self.save()
+
+    def remaining(self) -> dict:
+        """What is left after charged usage and the reservations still in flight"""
+        b, s = self.budget, self.state
+        reserved = s["reserved"].values()
+        tokens = s["prompt_tokens"] + s["output_tokens"] + sum(r["tokens"] for r in reserved)
+        cost = s["cost"] + sum(r["cost"] for r in reserved)
+        return {
+            "requests": None if b.max_requests is None else b.max_requests - s["requests"],
+            "tokens": None if b.max_tokens is None else b.max_tokens - tokens,
+            "cost": None if b.max_cost is None else b.max_cost - cost,
+        }
+
+    def reserve(self, model: str, prompt: str) -> str:
+        """Count one request and reserve its estimated tokens and cost; returns the reservation id
+
+        Raises BudgetExhausted if the request could exceed a limit.
+        """
+        with self.transaction() as state:
+            if self.stopped:
+                raise BudgetExhausted("budget exhausted earlier in this run")
+
+            now = time.time()
+            state["reserved"] = {rid: r for rid, r in state["reserved"].items() if now - r["at"] < RESERVATION_TTL}
+            tokens = estimate_tokens(prompt)
+            cost = request_cost(model, tokens)
+            left = self.remaining()
+            reason = None
+            if left["requests"] is not None and left["requests"] < 1:
+                reason = f"request limit of {self.budget.max_requests} reached"
+            elif left["tokens"] is not None and left["tokens"] < tokens + IMAGE_OUTPUT_TOKENS:
+                reason = f"token limit of {self.budget.max_tokens} reached"
+            elif left["cost"] is not None and left["cost"] < cost:
+                reason = f"cost limit of ${self.budget.max_cost:.2f} reached"
+            if reason:
+                # Hard stop: nothing else is sent in this window, even if a smaller prompt would fit
+                self.stopped = True
+                raise BudgetExhausted(f"{reason} for {state['window']}")
+
+            reservation = uuid.uuid4().hex[:12]
+            state["requests"] += 1
+            state["reserved"][reservation] = {"tokens": tokens + IMAGE_OUTPUT_TOKENS, "cost": cost, "at": now}
+            return reservation
+
+    def release(self, reservation: str, sent: bool = True) -> None:
+        """Drop the estimate of a request that produced no billable answer
+
+        A request that was never ``sent`` (cancelled while waiting for a slot)
+        no longer counts against the request limit either.
+        """
+        with self.transaction() as state:
+            # Absent if it expired or the quota window changed: nothing to give back then
+            if state["reserved"].pop(reservation, None) is not None and not sent:
+                state["requests"] = max(0, state["requests"] - 1)
+
+    def charge(self, model: str, prompt_tokens: int, output_tokens: int, prompt: str = "",
+               reservation: str = None) -> None:
+        """Account a response from its usage metadata (estimated from the prompt when missing),
+        settling its reservation"""
+        prompt_tokens = prompt_tokens or estimate_tokens(prompt)
+        with self.transaction() as state:
+            state["reserved"].pop(reservation, None)
+            state["prompt_tokens"] += prompt_tokens
+            state["output_tokens"] += output_tokens or IMAGE_OUTPUT_TOKENS
+            state["cost"] = round(state["cost"] + request_cost(model, prompt_tokens), 6)
+
+    def defer(self, deck: Deck, slide_id: str) -> None:
+        entry = {"deck": deck.name, "slide": slide_id}
+        with self.transaction() as state:
+            if entry not in [{"deck": d["deck"], "slide": d["slide"]} for d in state["deferred"]]:
+                state["deferred"].append({**entry, "deferred_at": time.time(), "window": state["window"]})
+
+    def deferred(self) -> list:
+        return list(self.state["deferred"])
+
+    def completed(self, deck: Deck, slide_id: str) -> None:
+        with self.transaction() as state:
+            state["deferred"] = [d for d in state["deferred"] if (d["deck"], d["slide"]) != (deck.name, slide_id)]
+
+
+def print_plan(rows: list, tracker: BudgetTracker = None) -> None:
+    print(f"{'deck':<20} {'slides':>6} {'requests':>8} {'in tokens':>10} {'out tokens':>10} {'est. $':>8}")
+    for r in rows:
+        print(f"{r['deck']:<20} {r['slides']:>6} {r['requests']:>8.1f} {r['input_tokens']:>10} "
+              f"{r['output_tokens']:>10} {r['cost']:>8.2f}")
+    total = {key: sum(r[key] for r in rows) for key in ("requests", "input_tokens", "output_tokens", "cost")}
+    print(f"{'total':<20} {'':>6} {total['requests']:>8.1f} {total['input_tokens']:>10} "
+          f"{total['output_tokens']:>10} {total['cost']:>8.2f}")
+
+    if tracker is None:
+        return
+    s = tracker.state
+    print(f"\nQuota window {s['window']}: {s['requests']} requests, "
+          f"{s['prompt_tokens'] + s['output_tokens']} tokens, ${s['cost']:.2f} used; "
+          f"{len(s['deferred'])} slide(s) deferred")
+    left = tracker.remaining()
+    if left["requests"] is not None and total["requests"] > left["requests"]:
+        print(f"⚠️ Expected {total['requests']:.0f} requests but only {max(0, left['requests'])} remain; "
+              f"the rest will be deferred")
+    if left["tokens"] is not None and total["input_tokens"] + total["output_tokens"] > left["tokens"]:
+        print(f"⚠️ Expected tokens exceed the {max(0, left['tokens'])} remaining; the rest will be deferred")
+    if left["cost"] is not None and total["cost"] > left["cost"]:
+        print(f"⚠️ Estimated ${total['cost']:.2f} exceeds the ${max(0.0, left['cost']):.2f} remaining; "
+              f"the rest will be deferred")
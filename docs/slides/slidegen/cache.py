@@ -0,0 +1,172 @@
+"""
+Content-addressed response cache
+
+Entries are keyed on a SHA-256 of the full prompt (STYLE_PREFIX + slide
+prompt), the model name and the generation config, and hold the image bytes
+plus any text parts of the response. Eviction is size-based LRU: a hit
+refreshes the entry's mtime and the oldest entries are dropped once the
+cache grows past its byte budget. The cache directory is only scanned when
+the running size total (counted from the first scan on) goes over budget,
+not on every put, and eviction then trims it to EVICT_TO of the budget so
+the next scan is that much writing away; other processes' writes are picked
+up by the scans.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .config import CACHE_DIR
+from .output import atomic_copy, atomic_write
+from .response import Payload
+
+DEFAULT_CACHE_DIR = CACHE_DIR / "responses"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Eviction frees space down to this fraction of max_bytes
+EVICT_TO = 0.9
+
+
+def config_fingerprint(config) -> str:
+    """Stable JSON form of a GenerateContentConfig, generation_config dict or None"""
+    if config is None:
+        return "null"
+    if hasattr(config, "model_dump"):
+        config = config.model_dump(mode="json", exclude_none=True)
+    return json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def cache_key(prompt: str, model: str, config=None) -> str:
+    digest = hashlib.sha256()
+    for piece in (prompt, model, config_fingerprint(config)):
+        digest.update(piece.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """On-disk cache of model responses with size-based LRU eviction"""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Bytes in the cache as of the last scan plus this process's writes since; None until the first put
+        self._total = None
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.root / f"{key}.png", self.root / f"{key}.json"
+
+    def _size(self, key: str) -> int:
+        size = 0
+        for path in self._paths(key):
+            try:
+                size += path.stat().st_size
+            except OSError:
+                pass
+        return size
+
+    def _grew(self, key: str, before: int) -> None:
+        """Account an entry rewritten from ``before`` bytes; evict once the total is over budget"""
+        if self._total is None:
+            self.evict()
+            return
+        self._total += self._size(key) - before
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def _read_meta(self, meta_path: Path) -> dict | None:
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _touch(self, *paths: Path) -> None:
+        # Eviction sees touched entries as recently used
+        now = time.time()
+        for path in paths:
+            os.utime(path, (now, now))
+
+    def get(self, key: str) -> Payload | None:
+        image_path, meta_path = self._paths(key)
+        meta = self._read_meta(meta_path)
+        if meta is None:
+            return None
+        try:
+            image = image_path.read_bytes()
+        except OSError:
+            return None
+
+        self._touch(image_path, meta_path)
+        return Payload(image=image, texts=meta.get("texts", []))
+
+    def restore(self, key: str, dest: Path) -> list | None:
+        """Copy a cached image to ``dest`` without reading it into memory; returns its texts"""
+        image_path, meta_path = self._paths(key)
+        meta = self._read_meta(meta_path)
+        if meta is None:
+            return None
+        try:
+            atomic_copy(image_path, dest)
+        except OSError:
+            return None
+
+        self._touch(image_path, meta_path)
+        return meta.get("texts", [])
+
+    def _write_meta(self, meta_path: Path, texts: list, meta: dict) -> None:
+        atomic_write(meta_path, json.dumps(
+            {"texts": texts, "created": time.time(), **meta}, ensure_ascii=False,
+        ).encode("utf-8"))
+
+    def put(self, key: str, entry: Payload, **meta) -> None:
+        image_path, meta_path = self._paths(key)
+        before = self._size(key)
+        atomic_write(image_path, entry.image)
+        self._write_meta(meta_path, entry.texts, meta)
+        self._grew(key, before)
+
+    def put_file(self, key: str, src: Path, texts: list, **meta) -> None:
+        """Store an image that has already been written to ``src``"""
+        image_path, meta_path = self._paths(key)
+        before = self._size(key)
+        atomic_copy(src, image_path)
+        self._write_meta(meta_path, texts, meta)
+        self._grew(key, before)
+
+    def replace_image(self, key: str, src: Path) -> bool:
+        """Swap an existing entry's image for ``src`` (e.g. after optimizing the output), keeping its texts"""
+        image_path, meta_path = self._paths(key)
+        if not meta_path.exists():
+            return False
+        before = self._size(key)
+        atomic_copy(src, image_path)
+        self._grew(key, before)
+        return True
+
+    def evict(self) -> None:
+        """Scan the cache and, if it is over max_bytes, drop least recently used entries down to EVICT_TO of it"""
+        entries = []
+        total = 0
+        for image_path in self.root.glob("*.png"):
+            meta_path = image_path.with_suffix(".json")
+            try:
+                stat = image_path.stat()
+                size = stat.st_size + (meta_path.stat().st_size if meta_path.exists() else 0)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, size, image_path, meta_path))
+            total += size
+
+        if total <= self.max_bytes:
+            self._total = total
+            return
+        entries.sort()
+        for _, size, image_path, meta_path in entries:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            image_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            total -= size
+        self._total = total
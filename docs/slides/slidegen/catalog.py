@@ -0,0 +1,195 @@
+"""
+Product illustrations for a store catalog of markdown files
+
+    python -m slidegen --catalog --async
+    python -m slidegen --catalog path/to/store --plan
+
+Every ``<category>/<slug>.md`` below the catalog directory (default
+context/gion_tsujiri) starts with YAML front matter: product_name, category,
+price, brewing, contents, ... Only that front matter is read (the file is
+streamed up to the closing ``---``), turned into a prompt after STYLE_PREFIX
+and becomes one slide ``<category>_<slug>`` of the ``catalog`` deck.
+``_metadata/source_map.yaml`` fills in a missing SKU or source URL.
+
+Each slide's fingerprint covers the style and the parsed front matter
+(including ``last_updated``). changed_slides() compares it with the run
+manifest, so a run only generates new, failed or changed products; a product
+whose front matter changed bypasses the response cache even when its prompt
+did not.
+"""
+
+import json
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from .config import SLIDES_DIR
+from .deck import Deck, Slide
+from .manifest import DONE, RunManifest
+from .spec import fingerprint
+
+CATALOG_DIR = SLIDES_DIR.parent.parent / "context" / "gion_tsujiri"
+CATALOG_IMAGES_DIR = SLIDES_DIR / "catalog-images"
+SOURCE_MAP = Path("_metadata") / "source_map.yaml"
+FRONT_MATTER_DELIMITER = "---"
+
+STYLE_PREFIX = """Create a hand-drawn product illustration for a Japanese tea shop catalog.
+
+STYLE REQUIREMENTS:
+- Hand-drawn sketch aesthetic with ink outlines and soft watercolor washes
+- Calm Kyoto palette: matcha green, roasted brown, cream and a touch of vermilion
+- The product package in the center, its tea (leaves, powder or cup) beside it
+- Small hand-drawn icons for brewing temperature, time and servings
+- Washi paper texture background
+- NOT a photograph - embrace imperfections and human touch
+- ALL visible text labels MUST be in JAPANESE
+- High resolution, detailed illustration
+
+"""
+
+
+@dataclass(frozen=True)
+class Product:
+    slug: str
+    category: str
+    path: Path
+    data: dict
+
+    @property
+    def id(self) -> str:
+        return f"{self.category}_{self.slug}"
+
+
+def read_front_matter(path: Path) -> str | None:
+    """The YAML between the leading ``---`` lines, without reading the body"""
+    with open(path, encoding="utf-8") as f:
+        if f.readline().strip() != FRONT_MATTER_DELIMITER:
+            return None
+        lines = []
+        for line in f:
+            if line.strip() == FRONT_MATTER_DELIMITER:
+                return "".join(lines)
+            lines.append(line)
+    return None
+
+
+def _walk(root: Path):
+    with os.scandir(root) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.name.startswith(("_", ".")):
+                continue
+            if entry.is_dir():
+                yield from _walk(Path(entry.path))
+            elif entry.name.endswith(".md") and entry.name != "index.md":
+                yield Path(entry.path)
+
+
+def load_source_map(root: Path = CATALOG_DIR) -> dict:
+    """{slug: {"sku", "source", ...}} from _metadata/source_map.yaml, if present"""
+    path = Path(root) / SOURCE_MAP
+    if not path.exists():
+        return {}
+    import yaml
+
+    products = (yaml.safe_load(path.read_text(encoding="utf-8")) or {}).get("products") or {}
+    return {slug: entry for category in products.values() for slug, entry in (category or {}).items()}
+
+
+def iter_products(root: Path = CATALOG_DIR):
+    """Yield one Product per markdown file with front matter, in path order"""
+    import yaml
+
+    root = Path(root)
+    sources = load_source_map(root)
+    for path in _walk(root):
+        text = read_front_matter(path)
+        if text is None:
+            continue
+        # Dates and other YAML scalars become strings so the data hashes as JSON
+        data = json.loads(json.dumps(yaml.safe_load(text) or {}, default=str))
+        if not data.get("product_name"):
+            continue
+        source = sources.get(path.stem, {})
+        data.setdefault("sku", source.get("sku"))
+        data.setdefault("source_url", source.get("source"))
+        category = path.parent.name if path.parent != root else "uncategorized"
+        yield Product(path.stem, category, path, data)
+
+
+def _yen(amount) -> str:
+    return f"¥{amount:,}" if isinstance(amount, (int, float)) else str(amount)
+
+
+def product_prompt(product: Product) -> str:
+    data = product.data
+    name = data["product_name"]
+    lines = [f'Create a product illustration: "{name}"' + (f" ({data['product_name_en']})"
+                                                         if data.get("product_name_en") else ""), ""]
+
+    lines.append("PRODUCT:")
+    if data.get("brand"):
+        lines.append(f"- Brand: {data['brand']}")
+    category = data.get("category")
+    if category:
+        lines.append(f"- Category: {' / '.join(category) if isinstance(category, list) else category}")
+    for key, label in (("weight", "Package"), ("servings", "Servings")):
+        if data.get(key):
+            lines.append(f"- {label}: {data[key]}")
+    price = data.get("price") or {}
+    if isinstance(price, dict) and price.get("variants"):
+        lines.append("- Sizes:")
+        lines += [f"  {v.get('size', '')}: {_yen(v.get('price', ''))}" for v in price["variants"]]
+    elif isinstance(price, dict) and price.get("current") is not None:
+        lines.append(f"- Price: {_yen(price['current'])}")
+    for item in data.get("contents") or []:
+        if isinstance(item, dict):
+            lines.append(f"- Contains: {item.get('type', '')} x{item.get('bags', '')} bags")
+
+    brewing = data.get("brewing") or {}
+    if brewing:
+        lines += ["", "BREWING (small hand-drawn icons):"]
+        lines += [f"- {key.replace('_', ' ').capitalize()}: {value}" for key, value in brewing.items()]
+
+    lines += ["", "TEXT LABELS (Japanese, hand-written style):", f'- "{name}" as the main label']
+    if data.get("brand"):
+        lines.append(f'- "{data["brand"]}" as a small brand mark')
+    return "\n".join(lines) + "\n"
+
+
+def deck_from_catalog(root: Path = CATALOG_DIR, name: str = "catalog", output_dir: Path = CATALOG_IMAGES_DIR,
+                      style_prefix: str = STYLE_PREFIX) -> Deck:
+    slides = [
+        Slide(product.id, product.data["product_name"], product_prompt(product),
+              fingerprint=fingerprint(style_prefix, product.data))
+        for product in iter_products(root)
+    ]
+    return Deck(
+        name=name,
+        title=f"Product illustrations for {Path(root).name}",
+        style_prefix=style_prefix,
+        slides=slides,
+        output_dir=output_dir,
+        filename_prefix="product_",
+        model="models/gemini-3-pro-image-preview",
+        fallback_models=("models/gemini-2.5-flash-image",),
+        metadata={"catalog": str(root)},
+    )
+
+
+def changed_slides(deck: Deck, manifest: RunManifest) -> tuple[Deck, set]:
+    """The deck reduced to new, failed or changed products, and the ids that must bypass the cache"""
+    slides, refresh = [], set()
+    for slide in deck.slides:
+        entry = manifest.slides.get(slide.id) or {}
+        output = deck.output_path(slide)
+        if entry.get("fingerprint") == deck.fingerprint(slide) and entry.get("status") == DONE:
+            try:
+                if output.stat().st_size == entry.get("bytes"):
+                    continue
+            except OSError:
+                pass
+        elif entry.get("fingerprint"):
+            # Front matter changed: a new image, not the cached one of an identical prompt
+            refresh.add(f"{deck.name}:{slide.id}")
+        slides.append(slide)
+    return replace(deck, slides=slides), refresh
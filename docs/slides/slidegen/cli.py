@@ -0,0 +1,343 @@
+"""
+Command line entry point: python -m slidegen --deck business --deck protocol
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from . import discovery
+from .budget import DEFAULT_BUDGET_PATH, Budget, BudgetTracker, plan, print_plan
+from .cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResponseCache
+from .catalog import CATALOG_DIR, changed_slides, deck_from_catalog
+from .config import DEFAULT_CONCURRENCY, MANIFEST_DIR
+from .decks import DECKS, get_deck
+from .engine import SlideEngine
+from .history import DEFAULT_HISTORY_PATH, HistoryStore
+from .manifest import RunManifest
+from .metrics import DEFAULT_METRICS_PATH, MetricsRecorder, load_records, summarize
+from .derivatives import build_decks, report as report_derivatives
+from .optimize import optimize_paths, report
+from .ratelimit import SharedRateLimiter
+from .workqueue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DEFAULT_QUEUE_PATH, WorkQueue, work
+from .retry import RetryPolicy
+from .scoring import SCORERS, check_scorer, get_scorer
+from .similar import DEFAULT_INDEX_PATH, DEFAULT_THRESHOLD, MODES, SimilarityIndex
+from .selection import missing_outputs, parse_shard, select, unmatched
+from .scheduler import AIMDScheduler
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="slidegen", description="omakase.ai slide generator")
+    parser.add_argument("--deck", action="append", default=[], metavar="NAME",
+                        help=f"deck to generate (repeatable; available: {', '.join(DECKS)})")
+    parser.add_argument("--catalog", nargs="?", type=Path, const=CATALOG_DIR, metavar="DIR",
+                        help=f"also illustrate the products of a markdown catalog (default: {CATALOG_DIR}); "
+                             "only new, failed or changed products are generated")
+    parser.add_argument("--only", action="append", default=[], metavar="ID",
+                        help="generate only this slide id, deck:id or pattern (repeatable)")
+    parser.add_argument("--skip", action="append", default=[], metavar="ID",
+                        help="leave out this slide id, deck:id or pattern (repeatable)")
+    parser.add_argument("--shard", type=shard_arg, metavar="I/N",
+                        help="generate only shard I of N (1-based), partitioned by slide id hash")
+    parser.add_argument("--check", action="store_true",
+                        help="check that every selected slide has an image output (e.g. after merging shards), "
+                             "then exit")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="add the selected slides to the work queue for --worker processes, then exit")
+    parser.add_argument("--worker", action="store_true",
+                        help="consume the work queue until it is empty (run several for more throughput)")
+    parser.add_argument("--queue", type=Path, default=DEFAULT_QUEUE_PATH, metavar="DB",
+                        help=f"SQLite work queue (default: {DEFAULT_QUEUE_PATH}; see slidegen.workqueue)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="a worker's claim on a job lapses this long after its last heartbeat")
+    parser.add_argument("--queue-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help="leases per queued job before it is failed for good")
+    parser.add_argument("--list", action="store_true",
+                        help="list decks and their slides, then exit")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="generate slides concurrently")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"max in-flight requests in --async mode (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--initial-concurrency", type=float, default=2,
+                        help="starting AIMD window; grows on success, halves on 429/503 (default: 2)")
+    parser.add_argument("--max-attempts", type=int, default=RetryPolicy.max_attempts,
+                        help="attempts per slide for network/5xx/429/empty-image errors")
+    parser.add_argument("--request-timeout", type=float, default=RetryPolicy.request_timeout,
+                        help="seconds before a single request is abandoned and retried")
+    parser.add_argument("--run-timeout", type=float, default=None,
+                        help="seconds before the whole run gives up on pending slides")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip slides the run manifest records as complete with unchanged output")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always call the model, bypassing the response cache")
+    parser.add_argument("--refresh", action="append", default=[], metavar="ID",
+                        help="regenerate this slide id (or deck:id) even if cached (repeatable)")
+    parser.add_argument("--similar", choices=MODES,
+                        help="on a cache miss, offer or reuse the cached image of a near-identical prompt "
+                             "(see slidegen.similar)")
+    parser.add_argument("--similar-threshold", type=float, default=DEFAULT_THRESHOLD, metavar="SCORE",
+                        help=f"minimum prompt similarity for --similar (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--similar-any-model", action="store_true",
+                        help="with --similar: also match images generated by other models")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                        help=f"response cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used entries beyond this size")
+    parser.add_argument("--metrics", type=Path, default=DEFAULT_METRICS_PATH, metavar="JSONL",
+                        help=f"append one record per attempt to this file (default: {DEFAULT_METRICS_PATH})")
+    parser.add_argument("--no-metrics", action="store_true", help="do not record per-attempt metrics")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY_PATH, metavar="DB",
+                        help=f"SQLite generation history (default: {DEFAULT_HISTORY_PATH}; see slidegen.history)")
+    parser.add_argument("--no-history", action="store_true", help="do not record this run in the history")
+    parser.add_argument("--summary", action="store_true",
+                        help="print p50/p95 latency and failure rate per model from --metrics, then exit")
+    parser.add_argument("--days", type=float, default=0, help="with --summary: only the last N days")
+    parser.add_argument("--prom-textfile", type=Path, metavar="PATH",
+                        help="also write this run's metrics for the Prometheus textfile collector")
+    parser.add_argument("--candidates", type=int, default=1, metavar="N",
+                        help="best-of-N: request N images per slide concurrently and keep the best-scoring one")
+    parser.add_argument("--scorer", default="density", choices=SCORERS,
+                        help="local quality score for --candidates (see slidegen.scoring)")
+    parser.add_argument("--accept", type=float, default=0.75, metavar="SCORE",
+                        help="with --candidates: cancel the rest once a candidate scores at least this")
+    parser.add_argument("--hedge", action="store_true",
+                        help="send a hedged request to the deck's next fallback model when the current one is slow")
+    parser.add_argument("--hedge-percentile", type=float, default=90, metavar="P",
+                        help="hedge after this latency percentile of the model in the history (default: 90)")
+    parser.add_argument("--hedge-after", type=float, default=60.0, metavar="SECONDS",
+                        help="hedge delay when the history has too few samples (default: 60)")
+    parser.add_argument("--fallback-model", action="append", default=[], metavar="MODEL",
+                        help="override the decks' ordered fallback chain (repeatable)")
+    parser.add_argument("--rate-limit", type=float, metavar="RPM",
+                        help="requests per minute for all slidegen processes on this host sharing the API key")
+    parser.add_argument("--rate-burst", type=float, default=1.0,
+                        help="with --rate-limit: requests that may be sent back to back (default: 1)")
+    parser.add_argument("--rate-file", type=Path, metavar="PATH",
+                        help="with --rate-limit: shared bucket file (default: one per API key in .cache/ratelimit/)")
+    parser.add_argument("--plan", action="store_true",
+                        help="print the estimated requests, tokens and cost of the selected decks, then exit")
+    parser.add_argument("--max-requests", type=int, help="request budget per daily quota window")
+    parser.add_argument("--max-tokens", type=int, help="input+output token budget per daily quota window")
+    parser.add_argument("--max-cost", type=float, metavar="USD", help="estimated cost budget per daily quota window")
+    parser.add_argument("--budget-file", type=Path, default=DEFAULT_BUDGET_PATH,
+                        help=f"usage and deferred-slide queue (default: {DEFAULT_BUDGET_PATH})")
+    parser.add_argument("--run-deferred", action="store_true",
+                        help="generate only the slides deferred by an earlier run's budget")
+    parser.add_argument("--optimize", action="store_true",
+                        help="losslessly recompress the generated images afterwards (see slidegen.optimize)")
+    parser.add_argument("--derivatives", action="store_true",
+                        help="build WebP/AVIF widths and thumbnails for changed slides (see slidegen.derivatives)")
+    parser.add_argument("--rediscover", action="store_true",
+                        help="ignore the cached model discovery result and list models again")
+    return parser
+
+
+def shard_arg(value: str) -> tuple[int, int]:
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def list_decks(decks: list) -> None:
+    for deck in decks:
+        print(f"{deck.name}: {deck.title} ({deck.backend}, {deck.model})")
+        for slide in deck.slides:
+            print(f"  - {slide.id}: {slide.title}")
+
+
+def run_worker(args, engine: SlideEngine) -> int:
+    queue = WorkQueue(args.queue, args.queue_attempts)
+    catalogs = {}
+
+    def resolve(job):
+        if job.source:
+            if job.source not in catalogs:
+                catalogs[job.source] = deck_from_catalog(Path(job.source), name=job.deck)
+            deck = catalogs[job.source]
+        else:
+            deck = get_deck(job.deck)
+        if args.fallback_model:
+            deck = replace(deck, fallback_models=tuple(args.fallback_model))
+        return deck
+
+    concurrency = args.concurrency if args.use_async else 1
+    print(f"Worker consuming {args.queue} ({concurrency} lane(s))")
+    try:
+        stats = asyncio.run(work(engine, queue, resolve, concurrency, args.lease_seconds))
+    finally:
+        queue.close()
+        if engine.metrics is not None:
+            engine.metrics.close()
+        if engine.history is not None:
+            engine.history.close()
+
+    print(f"\nWorker finished: {stats['done']} done, {stats['requeued']} re-queued, {stats['failed']} failed"
+          + (f", {stats['released']} released (budget)" if stats["released"] else ""))
+    return 1 if stats["failed"] else 0
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.hedge and args.candidates > 1:
+        parser.error("--hedge cannot be combined with --candidates N > 1 (best-of-N does not hedge)")
+    decks = [get_deck(name) for name in args.deck] if args.deck or args.catalog else list(DECKS.values())
+    if args.catalog:
+        decks.append(deck_from_catalog(args.catalog))
+    for pattern in unmatched(decks, args.only + args.skip):
+        print(f"⚠️ No slide matches '{pattern}'")
+
+    if args.summary:
+        summarize(load_records(args.metrics, time.time() - args.days * 86400 if args.days else 0.0))
+        return 0
+
+    budget = Budget(args.max_requests, args.max_tokens, args.max_cost)
+    tracker = BudgetTracker(budget, args.budget_file) if budget.limited or args.run_deferred or args.plan else None
+    # Deferred slides of the decks built above (registry, --deck and --catalog), within --only/--skip/--shard
+    queued = {(entry["deck"], entry["slide"]) for entry in tracker.deferred()} if args.run_deferred else None
+    decks = select(decks, args.only, args.skip, args.shard, queued)
+
+    if args.list:
+        list_decks(decks)
+        return 0
+    if args.run_deferred:
+        if not decks:
+            print("No deferred slides" + (" match the selection" if args.only or args.skip or args.shard else ""))
+            return 0
+    elif not args.deck and not args.catalog and not args.worker:
+        print("Select at least one --deck (see --list)")
+        return 2
+
+    if args.check:
+        missing = missing_outputs(decks)
+        for deck_name, slide_id, reason in missing:
+            print(f"  ❌ {deck_name}:{slide_id}: {reason}")
+        total = sum(len(deck.slides) for deck in decks)
+        print(f"{'✅' if not missing else '❌'} {total - len(missing)}/{total} slides have an output")
+        return 1 if missing else 0
+    if not decks:
+        print("No slides selected")
+        return 0
+
+    refresh = set(args.refresh)
+    for i, deck in enumerate(decks):
+        if args.catalog and deck.metadata.get("catalog"):
+            catalog, changed = changed_slides(deck, RunManifest.load(MANIFEST_DIR / f"{deck.name}.json", deck.name))
+            print(f"Catalog: {len(catalog.slides)}/{len(deck.slides)} products new, failed or changed")
+            decks[i] = catalog
+            refresh |= changed
+    if args.catalog:
+        decks = [deck for deck in decks if deck.slides]
+        if not decks:
+            print("✅ Catalog up to date")
+            return 0
+
+    if args.fallback_model:
+        decks = [replace(deck, fallback_models=tuple(args.fallback_model)) for deck in decks]
+
+    if args.enqueue:
+        queue = WorkQueue(args.queue, args.queue_attempts)
+        queued = queue.enqueue(decks, refresh)
+        counts = queue.counts()
+        queue.close()
+        print(f"📥 {queued} job(s) queued in {args.queue} "
+              f"({', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))})")
+        return 0
+
+    if args.plan:
+        attempts = None
+        if args.history.exists():
+            store = HistoryStore(args.history)
+            attempts = store.attempts_per_slide()
+            store.close()
+        print_plan(plan(decks, (attempts or 1.0) * args.candidates), tracker)
+        if attempts:
+            print(f"(assuming {attempts:.2f} requests per slide, from the last 30 days of history)")
+        return 0
+
+    if args.candidates > 1:
+        try:
+            check_scorer(get_scorer(args.scorer))
+        except ImportError as e:
+            print(f"❌ --scorer {args.scorer} needs {e.name}: pip install {'pillow' if e.name == 'PIL' else e.name}")
+            return 2
+
+    if args.rediscover:
+        discovery.clear()
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    if args.use_async:
+        scheduler = AIMDScheduler(initial=args.initial_concurrency, maximum=args.concurrency)
+    else:
+        scheduler = AIMDScheduler(initial=1, maximum=1)
+    retry = RetryPolicy(max_attempts=max(1, args.max_attempts), request_timeout=args.request_timeout,
+                        run_timeout=args.run_timeout)
+    metrics = None if args.no_metrics else MetricsRecorder(args.metrics, args.prom_textfile)
+    similar = None
+    if args.similar and cache is not None:
+        similar = SimilarityIndex(DEFAULT_INDEX_PATH, args.similar_threshold, args.similar_any_model,
+                                  reuse=args.similar == "reuse")
+    rate_limiter = SharedRateLimiter(args.rate_limit, args.rate_burst, args.rate_file) if args.rate_limit else None
+    history = None if args.no_history else HistoryStore(args.history, run_id=metrics.run_id if metrics else None)
+    engine = SlideEngine(cache=cache, scheduler=scheduler, retry=retry, metrics=metrics, history=history,
+                         budget=tracker, candidates=args.candidates, scorer=get_scorer(args.scorer),
+                         accept=args.accept, hedge=args.hedge, hedge_percentile=args.hedge_percentile,
+                         hedge_after=args.hedge_after, rate_limiter=rate_limiter, similar=similar)
+
+    if args.worker:
+        return run_worker(args, engine)
+
+    print("=" * 60)
+    for deck in decks:
+        print(f"{deck.title} [{deck.name}]")
+    print("=" * 60)
+
+    try:
+        results = engine.generate(decks, refresh=refresh, resume=args.resume)
+    finally:
+        if metrics is not None:
+            metrics.close()
+        if history is not None:
+            history.close()
+
+    print(f"\nFinal concurrency window: {engine.scheduler.window:.2f}")
+
+    failed = 0
+    for deck in decks:
+        deck_results = results[deck.name]
+        failed += deck_results.count(False)
+        backend = engine.backend_for(deck)
+        deferred = f", {deck_results.count(None)} deferred" if None in deck_results else ""
+
+        print("\n" + "=" * 60)
+        print(f"{deck.name}: {deck_results.count(True)}/{len(deck_results)} slides generated{deferred}")
+        print(f"Model: {backend.model_name}")
+        print(f"Output: {deck.output_dir}")
+        print("=" * 60)
+
+        print("\nGenerated files:")
+        for f in sorted(deck.output_dir.glob(f"{deck.filename_prefix}*.png")):
+            print(f"  - {f.name} ({f.stat().st_size / 1024:.1f} KB)")
+
+    if args.optimize:
+        print("\nOptimizing images:")
+        outputs = [deck.output_path(slide) for deck in decks for slide in deck.slides]
+        outputs = [path for path in outputs if path.exists()]
+        report(optimize_paths(outputs, manifest_dir=engine.manifest_dir, cache=cache))
+
+    if args.derivatives:
+        print("\nBuilding derivatives:")
+        try:
+            report_derivatives(build_decks(decks))
+        except ImportError:
+            print("❌ Derivatives need Pillow: pip install pillow")
+            failed += 1
+
+    if tracker is not None and tracker.deferred():
+        print(f"\n⏸️ {len(tracker.deferred())} slide(s) deferred to the next quota window (--run-deferred)")
+
+    return 1 if failed else 0
@@ -0,0 +1,24 @@
+"""
+Shared configuration for the slide generators
+"""
+
+import os
+from pathlib import Path
+
+# docs/slides, resolved from the package location rather than a fixed checkout path
+SLIDES_DIR = Path(__file__).resolve().parent.parent
+IMAGES_DIR = SLIDES_DIR / "images"
+PROTOCOL_IMAGES_DIR = SLIDES_DIR / "protocol-images"
+CACHE_DIR = SLIDES_DIR / ".cache"
+MANIFEST_DIR = CACHE_DIR / "manifests"
+
+# Maximum number of in-flight requests in --async mode
+DEFAULT_CONCURRENCY = 4
+
+
+def api_key() -> str:
+    """Return the Gemini API key from the environment"""
+    key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
+    if not key:
+        raise ValueError("GOOGLE_API_KEY or GEMINI_API_KEY environment variable required")
+    return key
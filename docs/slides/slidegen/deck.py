@@ -0,0 +1,60 @@
+"""
+Deck definitions: a style prefix, an ordered list of slides and where/how to render them
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Slide:
+    id: str
+    title: str
+    prompt: str
+    # Set by compiled specs; Deck.fingerprint() falls back to a prompt hash
+    fingerprint: str = ""
+
+
+@dataclass
+class Deck:
+    name: str
+    title: str
+    style_prefix: str
+    slides: list
+    output_dir: Path
+    filename_prefix: str = "slide_"
+    # Inserted between STYLE_PREFIX and the slide prompt
+    prompt_separator: str = ""
+    # Backend name registered in slidegen.backends
+    backend: str = "genai"
+    model: str = "models/gemini-3-pro-image-preview"
+    # Substrings tried against the listed models before falling back to `model`
+    model_candidates: tuple = ()
+    # Ordered models for hedged requests (--hedge) when `model` is slow or failing
+    fallback_models: tuple = ()
+    # None means "backend default"; dicts are passed through to the SDK
+    generation_config: dict = None
+    metadata: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dicts(cls, slides: list, **kwargs) -> "Deck":
+        return cls(slides=[Slide(**slide) for slide in slides], **kwargs)
+
+    def full_prompt(self, slide: Slide) -> str:
+        return self.style_prefix + self.prompt_separator + slide.prompt
+
+    def fingerprint(self, slide: Slide) -> str:
+        """Stable per-slide identity that changes whenever the slide's source changes"""
+        if slide.fingerprint:
+            return slide.fingerprint
+        return hashlib.sha256(self.full_prompt(slide).encode("utf-8")).hexdigest()[:16]
+
+    def output_path(self, slide: Slide) -> Path:
+        return self.output_dir / f"{self.filename_prefix}{slide.id}.png"
+
+    def slide(self, slide_id: str) -> Slide:
+        for slide in self.slides:
+            if slide.id == slide_id:
+                return slide
+        raise KeyError(f"Unknown slide '{slide_id}' in deck '{self.name}'")
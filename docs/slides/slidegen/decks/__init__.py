@@ -0,0 +1,37 @@
+"""
+Registry of the built-in decks
+"""
+
+from . import business, business_gemini3, business_v1, business_v2, protocol
+
+DECKS = {
+    module.DECK.name: module.DECK
+    for module in (business, business_gemini3, business_v2, business_v1, protocol)
+}
+
+try:
+    from . import protocol_puml
+except OSError:
+    # The PlantUML-derived deck is parsed at import; without the .puml it is not offered
+    pass
+else:
+    DECKS[protocol_puml.DECK.name] = protocol_puml.DECK
+
+try:
+    from . import business_spec
+except ImportError:
+    # The YAML-driven deck needs PyYAML unless its compiled spec is cached
+    pass
+else:
+    DECKS[business_spec.DECK.name] = business_spec.DECK
+
+
+# The decks whose outputs are committed (images/ and protocol-images/)
+DEFAULT_DECKS = ("business", "protocol")
+
+
+def get_deck(name: str):
+    try:
+        return DECKS[name]
+    except KeyError:
+        raise KeyError(f"Unknown deck '{name}' (available: {', '.join(DECKS)})") from None
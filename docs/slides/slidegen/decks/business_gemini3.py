@@ -0,0 +1,34 @@
+"""
+Business plan deck using the best available Gemini image model
+
+Formerly generate-slides-gemini3.py. Shares its slides with the ``business``
+deck; only the style prefix and model selection differ.
+"""
+
+from ..config import IMAGES_DIR
+from ..deck import Deck
+from .business import SLIDES
+
+STYLE_PREFIX = """Create a hand-drawn whiteboard-style infographic illustration.
+
+STYLE REQUIREMENTS:
+- Hand-drawn sketch aesthetic with marker pen and crayon textures
+- Black marker outlines with yellow, orange, blue, green, purple color accents
+- Friendly, approachable startup pitch deck visual style
+- Simple stick figures for people characters
+- White paper texture background
+- NOT polished digital art - embrace imperfections and human touch
+- ALL visible text labels MUST be in JAPANESE
+
+"""
+
+DECK = Deck.from_dicts(
+    name="business-gemini3",
+    title="omakase.ai Business Plan Slide Generator",
+    style_prefix=STYLE_PREFIX,
+    slides=SLIDES,
+    output_dir=IMAGES_DIR,
+    # Fallback model if no Gemini 3 / 2.5 image model is listed
+    model="models/gemini-2.0-flash-exp-image-generation",
+    model_candidates=("gemini-3-pro-image", "gemini-2.5-flash-image"),
+)
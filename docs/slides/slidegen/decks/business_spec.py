@@ -0,0 +1,10 @@
+"""
+Business plan deck compiled from omakase-ai-infographic-sequence.yaml
+
+Same model and output files as the ``business`` deck, but the style prefix and
+prompts come from the YAML spec (see slidegen.spec) instead of a hand-kept copy.
+"""
+
+from ..spec import deck_from_spec
+
+DECK = deck_from_spec("business-spec")
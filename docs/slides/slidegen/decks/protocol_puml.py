@@ -0,0 +1,11 @@
+"""
+Protocol flow deck derived from docs/omakase-ai-protocol.puml
+
+One slide per ``== Phase ==`` block (see slidegen.puml), drawn in the style of
+the hand-written ``protocol`` deck into protocol-images/protocol_puml_*.png.
+"""
+
+from ..puml import deck_from_puml
+from .protocol import STYLE_PREFIX
+
+DECK = deck_from_puml("protocol-puml", STYLE_PREFIX, filename_prefix="protocol_puml_")
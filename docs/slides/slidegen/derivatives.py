@@ -0,0 +1,173 @@
+"""
+Responsive derivative sets for slide images
+
+    python -m slidegen.derivatives --deck business --deck protocol
+
+For every slide the source image is resized to each of WIDTHS (never
+upscaled; the source width is always included), encoded to each format in
+FORMATS, and a small thumbnail is written. Everything lands in
+``<output_dir>/derivatives/`` next to a ``<deck>.json`` manifest that maps
+slide ids to their variants and dimensions so pages can pick the smallest
+adequate asset (e.g. for a ``srcset``).
+
+Encoding runs in a ProcessPoolExecutor. A slide is only rebuilt when the
+SHA-256 of its source differs from the manifest or a variant is missing.
+Only the entries of the processed slides are updated, so a run filtered with
+--only/--skip/--shard keeps the rest of the manifest.
+Requires Pillow; AVIF is skipped when the installed Pillow cannot write it.
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .decks import DEFAULT_DECKS, get_deck
+from .deck import Deck
+from .manifest import file_sha256
+from .output import atomic_path, atomic_write
+
+WIDTHS = (320, 640, 960, 1280)
+FORMATS = ("webp", "avif")
+THUMBNAIL_WIDTH = 200
+QUALITY = {"webp": 80, "avif": 60, "jpeg": 82}
+MIME_TYPES = {"webp": "image/webp", "avif": "image/avif", "jpeg": "image/jpeg"}
+
+
+def derivatives_dir(deck: Deck) -> Path:
+    return deck.output_dir / "derivatives"
+
+
+def manifest_path(deck: Deck) -> Path:
+    return derivatives_dir(deck) / f"{deck.name}.json"
+
+
+def _supported_formats(formats: tuple) -> tuple:
+    from PIL import features
+
+    return tuple(fmt for fmt in formats if fmt != "avif" or features.check("avif"))
+
+
+def _encode(image, path: Path, fmt: str) -> dict:
+    with atomic_path(path) as tmp:
+        image.save(tmp, format=fmt.upper(), quality=QUALITY[fmt])
+    return {
+        "path": path.name,
+        "format": fmt,
+        "type": MIME_TYPES[fmt],
+        "width": image.width,
+        "height": image.height,
+        "bytes": path.stat().st_size,
+    }
+
+
+def build_slide(source: str, out_dir: str, sha256: str, widths: tuple = WIDTHS,
+                formats: tuple = FORMATS, thumbnail_width: int = THUMBNAIL_WIDTH) -> dict:
+    """Encode every variant of one source image; runs in a worker process"""
+    from PIL import Image
+
+    source, out_dir = Path(source), Path(out_dir)
+    formats = _supported_formats(formats)
+
+    with Image.open(source) as original:
+        original = original.convert("RGB")
+        entry = {
+            "source": source.name,
+            "sha256": sha256,
+            "width": original.width,
+            "height": original.height,
+            "variants": [],
+        }
+
+        for width in sorted({w for w in widths if w < original.width} | {original.width}):
+            height = round(original.height * width / original.width)
+            resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                entry["variants"].append(_encode(resized, out_dir / f"{source.stem}-{width}.{fmt}", fmt))
+
+        thumb = original.copy()
+        thumb.thumbnail((thumbnail_width, thumbnail_width * original.height // original.width + 1), Image.LANCZOS)
+        entry["thumbnail"] = _encode(thumb, out_dir / f"{source.stem}-thumb.jpeg", "jpeg")
+
+    return entry
+
+
+def _is_current(entry: dict, sha256: str, out_dir: Path) -> bool:
+    if not entry or entry.get("sha256") != sha256:
+        return False
+    files = [variant["path"] for variant in entry.get("variants", [])]
+    files.append(entry.get("thumbnail", {}).get("path", ""))
+    return all(name and (out_dir / name).exists() for name in files)
+
+
+def load_manifest(deck: Deck) -> dict:
+    try:
+        return json.loads(manifest_path(deck).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def build_decks(decks: list, workers: int = None) -> dict:
+    """Rebuild changed derivative sets for every deck; returns {deck: {"built": [...], "skipped": [...]}}"""
+    import PIL  # noqa: F401  (fail before queuing work when Pillow is missing)
+
+    summary = {}
+    jobs = []
+    manifests = {}
+    for deck in decks:
+        out_dir = derivatives_dir(deck)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = manifests[deck.name] = load_manifest(deck)
+        summary[deck.name] = {"built": [], "skipped": []}
+
+        for slide in deck.slides:
+            source = deck.output_path(slide)
+            if not source.exists():
+                manifest.pop(slide.id, None)
+                continue
+            sha256 = file_sha256(source)
+            if _is_current(manifest.get(slide.id), sha256, out_dir):
+                summary[deck.name]["skipped"].append(slide.id)
+            else:
+                jobs.append((deck, slide.id, str(source), str(out_dir), sha256))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(deck, slide_id, pool.submit(build_slide, source, out_dir, sha256))
+                       for deck, slide_id, source, out_dir, sha256 in jobs]
+            for deck, slide_id, future in futures:
+                manifests[deck.name][slide_id] = future.result()
+                summary[deck.name]["built"].append(slide_id)
+
+    for deck in decks:
+        # Entries of slides outside this run stay unless their source image is gone
+        manifest = {slide_id: entry for slide_id, entry in manifests[deck.name].items()
+                    if (deck.output_dir / entry.get("source", "")).is_file()}
+        atomic_write(manifest_path(deck), json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    return summary
+
+
+def report(summary: dict) -> None:
+    for deck_name, result in summary.items():
+        print(f"  {deck_name}: {len(result['built'])} rebuilt, {len(result['skipped'])} unchanged")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="slidegen.derivatives", description="Build responsive image variants")
+    parser.add_argument("--deck", action="append", default=[], metavar="NAME",
+                        help=f"deck to process (repeatable; default: {', '.join(DEFAULT_DECKS)})")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    decks = [get_deck(name) for name in args.deck or DEFAULT_DECKS]
+    try:
+        report(build_decks(decks, workers=args.workers))
+    except ImportError:
+        print("❌ Derivatives need Pillow: pip install pillow")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
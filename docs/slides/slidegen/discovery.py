@@ -0,0 +1,97 @@
+"""
+Lazy, cached model discovery
+
+Decks that name ``model_candidates`` pick the first listed model matching
+one of them. Listing models is a network round-trip, so the result is only
+computed on first use and kept in a small JSON file for DEFAULT_TTL seconds.
+Inside an event loop use resolve_async(), which lists models in a worker
+thread so other requests keep running meanwhile.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+from .config import CACHE_DIR
+
+DEFAULT_DISCOVERY_CACHE = CACHE_DIR / "models.json"
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def _read(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path: Path, entries: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def clear(path: Path = DEFAULT_DISCOVERY_CACHE) -> None:
+    path.unlink(missing_ok=True)
+
+
+def discover_model(client, candidates: tuple, fallback: str) -> tuple[str, bool]:
+    """Return (model, found): the first listed model containing a candidate substring"""
+    try:
+        for m in client.models.list():
+            if any(candidate in m.name.lower() for candidate in candidates):
+                return m.name, True
+    except Exception as e:
+        print(f"  ⚠️ Model discovery failed, using {fallback}: {e}")
+    return fallback, False
+
+
+class ModelResolver:
+    """Resolves a deck's model on first access, consulting the discovery cache"""
+
+    def __init__(self, client_factory, candidates: tuple, fallback: str,
+                 cache_path: Path = DEFAULT_DISCOVERY_CACHE, ttl: float = DEFAULT_TTL):
+        self.client_factory = client_factory
+        self.candidates = tuple(candidates)
+        self.fallback = fallback
+        self.cache_path = Path(cache_path)
+        self.ttl = ttl
+        self._model = None
+        self._pending = None
+
+    @property
+    def key(self) -> str:
+        return "|".join(self.candidates) + "=>" + self.fallback
+
+    def resolve(self) -> str:
+        if self._model is not None:
+            return self._model
+
+        entries = _read(self.cache_path)
+        entry = entries.get(self.key)
+        if entry and time.time() - entry.get("resolved_at", 0) < self.ttl:
+            self._model = entry["model"]
+            return self._model
+
+        model, found = discover_model(self.client_factory(), self.candidates, self.fallback)
+        if found:
+            # Re-read so concurrent runs resolving other decks are not clobbered
+            entries = _read(self.cache_path)
+            entries[self.key] = {"model": model, "resolved_at": time.time()}
+            _write(self.cache_path, entries)
+
+        print(f"Using model: {model}")
+        self._model = model
+        return model
+
+    async def resolve_async(self) -> str:
+        """resolve() in a worker thread; concurrent callers share one lookup"""
+        if self._model is not None:
+            return self._model
+        if self._pending is None or self._pending.get_loop() is not asyncio.get_running_loop():
+            self._pending = asyncio.ensure_future(asyncio.to_thread(self.resolve))
+        # Shielded: one cancelled caller must not cancel the lookup the others wait for
+        return await asyncio.shield(self._pending)
@@ -0,0 +1,570 @@
+"""
+Deck-agnostic slide generation engine
+
+One SlideEngine owns the response cache, the backends (one per distinct
+backend/model, sharing a single google-genai client) and a single AIMD
+scheduler whose window applies across every deck it is asked to generate.
+
+Blocking bookkeeping (manifest appends under flock, cache copies, similarity
+index and history writes) runs on one dedicated I/O thread via io(), so it
+never stalls the event loop and those stores are only touched by one thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from .backends import Backend, create_backend
+from .budget import BudgetExhausted, BudgetTracker
+from .cache import ResponseCache, cache_key
+from .deck import Deck, Slide
+from .config import MANIFEST_DIR
+from .errors import (
+    BlockedError, EmptyImageError, GenerationError, is_retryable, is_throttle, retry_after, status_code,
+)
+from .manifest import RunManifest
+from .metrics import CACHE, CANCELLED, FAILED, OK, RETRY, MetricsRecorder
+from .ratelimit import SharedRateLimiter
+from .output import atomic_copy, atomic_write, write_inline_data
+from .response import blocked_reason, image_parts, text_parts, usage_tokens
+from .retry import RetryPolicy
+from .scheduler import AIMDScheduler
+from .scoring import check_scorer
+
+
+@dataclass
+class Candidate:
+    """One saved model answer for a slide"""
+
+    index: int
+    path: Path
+    texts: list
+    timing: dict
+    tokens: dict = field(default_factory=dict)
+    score: float = None
+
+
+def candidates_dir(deck: Deck, slide: Slide) -> Path:
+    return deck.output_dir / "candidates" / slide.id
+
+
+class SlideEngine:
+    def __init__(self, cache: ResponseCache = None, concurrency: int = 1,
+                 scheduler: AIMDScheduler = None, retry: RetryPolicy = None, backend_factory=create_backend,
+                 manifest_dir: Path = MANIFEST_DIR, metrics: MetricsRecorder = None, history=None,
+                 budget: BudgetTracker = None, candidates: int = 1, scorer=None, accept: float = 1.0,
+                 hedge: bool = False, hedge_percentile: float = 90, hedge_after: float = 60.0,
+                 rate_limiter: SharedRateLimiter = None, similar=None):
+        # Best-of-N: `candidates` concurrent requests per slide, scored by `scorer`
+        # (see slidegen.scoring); the first one scoring >= `accept` wins
+        self.candidates = max(1, candidates)
+        self.scorer = scorer
+        self.accept = accept
+        if self.candidates > 1:
+            if scorer is None:
+                raise ValueError("best-of-N generation needs a scorer")
+            check_scorer(scorer)
+        # Hedging: after the primary's p<hedge_percentile> latency (from history, else
+        # `hedge_after` seconds) the next model of the deck's fallback chain is asked too
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self._hedge_delays = {}
+        if hedge and self.candidates > 1:
+            print("⚠️ Hedging is ignored with best-of-N candidates")
+        self.cache = cache
+        self.budget = budget
+        # Host-wide requests per minute, shared with other processes (see slidegen.ratelimit)
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        # Optional slidegen.history.HistoryStore: one row per finished slide
+        self.history = history
+        # Optional slidegen.similar.SimilarityIndex consulted on exact cache misses
+        self.similar = similar
+        # Without an explicit scheduler, `concurrency` is a fixed limit
+        self.scheduler = scheduler or AIMDScheduler(initial=concurrency, maximum=concurrency)
+        self.retry = retry or RetryPolicy()
+        self.backend_factory = backend_factory
+        self.manifest_dir = Path(manifest_dir)
+        self._backends = {}
+        self._manifests = {}
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slidegen-io")
+
+    def backend_for(self, deck: Deck) -> Backend:
+        key = (deck.backend, deck.model, deck.model_candidates, repr(deck.generation_config))
+        if key not in self._backends:
+            self._backends[key] = self.backend_factory(deck)
+        return self._backends[key]
+
+    def chain_for(self, deck: Deck) -> list:
+        """Backends for the deck's model followed by its fallback models"""
+        chain = [self.backend_for(deck)]
+        for model in deck.fallback_models:
+            chain.append(self.backend_for(replace(deck, model=model, model_candidates=(), fallback_models=())))
+        return chain
+
+    async def prepare(self, deck: Deck) -> Backend:
+        """The deck's backend (and hedging chain) with blocking set-up such as model discovery done
+        in a worker thread; model_name is only read afterwards"""
+        chain = self.chain_for(deck) if self.hedge and deck.fallback_models else [self.backend_for(deck)]
+        for backend in chain:
+            await backend.prepare()
+        return chain[0]
+
+    def hedge_delay(self, model: str) -> float:
+        if model not in self._hedge_delays:
+            delay = None
+            if self.history is not None:
+                delay = self.history.latency_percentile(model, self.hedge_percentile)
+            self._hedge_delays[model] = delay or self.hedge_after
+        return self._hedge_delays[model]
+
+    async def io(self, func, *args):
+        """Run blocking bookkeeping on the engine's I/O thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._io, func, *args)
+
+    def manifest_for(self, deck: Deck) -> RunManifest:
+        if deck.name not in self._manifests:
+            self._manifests[deck.name] = RunManifest.load(self.manifest_dir / f"{deck.name}.json", deck.name,
+                                                          limit=deck.metadata.get("manifest_limit"))
+        return self._manifests[deck.name]
+
+    def compact_manifests(self) -> None:
+        """Fold each manifest's change log into its snapshot (end of a run)"""
+        for manifest in self._manifests.values():
+            manifest.compact()
+
+    def restore_from_cache(self, key: str, slide: Slide, deck: Deck) -> bool:
+        """Copy a cached image into place for this slide; True on a cache hit"""
+        output_path = deck.output_path(slide)
+        if self.cache.restore(key, output_path) is None:
+            return False
+
+        print(f"  ♻️ Cached: {output_path.name}")
+        return True
+
+    def restore_similar(self, key: str, slide: Slide, deck: Deck, backend: Backend) -> bool:
+        """On an exact miss, restore (or with an offer-only index, report) the image of a near-identical prompt"""
+        prompt = deck.prompt_separator + slide.prompt
+        for match in self.similar.matches(backend.model_name, deck.style_prefix, prompt, exclude=key):
+            if not self.similar.reuse:
+                print(f"  💡 Similar ({match.score:.2f}) to cached {match.deck}:{match.slide}; generating anyway")
+                return False
+            texts = self.cache.restore(match.key, deck.output_path(slide))
+            if texts is None:
+                continue
+            print(f"  ♻️ Reused {match.deck}:{match.slide} (similarity {match.score:.2f})")
+            # Later runs hit the exact cache
+            self.cache.put_file(key, deck.output_path(slide), texts, model=backend.model_name, similar_to=match.key)
+            self.similar.add(key, backend.model_name, deck.style_prefix, prompt, deck.name, slide.id)
+            return True
+        return False
+
+    def record(self, deck: Deck, slide: Slide, backend: Backend, outcome: str, timing: dict = None,
+               error: BaseException = None, **fields) -> None:
+        if self.metrics is None:
+            return
+        timing = timing or {}
+        attempt = timing.get("attempt", 0)
+        self.metrics.record(
+            deck=deck.name,
+            slide=slide.id,
+            fingerprint=deck.fingerprint(slide),
+            model=backend.model_name,
+            attempt=attempt,
+            retries=max(0, attempt - 1),
+            outcome=outcome,
+            status=status_code(error) if error is not None else None,
+            error=f"{type(error).__name__}: {error}" if error is not None else None,
+            queue_wait_s=timing.get("queue_wait_s"),
+            ttfb_s=timing.get("ttfb_s"),
+            latency_s=timing.get("latency_s"),
+            **fields,
+        )
+
+    def remember(self, deck: Deck, slide: Slide, backend: Backend, status: str, started: float,
+                 source: str = None, attempts: int = 0, error: str = None, **fields) -> None:
+        if self.history is None:
+            return
+        entry = self.manifest_for(deck).slides.get(slide.id, {}) if status == OK else {}
+        self.history.add(
+            run_id=self.metrics.run_id if self.metrics is not None else None,
+            deck=deck.name,
+            slide=slide.id,
+            fingerprint=deck.fingerprint(slide),
+            prompt_hash=hashlib.sha256(deck.full_prompt(slide).encode("utf-8")).hexdigest(),
+            model=backend.model_name,
+            status=status,
+            source=source,
+            attempts=attempts,
+            duration_s=round(time.perf_counter() - started, 4),
+            output_sha256=entry.get("sha256"),
+            output_bytes=entry.get("bytes"),
+            error=error,
+            **fields,
+        )
+
+    def save_response(self, response, slide: Slide, deck: Deck, output_path: Path = None) -> tuple[Path, list]:
+        """Stream the first image part of a validated response to the deck's output directory
+
+        Returns the output path and the response's text parts.
+        """
+        texts = text_parts(response)
+        for text in texts:
+            print(f"  Text: {text[:100]}...")
+
+        output_path = output_path or deck.output_path(slide)
+        written = write_inline_data(image_parts(response)[0], output_path)
+        print(f"  ✅ Saved: {output_path.name} ({written / 1024:.1f} KB)")
+        return output_path, texts
+
+    @staticmethod
+    def check_response(response) -> None:
+        if image_parts(response):
+            return
+        reason = blocked_reason(response)
+        if reason:
+            raise BlockedError(reason)
+        raise EmptyImageError("no image in response")
+
+    async def attempt(self, backend: Backend, prompt: str, timing: dict = None):
+        """One request inside a scheduler slot, bounded by the per-request timeout
+
+        ``timing`` receives queue_wait_s, ttfb_s and the perf_counter ``sent`` mark,
+        and the budget ``reservation`` that the caller settles with charge().
+        """
+        timing = {} if timing is None else timing
+        if self.budget is not None:
+            # Reserved before queueing for a slot, so waiting requests cannot overshoot the limit.
+            # Budget updates lock and rewrite budget.json: kept off the event loop
+            timing["reservation"] = await asyncio.to_thread(self.budget.reserve, backend.model_name, prompt)
+        try:
+            return await self._attempt(backend, prompt, timing)
+        except BaseException:
+            if self.budget is not None:
+                await asyncio.to_thread(self.budget.release, timing.pop("reservation"), "sent" in timing)
+            raise
+
+    async def _attempt(self, backend: Backend, prompt: str, timing: dict):
+        queued = time.perf_counter()
+        async with self.scheduler.slot() as slot:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            timing["sent"] = time.perf_counter()
+            timing["queue_wait_s"] = round(timing["sent"] - queued, 4)
+            try:
+                response = await asyncio.wait_for(backend.generate(prompt), self.retry.request_timeout)
+                self.check_response(response)
+                return response
+            except Exception as e:
+                if is_throttle(e):
+                    slot.throttled(retry_after(e))
+                    if self.rate_limiter is not None and retry_after(e):
+                        await asyncio.to_thread(self.rate_limiter.pause, retry_after(e))
+                else:
+                    slot.failed()
+                raise
+            finally:
+                timing["ttfb_s"] = timing["latency_s"] = round(time.perf_counter() - timing["sent"], 4)
+
+    async def request(self, backend: Backend, prompt: str, slide: Slide, deck: Deck) -> tuple:
+        """Call the backend with retries; returns (response, timing of the successful attempt)
+
+        Raises GenerationError once retries are exhausted or the error is permanent.
+        """
+        delay = self.retry.base_delay
+        for attempt in range(1, self.retry.max_attempts + 1):
+            timing = {"attempt": attempt}
+            try:
+                return await self.attempt(backend, prompt, timing), timing
+            except BudgetExhausted:
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = asyncio.TimeoutError(f"no response within {self.retry.request_timeout}s")
+                if not is_retryable(e) or attempt == self.retry.max_attempts:
+                    kind = "gave up after" if is_retryable(e) else "permanent error on"
+                    message = f"{kind} attempt {attempt}: {type(e).__name__}: {e}"
+                    print(f"  ❌ Error ({slide.id}, {message})")
+                    self.record(deck, slide, backend, FAILED, timing, error=e)
+                    raise GenerationError(message, attempts=attempt, retryable=is_retryable(e)) from e
+                self.record(deck, slide, backend, RETRY, timing, error=e)
+
+                delay = self.retry.next_delay(delay)
+                wait = max(delay, retry_after(e) or 0)
+                throttled = f", window now {self.scheduler.window:.2f}" if is_throttle(e) else ""
+                print(f"  🔁 Retry {attempt}/{self.retry.max_attempts - 1} ({slide.id}) in {wait:.1f}s"
+                      f"{throttled}: {type(e).__name__}: {e}")
+                await asyncio.sleep(wait)
+
+    async def generate_one(self, backend: Backend, prompt: str, slide: Slide, deck: Deck, output_path: Path,
+                           index: int = 1) -> Candidate:
+        """Request (with retries) and save one image to ``output_path``"""
+        response, timing = await self.request(backend, prompt, slide, deck)
+        tokens = usage_tokens(response)
+        if self.budget is not None:
+            await asyncio.to_thread(self.budget.charge, backend.model_name, tokens["prompt_tokens"],
+                                    tokens["output_tokens"], prompt, timing.pop("reservation"))
+        try:
+            output_path, texts = self.save_response(response, slide, deck, output_path)
+            timing["latency_s"] = round(time.perf_counter() - timing["sent"], 4)
+            # Release the response (and its inline image buffer) before anything else
+            del response
+
+            candidate = Candidate(index, output_path, texts, timing, tokens)
+            if self.candidates > 1:
+                candidate.score = await asyncio.to_thread(self.scorer, output_path)
+                print(f"  🎯 Candidate {index} ({slide.id}): score {candidate.score:.3f}")
+        except Exception as e:
+            # A failed save or scorer fails this candidate (or slide), not the whole run
+            message = f"could not save or score the image: {type(e).__name__}: {e}"
+            print(f"  ❌ Error ({slide.id}, {message})")
+            self.record(deck, slide, backend, FAILED, timing, error=e)
+            raise GenerationError(message, attempts=timing["attempt"], retryable=is_retryable(e)) from e
+        extra = {"candidate": index, "score": candidate.score} if self.candidates > 1 else {}
+        self.record(deck, slide, backend, OK, timing, image_bytes=output_path.stat().st_size,
+                    text_bytes=sum(len(text.encode("utf-8")) for text in texts), **tokens, **extra)
+        return candidate
+
+    async def best_of(self, backend: Backend, prompt: str, slide: Slide, deck: Deck) -> Candidate:
+        """Run ``candidates`` requests concurrently and copy the best image into place
+
+        Every finished candidate is kept in candidates_dir(); as soon as one
+        scores at least ``accept`` the others still in flight are cancelled.
+        """
+        side_dir = candidates_dir(deck, slide)
+        shutil.rmtree(side_dir, ignore_errors=True)
+        side_dir.mkdir(parents=True)
+
+        tasks = [
+            asyncio.create_task(self.generate_one(backend, prompt, slide, deck, side_dir / f"{i:02d}.png", i))
+            for i in range(1, self.candidates + 1)
+        ]
+        finished, errors = [], []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    candidate = await next_done
+                except (GenerationError, BudgetExhausted) as e:
+                    errors.append(e)
+                    continue
+                finished.append(candidate)
+                if candidate.score >= self.accept:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not finished:
+            # Deferral wins over failure: the slide was not really tried
+            raise next((e for e in errors if isinstance(e, BudgetExhausted)), errors[-1])
+
+        best = max(finished, key=lambda c: c.score)
+        cancelled = self.candidates - len(finished) - len(errors)
+        print(f"  🏆 Best of {len(finished)} ({slide.id}): candidate {best.index}, score {best.score:.3f}"
+              + (f", {cancelled} cancelled" if cancelled else ""))
+        atomic_write(side_dir / "scores.json", json.dumps({
+            "accept": self.accept,
+            "chosen": best.path.name,
+            "scores": {c.path.name: c.score for c in sorted(finished, key=lambda c: c.index)},
+            "failed": len(errors),
+            "cancelled": cancelled,
+        }, indent=2).encode("utf-8"))
+
+        output_path = deck.output_path(slide)
+        atomic_copy(best.path, output_path)
+        best.timing["attempt"] = sum(c.timing["attempt"] for c in finished) + sum(
+            getattr(e, "attempts", 0) for e in errors)
+        return Candidate(best.index, output_path, best.texts, best.timing, best.tokens, best.score)
+
+    async def hedged(self, deck: Deck, slide: Slide, prompt: str) -> tuple[Candidate, Backend]:
+        """Race the deck's model chain: each next model starts once the previous
+        one has not answered within its hedge delay (or has failed for good).
+
+        The first valid image wins and is moved into place; requests still in
+        flight are cancelled. Returns the winner and its backend.
+        """
+        chain = self.chain_for(deck)
+        output_path = deck.output_path(slide)
+        pending = {}
+        errors = []
+
+        def launch(i: int) -> None:
+            side_path = output_path.with_name(f".{output_path.stem}.hedge{i}{output_path.suffix}")
+            task = asyncio.create_task(self.generate_one(chain[i], prompt, slide, deck, side_path, i + 1))
+            pending[task] = i
+            if i:
+                print(f"  ⏱️ Hedging ({slide.id}) with {chain[i].model_name}")
+
+        launch(0)
+        launched = 1
+        winner = None
+        try:
+            while pending and winner is None:
+                timeout = self.hedge_delay(chain[launched - 1].model_name) if launched < len(chain) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch(launched)
+                    launched += 1
+                    continue
+                for task in done:
+                    i = pending.pop(task)
+                    try:
+                        winner = (task.result(), i)
+                        break
+                    except (GenerationError, BudgetExhausted) as e:
+                        errors.append(e)
+                if winner is None and not pending and launched < len(chain):
+                    launch(launched)
+                    launched += 1
+        finally:
+            for task, i in pending.items():
+                task.cancel()
+                self.record(deck, slide, chain[i], CANCELLED)
+            await asyncio.gather(*pending, return_exceptions=True)
+            for i in range(launched):
+                side_path = output_path.with_name(f".{output_path.stem}.hedge{i}{output_path.suffix}")
+                if winner is None or i != winner[1]:
+                    side_path.unlink(missing_ok=True)
+
+        if winner is None:
+            raise next((e for e in errors if isinstance(e, BudgetExhausted)), errors[-1])
+
+        result, i = winner
+        os.replace(result.path, output_path)
+        if i:
+            print(f"  ↪️ Fallback ({slide.id}): {chain[i].model_name} answered before {chain[0].model_name}")
+        result.timing["attempt"] += sum(getattr(e, "attempts", 0) for e in errors)
+        return replace(result, path=output_path), chain[i]
+
+    async def generate_slide(self, deck: Deck, slide: Slide, index: int, refresh: bool = False,
+                             resume: bool = False) -> bool | None:
+        """Generate a single slide image; None when it was deferred for lack of budget"""
+        print(f"Generating Slide {index + 1}/{len(deck.slides)}: {slide.title}")
+
+        backend = await self.prepare(deck)
+        manifest = self.manifest_for(deck)
+        full_prompt = deck.full_prompt(slide)
+
+        key = cache_key(full_prompt, backend.model_name, backend.config)
+        if resume and not refresh and await self.io(manifest.is_complete, slide.id, key, deck.output_path(slide)):
+            print(f"  ⏭️ Already complete: {deck.output_path(slide).name}")
+            return True
+
+        started = time.perf_counter()
+        await self.io(manifest.start, slide.id, key, deck.fingerprint(slide))
+        if self.cache is not None and not refresh:
+            if await self.io(self.restore, key, slide, deck, backend, started):
+                if self.budget is not None:
+                    await asyncio.to_thread(self.budget.completed, deck, slide.id)
+                return True
+
+        primary = backend
+        try:
+            if self.candidates > 1:
+                result = await self.best_of(backend, full_prompt, slide, deck)
+            elif self.hedge and deck.fallback_models:
+                result, backend = await self.hedged(deck, slide, full_prompt)
+            else:
+                result = await self.generate_one(backend, full_prompt, slide, deck, deck.output_path(slide))
+        except BudgetExhausted as e:
+            print(f"  ⏸️ Deferred ({slide.id}): {e}")
+            await self.io(manifest.deferred, slide.id, str(e))
+            await asyncio.to_thread(self.budget.defer, deck, slide.id)
+            return None
+        except GenerationError as e:
+            await self.io(self.failed, deck, slide, backend, started, e)
+            return False
+
+        if self.budget is not None:
+            await asyncio.to_thread(self.budget.completed, deck, slide.id)
+        await self.io(self.store, key, result, deck, slide, full_prompt, backend, primary, started)
+        return True
+
+    def restore(self, key: str, slide: Slide, deck: Deck, backend: Backend, started: float) -> str | None:
+        """Restore the slide from the exact or similarity cache and record it; the source or None (I/O thread)"""
+        source = None
+        if self.restore_from_cache(key, slide, deck):
+            source = "cache"
+            if self.similar is not None and key not in self.similar:
+                self.similar.add(key, backend.model_name, deck.style_prefix,
+                                 deck.prompt_separator + slide.prompt, deck.name, slide.id)
+        elif self.similar is not None and self.restore_similar(key, slide, deck, backend):
+            source = "similar"
+        if source:
+            self.manifest_for(deck).done(slide.id, deck.output_path(slide), source=source)
+            self.record(deck, slide, backend, CACHE, image_bytes=deck.output_path(slide).stat().st_size)
+            self.remember(deck, slide, backend, OK, started, source=source)
+        return source
+
+    def failed(self, deck: Deck, slide: Slide, backend: Backend, started: float, e: GenerationError) -> None:
+        """Record a failed slide (I/O thread)"""
+        self.manifest_for(deck).failed(slide.id, str(e), retryable=e.retryable)
+        self.remember(deck, slide, backend, FAILED, started, attempts=e.attempts, error=str(e))
+
+    def store(self, key: str, result: Candidate, deck: Deck, slide: Slide, full_prompt: str, backend: Backend,
+              primary: Backend, started: float) -> None:
+        """Cache and record a generated slide (I/O thread)"""
+        manifest = self.manifest_for(deck)
+        fallback_from = primary.model_name if backend is not primary else None
+        if self.cache is not None:
+            # Keyed on the model that actually answered, so a fallback image never poses as the primary's
+            if fallback_from:
+                key = cache_key(full_prompt, backend.model_name, backend.config)
+            self.cache.put_file(key, result.path, result.texts, model=backend.model_name)
+            if self.similar is not None:
+                self.similar.add(key, backend.model_name, deck.style_prefix, deck.prompt_separator + slide.prompt,
+                                 deck.name, slide.id)
+        manifest.done(slide.id, result.path, source="fallback" if fallback_from else "model")
+        self.remember(deck, slide, backend, OK, started, source="model", attempts=result.timing["attempt"],
+                      prompt_tokens=result.tokens["prompt_tokens"], output_tokens=result.tokens["output_tokens"],
+                      fallback_from=fallback_from)
+
+    async def generate_decks(self, decks: list, refresh=frozenset(), resume: bool = False) -> dict:
+        """Generate every slide of every deck; results per deck are in slide order
+
+        Each result is True (generated or restored), False (failed) or None
+        (deferred because the budget ran out).
+
+        ``refresh`` holds slide ids (or ``deck:id``) that bypass the cache and
+        the manifest. With ``resume``, slides the manifest records as complete
+        (same inputs, unchanged output) are skipped.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.retry.run_timeout if self.retry.run_timeout else None
+
+        async def run(deck: Deck, slide: Slide, index: int) -> bool:
+            forced = slide.id in refresh or f"{deck.name}:{slide.id}" in refresh
+            remaining = deadline - loop.time() if deadline is not None else None
+            try:
+                return await asyncio.wait_for(
+                    self.generate_slide(deck, slide, index, refresh=forced, resume=resume), remaining,
+                )
+            except asyncio.TimeoutError:
+                print(f"  ❌ Error ({slide.id}): run deadline of {self.retry.run_timeout}s exceeded")
+                await self.io(self.manifest_for(deck).failed, slide.id, "run deadline exceeded")
+                self.record(deck, slide, self.backend_for(deck), FAILED,
+                            error=asyncio.TimeoutError("run deadline exceeded"))
+                return False
+
+        for deck in decks:
+            deck.output_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            results = await asyncio.gather(*(
+                asyncio.gather(*(run(deck, slide, i) for i, slide in enumerate(deck.slides)))
+                for deck in decks
+            ))
+        finally:
+            self.compact_manifests()
+        return {deck.name: list(deck_results) for deck, deck_results in zip(decks, results)}
+
+    def generate(self, decks: list, refresh=frozenset(), resume: bool = False) -> dict:
+        return asyncio.run(self.generate_decks(decks, refresh, resume))
@@ -0,0 +1,95 @@
+"""
+Classification of SDK errors
+
+google-genai raises errors.APIError subclasses carrying an HTTP ``code``;
+google.generativeai surfaces google.api_core exceptions whose ``code`` is an
+HTTP status as well. Both are inspected by duck typing so neither SDK has to
+be importable.
+"""
+
+import asyncio
+import re
+
+THROTTLE_STATUSES = (429, 503)
+# Bad request, auth, unknown model: retrying cannot help
+PERMANENT_STATUSES = (400, 401, 403, 404)
+# Transport errors from the HTTP stacks both SDKs sit on
+NETWORK_ERROR_MODULES = ("httpx", "httpcore", "aiohttp", "requests", "urllib3")
+
+
+class GenerationError(Exception):
+    """A slide could not be generated: retries exhausted or a permanent error"""
+
+    def __init__(self, message: str, attempts: int = 0, retryable: bool = True):
+        super().__init__(message)
+        self.attempts = attempts
+        # False for permanent errors (blocked prompt, 400...): trying again later will not help
+        self.retryable = retryable
+
+
+class EmptyImageError(Exception):
+    """The model answered without an image part (transient)"""
+
+
+class BlockedError(Exception):
+    """The prompt or the candidate was blocked by a safety filter (permanent)"""
+
+
+def status_code(exc: BaseException) -> int | None:
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+        # api_core may hand back an HTTPStatus or a grpc StatusCode
+        if hasattr(value, "value") and isinstance(value.value, int):
+            return value.value
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_throttle(exc: BaseException) -> bool:
+    return status_code(exc) in THROTTLE_STATUSES
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Network errors, timeouts, 408/429/5xx and empty image parts are worth retrying"""
+    if isinstance(exc, BlockedError):
+        return False
+    if isinstance(exc, (EmptyImageError, asyncio.TimeoutError, ConnectionError)):
+        return True
+
+    code = status_code(exc)
+    if code is not None:
+        if code in PERMANENT_STATUSES:
+            return False
+        return code == 408 or code in THROTTLE_STATUSES or code >= 500
+
+    return any(
+        cls.__module__.split(".")[0] in NETWORK_ERROR_MODULES for cls in type(exc).__mro__
+    ) or isinstance(exc, OSError)
+
+
+def _seconds(value) -> float | None:
+    if value is None:
+        return None
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*s?\s*", str(value))
+    return float(match.group(1)) if match else None
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the server asked us to wait, from Retry-After or a google.rpc.RetryInfo detail"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        delay = _seconds(headers.get("retry-after") or headers.get("Retry-After"))
+        if delay is not None:
+            return delay
+
+    details = getattr(exc, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details", [])
+    for detail in details or []:
+        if isinstance(detail, dict) and str(detail.get("@type", "")).endswith("RetryInfo"):
+            return _seconds(detail.get("retryDelay"))
+    return None
@@ -0,0 +1,251 @@
+"""
+Generation history in SQLite
+
+Every finished slide (from the model, from the cache, or failed) is a row
+in .cache/history.sqlite3, indexed by slide, model and time, so questions
+that span runs can be answered with SQL or the query CLI:
+
+    python -m slidegen.history latency --model gemini-3-pro-image --days 7
+    python -m slidegen.history failures --days 30
+    python -m slidegen.history trend --days 14
+    python -m slidegen.history fallbacks --days 7
+    python -m slidegen.history recent --limit 20
+
+The database uses WAL mode so concurrent runs can append while it is queried.
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from .config import CACHE_DIR
+from .metrics import percentile
+
+DEFAULT_HISTORY_PATH = CACHE_DIR / "history.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    run_id TEXT,
+    deck TEXT NOT NULL,
+    slide TEXT NOT NULL,
+    fingerprint TEXT,
+    prompt_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    source TEXT,
+    attempts INTEGER,
+    duration_s REAL,
+    output_sha256 TEXT,
+    output_bytes INTEGER,
+    prompt_tokens INTEGER,
+    output_tokens INTEGER,
+    error TEXT,
+    fallback_from TEXT
+);
+CREATE INDEX IF NOT EXISTS generations_slide_ts ON generations (slide, ts);
+CREATE INDEX IF NOT EXISTS generations_model_ts ON generations (model, ts);
+CREATE INDEX IF NOT EXISTS generations_ts ON generations (ts);
+"""
+
+COLUMNS = (
+    "ts", "run_id", "deck", "slide", "fingerprint", "prompt_hash", "model", "status", "source", "attempts",
+    "duration_s", "output_sha256", "output_bytes", "prompt_tokens", "output_tokens", "error", "fallback_from",
+)
+
+OK = "ok"
+FAILED = "failed"
+
+
+class HistoryStore:
+    def __init__(self, path: Path = DEFAULT_HISTORY_PATH, run_id: str = None):
+        self.path = Path(path)
+        self.run_id = run_id
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Rows are added from the engine's I/O thread
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        existing = {row["name"] for row in self.db.execute("PRAGMA table_info(generations)")}
+        for column in ("fallback_from",):
+            if column not in existing:
+                self.db.execute(f"ALTER TABLE generations ADD COLUMN {column} TEXT")
+
+    def add(self, **row) -> None:
+        row.setdefault("ts", time.time())
+        row.setdefault("run_id", self.run_id)
+        values = [row.get(column) for column in COLUMNS]
+        with self.db:
+            self.db.execute(
+                f"INSERT INTO generations ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", values,
+            )
+
+    def rows(self, days: float = 0, model: str = None, slide: str = None) -> list:
+        where, params = [], []
+        if days:
+            where.append("ts >= ?")
+            params.append(time.time() - days * 86400)
+        if model:
+            where.append("model LIKE ?")
+            params.append(f"%{model}%")
+        if slide:
+            where.append("slide = ?")
+            params.append(slide)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        return self.db.execute(f"SELECT * FROM generations{clause} ORDER BY ts", params).fetchall()
+
+    def latency(self, days: float = 7, model: str = None) -> dict:
+        """{model: {"count", "p50", "p95", "p99", "max"}} over model-generated slides"""
+        durations = defaultdict(list)
+        for row in self.rows(days, model):
+            if row["status"] == OK and row["source"] == "model" and row["duration_s"] is not None:
+                durations[row["model"]].append(row["duration_s"])
+        return {
+            name: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+                "max": max(values),
+            }
+            for name, values in sorted(durations.items())
+        }
+
+    def latency_percentile(self, model: str, q: float, days: float = 7, minimum: int = 5) -> float | None:
+        """Duration percentile of single-attempt generations of ``model``; None with too little history"""
+        durations = [row["duration_s"] for row in self.rows(days, model)
+                     if row["status"] == OK and row["source"] == "model" and row["attempts"] == 1
+                     and row["model"] == model and row["duration_s"] is not None]
+        return percentile(durations, q) if len(durations) >= minimum else None
+
+    def attempts_per_slide(self, days: float = 30, model: str = None) -> float | None:
+        """Average requests per generated or failed slide, for planning"""
+        attempts = [row["attempts"] for row in self.rows(days, model)
+                    if (row["source"] == "model" or row["status"] == FAILED) and row["attempts"]]
+        return sum(attempts) / len(attempts) if attempts else None
+
+    def failures(self, days: float = 30, limit: int = 10) -> list:
+        """Slides ranked by failed generations: (deck, slide, failed, total, last_error)"""
+        since = time.time() - days * 86400 if days else 0
+        return self.db.execute(
+            """
+            SELECT deck, slide,
+                   SUM(status = ?) AS failed,
+                   COUNT(*) AS total,
+                   (SELECT error FROM generations AS g
+                    WHERE g.deck = generations.deck AND g.slide = generations.slide AND g.status = ?
+                    ORDER BY ts DESC LIMIT 1) AS last_error
+            FROM generations WHERE ts >= ?
+            GROUP BY deck, slide HAVING failed > 0
+            ORDER BY failed DESC, CAST(failed AS REAL) / total DESC
+            LIMIT ?
+            """,
+            (FAILED, FAILED, since, limit),
+        ).fetchall()
+
+    def fallbacks(self, days: float = 7) -> list:
+        """How often each model was replaced by a hedged fallback: (fallback_from, model, count)"""
+        since = time.time() - days * 86400 if days else 0
+        return self.db.execute(
+            """
+            SELECT fallback_from, model, COUNT(*) AS count FROM generations
+            WHERE fallback_from IS NOT NULL AND ts >= ?
+            GROUP BY fallback_from, model ORDER BY count DESC
+            """,
+            (since,),
+        ).fetchall()
+
+    def trend(self, days: float = 14, model: str = None) -> list:
+        """Per day and model: generations, failure rate, p95 duration and tokens"""
+        days_rows = defaultdict(list)
+        for row in self.rows(days, model):
+            days_rows[time.strftime("%Y-%m-%d", time.localtime(row["ts"])), row["model"]].append(row)
+
+        trend = []
+        for (day, name), rows in sorted(days_rows.items()):
+            generated = [r for r in rows if r["source"] == "model" or r["status"] == FAILED]
+            durations = [r["duration_s"] for r in generated if r["status"] == OK and r["duration_s"] is not None]
+            failed = sum(r["status"] == FAILED for r in rows)
+            trend.append({
+                "day": day,
+                "model": name,
+                "generated": len(generated),
+                "cached": sum(r["source"] == "cache" for r in rows),
+                "failure_rate": failed / len(generated) if generated else 0.0,
+                "p95": percentile(durations, 95) if durations else None,
+                "tokens": sum((r["prompt_tokens"] or 0) + (r["output_tokens"] or 0) for r in rows),
+            })
+        return trend
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="slidegen.history", description="Query the generation history")
+    parser.add_argument("--db", type=Path, default=DEFAULT_HISTORY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    latency = commands.add_parser("latency", help="duration percentiles per model")
+    latency.add_argument("--model", help="substring of the model name")
+    latency.add_argument("--days", type=float, default=7)
+
+    failures = commands.add_parser("failures", help="slides that fail most")
+    failures.add_argument("--days", type=float, default=30)
+    failures.add_argument("--limit", type=int, default=10)
+
+    trend = commands.add_parser("trend", help="daily volume, failure rate, p95 and tokens per model")
+    trend.add_argument("--model", help="substring of the model name")
+    trend.add_argument("--days", type=float, default=14)
+
+    fallbacks = commands.add_parser("fallbacks", help="slides answered by a hedged fallback model")
+    fallbacks.add_argument("--days", type=float, default=7)
+
+    recent = commands.add_parser("recent", help="latest generations")
+    recent.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if not args.db.exists():
+        print(f"No history yet at {args.db}")
+        return 1
+    store = HistoryStore(args.db)
+
+    if args.command == "latency":
+        print(f"{'model':<40} {'count':>6} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7}")
+        for name, stats in store.latency(args.days, args.model).items():
+            print(f"{name:<40} {stats['count']:>6} {stats['p50']:>7.2f} {stats['p95']:>7.2f} "
+                  f"{stats['p99']:>7.2f} {stats['max']:>7.2f}")
+    elif args.command == "failures":
+        print(f"{'deck:slide':<40} {'failed':>6} {'total':>6}  last error")
+        for row in store.failures(args.days, args.limit):
+            print(f"{row['deck'] + ':' + row['slide']:<40} {row['failed']:>6} {row['total']:>6}  "
+                  f"{(row['last_error'] or '')[:80]}")
+    elif args.command == "fallbacks":
+        print(f"{'primary':<40} {'answered by':<40} {'count':>6}")
+        for row in store.fallbacks(args.days):
+            print(f"{row['fallback_from']:<40} {row['model']:<40} {row['count']:>6}")
+    elif args.command == "trend":
+        print(f"{'day':<10} {'model':<40} {'gen':>5} {'cached':>6} {'fail %':>6} {'p95 s':>7} {'tokens':>9}")
+        for t in store.trend(args.days, args.model):
+            p95 = f"{t['p95']:.2f}" if t["p95"] is not None else "-"
+            print(f"{t['day']:<10} {t['model']:<40} {t['generated']:>5} {t['cached']:>6} "
+                  f"{t['failure_rate']:>6.1%} {p95:>7} {t['tokens']:>9}")
+    else:
+        for row in reversed(store.db.execute(
+                "SELECT * FROM generations ORDER BY ts DESC LIMIT ?", (args.limit,)).fetchall()):
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["ts"]))
+            duration = f"{row['duration_s']:.2f}s" if row["duration_s"] is not None else "-"
+            print(f"{when}  {row['deck']}:{row['slide']:<28} {row['model']:<36} {row['status']:<6} "
+                  f"{row['source'] or '':<5} {duration:>8}  {row['attempts'] or 0} attempt(s)")
+
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Per-deck run manifest
+
+Records, for every slide, the status of its latest generation, the cache key
+it was generated from, the SHA-256 and size of the output and timings.
+
+Each change appends the slide's entry as one line to ``<deck>.jsonl`` next
+to the ``<deck>.json`` snapshot, so a run of N slides writes O(N) bytes
+instead of rewriting the whole manifest 2N times. Loading replays the log
+over the snapshot (a torn last line from a crash is ignored), so after a
+crash ``--resume`` still knows which outputs are complete. compact() folds
+the log into the snapshot at the end of a run, and whenever the log has
+grown past COMPACT_EVERY lines. A manifest with a ``limit`` (e.g. the
+service's ad-hoc prompts, one new slide id each) keeps only that many of its
+most recently started entries when it is compacted.
+
+Several processes (e.g. --worker) may update the same deck: appends and
+compaction hold an exclusive flock on the log and compaction re-reads both
+files from disk, so no process overwrites entries written by another.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .output import atomic_write, locked
+
+# Log lines after which an update also compacts (bounds replay for long-running services)
+COMPACT_EVERY = 1000
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+# Not attempted because the request/token/cost budget ran out (see slidegen.budget)
+DEFERRED = "deferred"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read(path: Path) -> tuple[dict, int]:
+    try:
+        slides = json.loads(path.read_text(encoding="utf-8")).get("slides", {})
+    except (OSError, ValueError):
+        slides = {}
+    lines = 0
+    try:
+        with open(path.with_suffix(".jsonl"), "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                slides[record["id"]] = record["entry"]
+                lines += 1
+    except OSError:
+        pass
+    return slides, lines
+
+
+def read_slides(path: Path) -> tuple[dict, int]:
+    """Snapshot entries with the log replayed over them, and the number of log lines"""
+    path = Path(path)
+    if not path.with_suffix(".jsonl").exists():
+        return _read(path)
+    with locked(path.with_suffix(".jsonl"), shared=True):
+        return _read(path)
+
+
+class RunManifest:
+    def __init__(self, path: Path, deck: str, slides: dict = None, logged: int = 0, limit: int = None):
+        self.path = Path(path)
+        self.log_path = self.path.with_suffix(".jsonl")
+        self.deck = deck
+        self.slides = slides or {}
+        self.logged = logged
+        self.limit = limit
+
+    @classmethod
+    def load(cls, path: Path, deck: str, limit: int = None) -> "RunManifest":
+        return cls(path, deck, *read_slides(path), limit=limit)
+
+    def save(self, slide_id: str) -> None:
+        """Append the slide's current entry to the log"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({"id": slide_id, "entry": self.slides[slide_id]}, ensure_ascii=False) + "\n"
+        with locked(self.log_path) as fd:
+            os.lseek(fd, 0, os.SEEK_END)
+            os.write(fd, line.encode("utf-8"))
+        self.logged += 1
+        if self.logged >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self) -> None:
+        """Fold the log (this and other processes' changes) into the snapshot and empty it"""
+        if not self.log_path.exists():
+            return
+        with locked(self.log_path) as fd:
+            self.slides, lines = _read(self.path)
+            if self.limit is not None and len(self.slides) > self.limit:
+                newest = sorted(self.slides, key=lambda slide_id: self.slides[slide_id].get("started_at", 0))
+                self.slides = {slide_id: self.slides[slide_id] for slide_id in newest[-self.limit:]}
+            if lines:
+                data = {"deck": self.deck, "updated_at": time.time(), "slides": self.slides}
+                atomic_write(self.path, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+                # Truncated, not unlinked: other processes may be waiting for the lock on this file
+                os.ftruncate(fd, 0)
+        self.logged = 0
+
+    def status(self, slide_id: str) -> str:
+        return self.slides.get(slide_id, {}).get("status", PENDING)
+
+    def is_complete(self, slide_id: str, key: str, output_path: Path) -> bool:
+        """Done with the same inputs, and the output on disk is the one that was recorded"""
+        entry = self.slides.get(slide_id)
+        if not entry or entry.get("status") != DONE or entry.get("key") != key:
+            return False
+        try:
+            return file_sha256(output_path) == entry.get("sha256")
+        except OSError:
+            return False
+
+    def start(self, slide_id: str, key: str, fingerprint: str = "") -> None:
+        self.slides[slide_id] = {"status": RUNNING, "key": key, "fingerprint": fingerprint, "started_at": time.time()}
+        self.save(slide_id)
+
+    def _finish(self, slide_id: str, **fields) -> None:
+        entry = self.slides.setdefault(slide_id, {})
+        finished = time.time()
+        entry.update(fields, finished_at=finished)
+        if "started_at" in entry:
+            entry["duration"] = round(finished - entry["started_at"], 3)
+        self.save(slide_id)
+
+    def done(self, slide_id: str, output_path: Path, source: str) -> None:
+        self._finish(
+            slide_id,
+            status=DONE,
+            source=source,
+            output=str(output_path),
+            sha256=file_sha256(output_path),
+            bytes=output_path.stat().st_size,
+            error=None,
+        )
+
+    def rewritten(self, slide_id: str, output_path: Path) -> bool:
+        """Re-record the hash and size of a done slide's output after it was rewritten (e.g. optimized)"""
+        entry = self.slides.get(slide_id)
+        if not entry or entry.get("status") != DONE:
+            return False
+        entry.update(sha256=file_sha256(output_path), bytes=output_path.stat().st_size)
+        self.save(slide_id)
+        return True
+
+    def failed(self, slide_id: str, error: str, retryable: bool = True) -> None:
+        self._finish(slide_id, status=FAILED, error=error, retryable=retryable)
+
+    def deferred(self, slide_id: str, reason: str) -> None:
+        self._finish(slide_id, status=DEFERRED, error=reason)
@@ -0,0 +1,172 @@
+"""
+Structured per-attempt metrics
+
+Every model attempt (and every cache hit) becomes one JSON line in
+.cache/metrics.jsonl, appended across runs:
+
+    ts, run_id, deck, slide, fingerprint, model, attempt, retries, outcome,
+    status, error, queue_wait_s, ttfb_s, latency_s, image_bytes, text_bytes,
+    prompt_tokens, output_tokens, total_tokens
+
+``outcome`` is ok, cache, retry (failed, will be retried), failed (final) or
+cancelled (a hedged request that lost to another model).
+``ttfb_s`` is the time until the SDK response object arrived, ``latency_s``
+adds decoding and writing the image. With ``--prom-textfile`` the run's
+counters and latency histograms are also written in the Prometheus text
+format for node_exporter's textfile collector.
+
+    python -m slidegen --summary --days 7    # p50/p95 latency and failure rate per model
+"""
+
+import json
+import math
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from .config import CACHE_DIR
+from .output import atomic_write
+
+DEFAULT_METRICS_PATH = CACHE_DIR / "metrics.jsonl"
+
+OK = "ok"
+CACHE = "cache"
+RETRY = "retry"
+FAILED = "failed"
+# Lost a hedge or best-of-N race and was cancelled in flight
+CANCELLED = "cancelled"
+
+LATENCY_BUCKETS = (1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRecorder:
+    def __init__(self, path: Path = DEFAULT_METRICS_PATH, prom_path: Path = None, run_id: str = None):
+        self.path = Path(path) if path else None
+        self.prom_path = Path(prom_path) if prom_path else None
+        self.run_id = run_id or time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        self.records = []
+        self._file = None
+
+    def record(self, **fields) -> dict:
+        entry = {"ts": round(time.time(), 3), "run_id": self.run_id, **fields}
+        self.records.append(entry)
+        if self.path:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            # One write per line so concurrent runs appending to the file do not interleave
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+        return entry
+
+    def prometheus(self) -> str:
+        attempts = defaultdict(int)
+        counters = defaultdict(float)
+        histograms = {"latency_s": defaultdict(list), "ttfb_s": defaultdict(list)}
+        for r in self.records:
+            base = (r["deck"], r["model"])
+            attempts[base + (r["outcome"],)] += 1
+            if r["outcome"] == CACHE:
+                continue
+            counters["slidegen_image_bytes_total", base] += r.get("image_bytes", 0)
+            counters["slidegen_text_bytes_total", base] += r.get("text_bytes", 0)
+            counters["slidegen_retries_total", base] += r["outcome"] == RETRY
+            for kind in ("prompt", "output", "total"):
+                counters[f"slidegen_{kind}_tokens_total", base] += r.get(f"{kind}_tokens", 0)
+            for field, values in histograms.items():
+                if r.get(field) is not None:
+                    values[r["model"]].append(r[field])
+
+        lines = [
+            "# HELP slidegen_attempts_total Slide generation attempts (and cache hits) by outcome",
+            "# TYPE slidegen_attempts_total counter",
+        ]
+        for (deck, model, outcome), count in sorted(attempts.items()):
+            lines.append(f"slidegen_attempts_total{_labels(deck=deck, model=model, outcome=outcome)} {count}")
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, (deck, model)), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(deck=deck, model=model)} {value:g}")
+
+        for field, per_model in histograms.items():
+            name = f"slidegen_request_{field[:-2]}_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for model, values in sorted(per_model.items()):
+                for bound in LATENCY_BUCKETS:
+                    count = sum(1 for v in values if v <= bound)
+                    lines.append(f"{name}_bucket{_labels(model=model, le=f'{bound:g}')} {count}")
+                lines.append(f"{name}_bucket{_labels(model=model, le='+Inf')} {len(values)}")
+                lines.append(f"{name}_sum{_labels(model=model)} {sum(values):.3f}")
+                lines.append(f"{name}_count{_labels(model=model)} {len(values)}")
+
+        lines += [
+            "# TYPE slidegen_last_run_timestamp_seconds gauge",
+            f"slidegen_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.prom_path:
+            # The textfile collector must never see a half-written file
+            self.prom_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.prom_path, self.prometheus().encode("utf-8"))
+
+
+def load_records(path: Path = DEFAULT_METRICS_PATH, since: float = 0.0) -> list:
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("ts", 0) >= since:
+                    records.append(record)
+    except OSError:
+        pass
+    return records
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of a non-empty list: the ceil(q/100 * n)-th smallest value
+
+    >>> percentile(range(1, 11), 50), percentile(range(1, 21), 95), percentile(range(1, 101), 95)
+    (5, 19, 95)
+    >>> percentile(range(1, 101), 7), percentile([3, 1, 2], 0), percentile([3, 1, 2], 100)
+    (7, 1, 3)
+    """
+    ordered = sorted(values)
+    # q * n before dividing, so e.g. 7% of 100 is exactly rank 7
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered) / 100) - 1))]
+
+
+def summarize(records: list) -> None:
+    by_model = defaultdict(list)
+    for r in records:
+        by_model[r.get("model", "")].append(r)
+
+    print(f"{'model':<40} {'ok':>5} {'failed':>6} {'retries':>7} {'fail %':>6} {'p50 s':>7} {'p95 s':>7}")
+    for model, rows in sorted(by_model.items()):
+        latencies = [r["latency_s"] for r in rows if r["outcome"] == OK and r.get("latency_s") is not None]
+        ok = sum(r["outcome"] == OK for r in rows)
+        failed = sum(r["outcome"] == FAILED for r in rows)
+        retries = sum(r["outcome"] == RETRY for r in rows)
+        rate = failed / (ok + failed) if ok + failed else 0.0
+        p50 = f"{percentile(latencies, 50):.2f}" if latencies else "-"
+        p95 = f"{percentile(latencies, 95):.2f}" if latencies else "-"
+        print(f"{model:<40} {ok:>5} {failed:>6} {retries:>7} {rate:>6.1%} {p50:>7} {p95:>7}")
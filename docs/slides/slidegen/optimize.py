@@ -0,0 +1,284 @@
+"""
+Post-generation image optimization
+
+    python -m slidegen.optimize                     # images/ and protocol-images/
+    python -m slidegen.optimize --quantize 256 images/slide_01_title.png
+
+Each file is recompressed losslessly in a ProcessPoolExecutor and only
+replaced when the result is smaller. PNGs go through oxipng when it is on
+PATH, otherwise Pillow's optimizer, otherwise a stdlib re-deflate of the
+IDAT stream. Gemini 3 image models return JPEG data (the generators keep the
+.png name), which is optimized losslessly with jpegtran when available.
+``--quantize`` (lossy, needs Pillow) converts to an N-colour palette PNG.
+
+The SHA-256 of every optimized file is recorded in .cache/optimized.json
+together with the mode of that pass (lossless, or the palette size of
+--quantize); files whose content has not changed since a pass in the same
+mode are skipped.
+
+Rewritten files are re-recorded in the run manifests (SHA-256 and size, so
+--resume and catalog change detection still see them as complete) and, when
+a slide's response is cached, the cached image is replaced by the optimized
+one so a cache restore does not bring back the larger file.
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .cache import ResponseCache
+from .config import CACHE_DIR, IMAGES_DIR, MANIFEST_DIR, PROTOCOL_IMAGES_DIR
+from .manifest import DONE, RunManifest, file_sha256
+from .output import atomic_write
+
+DEFAULT_STATE_PATH = CACHE_DIR / "optimized.json"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+# Split re-deflated image data into chunks of this size, as encoders usually do
+IDAT_CHUNK_SIZE = 1 << 16
+
+
+@dataclass
+class OptimizeResult:
+    path: str
+    before: int
+    after: int
+    method: str = ""
+    skipped: str = ""
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+
+def sniff_format(data: bytes) -> str | None:
+    if data.startswith(PNG_SIGNATURE):
+        return "png"
+    if data.startswith(JPEG_SIGNATURE):
+        return "jpeg"
+    return None
+
+
+def _png_chunks(data: bytes):
+    offset = len(PNG_SIGNATURE)
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset:offset + 4])
+        kind = data[offset + 4:offset + 8]
+        yield kind, data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+
+
+def _png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def _deflate_idat(raw: bytes) -> list:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9)
+    stream = compressor.compress(zlib.decompress(raw)) + compressor.flush()
+    return [_png_chunk(b"IDAT", stream[i:i + IDAT_CHUNK_SIZE]) for i in range(0, len(stream), IDAT_CHUNK_SIZE)]
+
+
+def redeflate_png(data: bytes) -> bytes:
+    """Recompress the IDAT stream at maximum zlib effort, keeping filters and all other chunks"""
+    out = [PNG_SIGNATURE]
+    idat = []
+    for kind, body in _png_chunks(data):
+        if kind == b"IDAT":
+            idat.append(body)
+            continue
+        # IDAT chunks are consecutive, so the first other chunk ends the stream
+        if idat:
+            out.extend(_deflate_idat(b"".join(idat)))
+            idat = []
+        out.append(_png_chunk(kind, body))
+    return b"".join(out)
+
+
+def _run_tool(args: list, data: bytes, suffix: str) -> bytes | None:
+    """Run an optimizer CLI on a temp copy; returns its output or None if it failed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / f"in{suffix}"
+        dst = Path(tmp) / f"out{suffix}"
+        src.write_bytes(data)
+        argv = [str(src) if a == "{in}" else str(dst) if a == "{out}" else a for a in args]
+        if subprocess.run(argv, capture_output=True).returncode != 0:
+            return None
+        return (dst if dst.exists() else src).read_bytes()
+
+
+def optimize_png(data: bytes) -> tuple[bytes, str]:
+    if shutil.which("oxipng"):
+        result = _run_tool(["oxipng", "-o", "4", "--strip", "safe", "--out", "{out}", "{in}"], data, ".png")
+        if result:
+            return result, "oxipng"
+    try:
+        from PIL import Image
+    except ImportError:
+        return redeflate_png(data), "zlib"
+
+    with Image.open(io.BytesIO(data)) as image:
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True, icc_profile=image.info.get("icc_profile"))
+        return buffer.getvalue(), "pillow"
+
+
+def optimize_jpeg(data: bytes) -> tuple[bytes | None, str]:
+    if not shutil.which("jpegtran"):
+        return None, "jpeg needs jpegtran"
+    result = _run_tool(
+        ["jpegtran", "-copy", "all", "-optimize", "-progressive", "-outfile", "{out}", "{in}"], data, ".jpg",
+    )
+    return result, "jpegtran"
+
+
+def quantize(data: bytes, colors: int) -> tuple[bytes, str]:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        palette = image.convert("RGB").quantize(
+            colors=colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE,
+        )
+        buffer = io.BytesIO()
+        palette.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue(), f"quantize-{colors}"
+
+
+def optimize_file(path: str, colors: int = 0) -> OptimizeResult:
+    """Optimize one file in place (atomically); runs in a worker process"""
+    data = Path(path).read_bytes()
+    before = len(data)
+    kind = sniff_format(data)
+
+    try:
+        if colors:
+            optimized, method = quantize(data, colors)
+        elif kind == "png":
+            optimized, method = optimize_png(data)
+        elif kind == "jpeg":
+            optimized, method = optimize_jpeg(data)
+        else:
+            return OptimizeResult(path, before, before, skipped="unknown format")
+    except Exception as e:
+        return OptimizeResult(path, before, before, skipped=f"{type(e).__name__}: {e}")
+
+    if optimized is None:
+        return OptimizeResult(path, before, before, skipped=method)
+    if len(optimized) >= before:
+        return OptimizeResult(path, before, before, method=method, skipped="no gain")
+
+    atomic_write(Path(path), optimized)
+    return OptimizeResult(path, before, len(optimized), method=method)
+
+
+def pass_mode(colors: int = 0) -> str:
+    return f"quantize-{colors}" if colors else "lossless"
+
+
+def _load_state(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def record_rewrites(results: list, manifest_dir: Path = MANIFEST_DIR, cache=None) -> int:
+    """Update the manifest entries (and cached images) of rewritten outputs; returns how many"""
+    rewritten = {r.path for r in results if r.saved}
+    if not rewritten:
+        return 0
+    updated = 0
+    for name in sorted({path.stem for path in Path(manifest_dir).glob("*.json*")}):
+        manifest = RunManifest.load(Path(manifest_dir) / f"{name}.json", name)
+        before = updated
+        for slide_id, entry in list(manifest.slides.items()):
+            output = entry.get("output")
+            if entry.get("status") != DONE or not output or str(Path(output).resolve()) not in rewritten:
+                continue
+            if manifest.rewritten(slide_id, Path(output)):
+                updated += 1
+            if cache is not None and entry.get("key"):
+                cache.replace_image(entry["key"], Path(output))
+        if updated > before:
+            manifest.compact()
+    return updated
+
+
+def optimize_paths(paths: list, colors: int = 0, workers: int = None,
+                   state_path: Path = DEFAULT_STATE_PATH, manifest_dir: Path = MANIFEST_DIR, cache=None) -> list:
+    """Optimize files across a process pool, skipping ones unchanged since their last pass"""
+    state = _load_state(state_path)
+    mode = pass_mode(colors)
+    todo = []
+    results = []
+    for path in (str(Path(p).resolve()) for p in paths):
+        entry = state.get(path)
+        if isinstance(entry, str):
+            # Recorded before modes were tracked: a lossless pass
+            entry = {"sha256": entry, "mode": pass_mode()}
+        if entry and entry == {"sha256": file_sha256(path), "mode": mode}:
+            size = os.path.getsize(path)
+            results.append(OptimizeResult(path, size, size, skipped="unchanged"))
+        else:
+            todo.append(path)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results.extend(pool.map(optimize_file, todo, [colors] * len(todo)))
+
+    for result in results:
+        if not result.skipped or result.skipped in ("no gain", "unchanged"):
+            state[result.path] = {"sha256": file_sha256(result.path), "mode": mode}
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(state_path, json.dumps(state, indent=2).encode("utf-8"))
+    record_rewrites(results, manifest_dir, cache)
+    return sorted(results, key=lambda r: r.path)
+
+
+def report(results: list) -> None:
+    total_before = total_after = 0
+    for r in results:
+        total_before += r.before
+        total_after += r.after
+        name = Path(r.path).name
+        if r.skipped and not r.saved:
+            print(f"  - {name}: skipped ({r.skipped})")
+        else:
+            print(f"  ✅ {name}: {r.before / 1024:.1f} KB -> {r.after / 1024:.1f} KB "
+                  f"(-{r.saved / 1024:.1f} KB, {r.saved / r.before:.1%}, {r.method})")
+    if total_before:
+        print(f"Saved {(total_before - total_after) / 1024:.1f} KB of {total_before / 1024:.1f} KB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="slidegen.optimize", description="Losslessly recompress slide images")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="files or directories (default: images/ and protocol-images/)")
+    parser.add_argument("--quantize", type=int, default=0, metavar="COLORS",
+                        help="lossy: convert to a palette PNG with this many colours (needs Pillow)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--state", type=Path, default=DEFAULT_STATE_PATH)
+    parser.add_argument("--no-cache", action="store_true", help="leave cached responses unoptimized")
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths or [IMAGES_DIR, PROTOCOL_IMAGES_DIR]:
+        files.extend(sorted(path.glob("*.png")) if path.is_dir() else [path])
+
+    cache = None if args.no_cache else ResponseCache()
+    report(optimize_paths(files, colors=args.quantize, workers=args.workers, state_path=args.state, cache=cache))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
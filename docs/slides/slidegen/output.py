@@ -0,0 +1,86 @@
+"""
+Atomic, copy-free output writing
+
+Every file is written to a temporary sibling and renamed over the target,
+so a crash never leaves a truncated PNG behind. Image parts are written
+straight from ``inline_data`` without decoding them into a PIL image; base64
+payloads are decoded in bounded chunks instead of all at once. State files
+shared by several processes are read, updated and written under locked().
+"""
+
+import base64
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+# Multiple of 4 so each chunk of base64 text decodes independently
+B64_CHUNK_CHARS = 4 * 64 * 1024
+
+
+@contextmanager
+def atomic_path(path: Path):
+    """Yield a temporary path next to ``path``; it replaces ``path`` on success"""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def locked(path: Path, shared: bool = False):
+    """Hold an flock on ``path`` (created if missing); yields its file descriptor"""
+    import fcntl
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield fd
+    finally:
+        os.close(fd)  # also releases the lock
+
+
+def atomic_write(path: Path, data) -> int:
+    """Write bytes (or any buffer) to ``path`` atomically; returns bytes written"""
+    view = memoryview(data)
+    with atomic_path(path) as tmp:
+        with open(tmp, "wb", buffering=0) as f:
+            written = 0
+            while written < view.nbytes:
+                written += f.write(view[written:])
+    return view.nbytes
+
+
+def atomic_copy(src: Path, dest: Path) -> None:
+    """Copy ``src`` over ``dest`` atomically (sendfile where the platform has it)"""
+    with atomic_path(dest) as tmp:
+        shutil.copyfile(src, tmp)
+
+
+def _write_b64(f, text: str) -> int:
+    if "\n" in text or len(text) % 4:
+        # Wrapped or unpadded base64 cannot be split safely; decode it in one go
+        return f.write(base64.b64decode(text))
+
+    written = 0
+    for start in range(0, len(text), B64_CHUNK_CHARS):
+        written += f.write(base64.b64decode(text[start:start + B64_CHUNK_CHARS]))
+    return written
+
+
+def write_inline_data(part, path: Path) -> int:
+    """Write an image part's inline data to ``path`` atomically; returns bytes written"""
+    data = part.inline_data.data
+    if not isinstance(data, str):
+        return atomic_write(path, data)
+
+    with atomic_path(path) as tmp:
+        with open(tmp, "wb") as f:
+            return _write_b64(f, data)
@@ -0,0 +1,223 @@
+"""
+Derive protocol slides from a PlantUML sequence diagram
+
+Each ``== Phase ==`` block of docs/omakase-ai-protocol.puml becomes one
+slide: the participants it touches, its messages in order (dashed arrows are
+responses), the JSON-ish payloads attached to them, notes and loops.
+
+A slide's id is the slug of its phase title and neither the id nor the
+prompt mentions the phase's position, so inserting or reordering phases
+leaves the other slides' ids, prompts and cache keys alone. The fingerprint
+covers the phase's source text and the labels of the participants it uses,
+so editing one phase only changes that slide's prompt and cache key; with
+the response cache or ``--resume`` only that protocol image is regenerated.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .config import PROTOCOL_IMAGES_DIR, SLIDES_DIR
+from .deck import Deck, Slide
+from .spec import fingerprint
+
+DEFAULT_PUML_PATH = SLIDES_DIR.parent / "omakase-ai-protocol.puml"
+# Bump when the prompt layout changes
+COMPILER_VERSION = 2
+# Payload snippets longer than this are cut with an ellipsis line
+MAX_PAYLOAD_LINES = 10
+
+PARTICIPANT_RE = re.compile(
+    r'^(actor|participant|boundary|control|entity|database|collections|queue)\s+'
+    r'(?:"(?P<label>[^"]*)"\s+as\s+(?P<alias>\w+)|(?P<name>\w+))'
+)
+PHASE_RE = re.compile(r"^==\s*(?P<title>.+?)\s*==$")
+MESSAGE_RE = re.compile(r"^(?P<source>\w+)\s*(?P<arrow><?-{1,2}>{0,2}[xo]?)\s*(?P<target>\w+)\s*:\s*(?P<text>.*)$")
+NOTE_RE = re.compile(r"^note\s+(?:over|left of|right of)\s+(?P<over>[\w\s,]+?)\s*:\s*(?P<text>.*)$")
+LOOP_RE = re.compile(r"^(?:loop|group|alt|opt)\s*(?P<title>.*)$")
+
+
+@dataclass
+class Message:
+    source: str
+    target: str
+    label: str
+    payload: str = ""
+    response: bool = False
+    loop: str = ""
+
+
+@dataclass
+class Phase:
+    title: str
+    source: str = ""
+    messages: list = field(default_factory=list)
+    notes: list = field(default_factory=list)
+
+    @property
+    def participants(self) -> list:
+        seen = []
+        for message in self.messages:
+            for alias in (message.source, message.target):
+                if alias not in seen:
+                    seen.append(alias)
+        return seen
+
+
+@dataclass
+class Sequence:
+    title: str
+    participants: dict
+    phases: list
+
+
+def _unescape(text: str) -> list:
+    return text.replace("\\n", "\n").split("\n")
+
+
+def _message(match: re.Match, loop: str) -> Message:
+    lines = _unescape(match["text"].strip())
+    label = lines[0].strip()
+    rest = lines[1:]
+    # Continuation lines that are not a payload belong to the label
+    while rest and not rest[0].lstrip().startswith(("{", "[")):
+        label += f" {rest.pop(0).strip()}"
+
+    source, target = match["source"], match["target"]
+    if match["arrow"].startswith("<"):
+        source, target = target, source
+    return Message(source, target, label, "\n".join(rest), response="--" in match["arrow"], loop=loop)
+
+
+def parse_sequence(text: str) -> Sequence:
+    title = ""
+    participants = {}
+    phases = []
+    loops = []
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        # @enduml is not part of the last phase: appending a phase must not change that one's source
+        if not line or line.startswith(("'", "@")):
+            continue
+
+        if line.startswith("title "):
+            title = line[len("title "):].strip()
+        elif match := PARTICIPANT_RE.match(line):
+            alias = match["alias"] or match["name"]
+            participants[alias] = " ".join(_unescape(match["label"] or alias))
+        elif match := PHASE_RE.match(line):
+            phases.append(Phase(match["title"]))
+            loops = []
+            continue
+        elif not phases:
+            continue
+        elif line == "end":
+            if loops:
+                loops.pop()
+        elif match := LOOP_RE.match(line):
+            loops.append(match["title"] or line.split()[0])
+        elif match := NOTE_RE.match(line):
+            over = [alias.strip() for alias in match["over"].split(",")]
+            phases[-1].notes.append((over, "\n".join(_unescape(match["text"]))))
+        elif match := MESSAGE_RE.match(line):
+            phases[-1].messages.append(_message(match, loops[-1] if loops else ""))
+
+        if phases:
+            phases[-1].source += raw + "\n"
+
+    return Sequence(title, participants, phases)
+
+
+def _payload_lines(payload: str) -> list:
+    lines = [line.rstrip() for line in payload.splitlines() if line.strip()]
+    if len(lines) > MAX_PAYLOAD_LINES:
+        lines = lines[:MAX_PAYLOAD_LINES - 1] + ["  ..."]
+    return lines
+
+
+def phase_prompt(phase: Phase, participants: dict) -> str:
+    def name(alias: str) -> str:
+        return participants.get(alias, alias)
+
+    lines = [
+        f'Create a protocol sequence slide: "{phase.title}"',
+        "",
+        "PARTICIPANTS (draw as labelled boxes or icons, left to right):",
+    ]
+    order = list(participants)
+    used = sorted(phase.participants, key=lambda alias: order.index(alias) if alias in order else len(order))
+    lines += [f"- {name(alias)}" for alias in used]
+
+    lines += ["", "MESSAGES (hand-drawn arrows in this order; dashed arrows for responses):"]
+    for number, message in enumerate(phase.messages, 1):
+        arrow = "⇢" if message.response else "→"
+        loop = f' [repeats in loop "{message.loop}"]' if message.loop else ""
+        lines.append(f"{number}. {name(message.source)} {arrow} {name(message.target)}: {message.label}{loop}")
+
+    payloads = [message for message in phase.messages if message.payload]
+    if payloads:
+        lines += ["", "PAYLOAD SNIPPETS (small hand-written code cards next to their arrows):"]
+        for message in payloads:
+            lines.append(f"- {message.label}:")
+            lines += [f"    {line}" for line in _payload_lines(message.payload)]
+
+    if phase.notes:
+        lines += ["", "NOTES (sticky-note style):"]
+        for over, text in phase.notes:
+            lines.append(f"- Over {', '.join(name(alias) for alias in over)}: {' / '.join(text.splitlines())}")
+
+    lines += ["", "TEXT LABELS (Japanese):", f'- Japanese translation of "{phase.title}" as the title']
+    return "\n".join(lines) + "\n"
+
+
+def _slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+
+def phase_id(phase: Phase, taken=()) -> str:
+    """Slug of the title; a title already in ``taken`` gets a suffix from the phase's source text
+
+    The first phase with a title keeps the bare slug, so adding a phase with a
+    repeated title never renames an existing slide (or its output file).
+    """
+    slide_id = _slug(phase.title) or "phase"
+    if slide_id in taken:
+        slide_id += "_" + hashlib.sha256(phase.source.strip().encode("utf-8")).hexdigest()[:8]
+    # Same title and same source: number the copies
+    base, copy = slide_id, 1
+    while slide_id in taken:
+        copy += 1
+        slide_id = f"{base}_{copy}"
+    return slide_id
+
+
+def slides_from_sequence(sequence: Sequence, style_prefix: str = "") -> list:
+    slides = []
+    taken = set()
+    for phase in sequence.phases:
+        labels = {alias: sequence.participants.get(alias, alias) for alias in phase.participants}
+        slide_id = phase_id(phase, taken)
+        taken.add(slide_id)
+        slides.append(Slide(
+            id=slide_id,
+            title=phase.title,
+            prompt=phase_prompt(phase, sequence.participants),
+            fingerprint=fingerprint(COMPILER_VERSION, style_prefix, phase.title, phase.source.strip(), labels),
+        ))
+    return slides
+
+
+def deck_from_puml(name: str, style_prefix: str, path: Path = DEFAULT_PUML_PATH,
+                   output_dir: Path = PROTOCOL_IMAGES_DIR, **kwargs) -> Deck:
+    sequence = parse_sequence(Path(path).read_text(encoding="utf-8"))
+    return Deck(
+        name=name,
+        title=sequence.title,
+        style_prefix=style_prefix,
+        slides=slides_from_sequence(sequence, style_prefix),
+        output_dir=output_dir,
+        metadata={"puml": str(path)},
+        **kwargs,
+    )
@@ -0,0 +1,109 @@
+"""
+Token-bucket rate limit shared by every generator process on the host
+
+    python -m slidegen --deck business --async --rate-limit 18 &
+    python generate-protocol-slides.py --async --rate-limit 18
+
+The bucket lives in a small JSON file per API key (.cache/ratelimit/<key
+hash>.json, the key itself is never written) and is read and updated under
+an exclusive flock, so however many scripts run at once their combined
+request rate stays at ``rate`` per minute with bursts of at most ``burst``.
+SlideEngine takes a token right before each request. A 429 with Retry-After
+in any process pauses the bucket for all of them. acquire() never blocks the
+event loop on the lock: while another process holds it, it retries after
+LOCK_RETRY seconds.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .config import CACHE_DIR, api_key
+
+DEFAULT_RATE_DIR = CACHE_DIR / "ratelimit"
+# Seconds between attempts to take the bucket lock from async code
+LOCK_RETRY = 0.005
+
+
+def default_path() -> Path:
+    """Bucket file of the configured API key (``default`` without one)"""
+    try:
+        key = hashlib.sha256(api_key().encode("utf-8")).hexdigest()[:16]
+    except ValueError:
+        key = "default"
+    return DEFAULT_RATE_DIR / f"{key}.json"
+
+
+class SharedRateLimiter:
+    def __init__(self, rate: float, burst: float = 1.0, path: Path = None):
+        # Requests per minute across all processes sharing `path`
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.path = Path(path) if path else default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _update(self, change, blocking: bool = True) -> float:
+        """Apply ``change(state, now)`` to the bucket under an exclusive lock; returns its result
+
+        Without ``blocking``, raises BlockingIOError instead of waiting for the lock.
+        """
+        import fcntl
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            raw = b""
+            while chunk := os.read(fd, 4096):
+                raw += chunk
+            now = time.time()
+            try:
+                state = json.loads(raw)
+            except ValueError:
+                state = {"tokens": self.burst, "updated": now, "paused_until": 0.0}
+            # Refill for the time since the last update (by any process)
+            elapsed = max(0.0, now - state["updated"])
+            state["tokens"] = min(self.burst, state["tokens"] + elapsed * self.rate / 60)
+            state["updated"] = now
+            result = change(state, now)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps(state).encode("utf-8"))
+            return result
+        finally:
+            os.close(fd)  # also releases the lock
+
+    def try_acquire(self, blocking: bool = True) -> float:
+        """Take a token and return 0, or return the seconds until one is available"""
+
+        def take(state: dict, now: float) -> float:
+            if state["paused_until"] > now:
+                return state["paused_until"] - now
+            if state["tokens"] >= 1:
+                state["tokens"] -= 1
+                return 0.0
+            return (1 - state["tokens"]) * 60 / self.rate
+
+        return self._update(take, blocking)
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds waited"""
+        start = time.perf_counter()
+        while True:
+            try:
+                wait = self.try_acquire(blocking=False)
+            except BlockingIOError:
+                wait = LOCK_RETRY
+            if wait <= 0:
+                return time.perf_counter() - start
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """No process gets a token for ``seconds`` (a server Retry-After)"""
+
+        def hold(state: dict, now: float) -> None:
+            state["paused_until"] = max(state["paused_until"], now + seconds)
+
+        self._update(hold)
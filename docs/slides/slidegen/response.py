@@ -0,0 +1,81 @@
+"""
+Helpers for pulling images and text out of model responses
+
+Both SDKs are supported: google-genai exposes ``response.parts`` directly,
+while google.generativeai responses are walked via ``candidates``.
+"""
+
+import base64
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Payload:
+    image: bytes
+    texts: list = field(default_factory=list)
+
+
+def iter_parts(response):
+    parts = getattr(response, "parts", None)
+    if parts:
+        yield from parts
+        return
+
+    for candidate in getattr(response, "candidates", None) or []:
+        if candidate.content and candidate.content.parts:
+            yield from candidate.content.parts
+
+
+def image_parts(response) -> list:
+    return [part for part in iter_parts(response) if getattr(part, "inline_data", None)]
+
+
+def text_parts(response) -> list:
+    return [part.text for part in iter_parts(response) if getattr(part, "text", None)]
+
+
+BLOCKING_FINISH_REASONS = ("SAFETY", "PROHIBITED_CONTENT", "BLOCKLIST", "SPII", "IMAGE_SAFETY", "RECITATION")
+
+
+def _name(value) -> str:
+    return str(getattr(value, "name", value) or "")
+
+
+def blocked_reason(response) -> str | None:
+    """Why the prompt or every candidate was blocked, if it was"""
+    feedback = getattr(response, "prompt_feedback", None)
+    reason = _name(getattr(feedback, "block_reason", None))
+    if reason and not reason.endswith("UNSPECIFIED"):
+        return f"prompt blocked: {reason}"
+
+    candidates = getattr(response, "candidates", None) or []
+    reasons = [_name(getattr(candidate, "finish_reason", None)) for candidate in candidates]
+    if reasons and all(reason in BLOCKING_FINISH_REASONS for reason in reasons):
+        return f"candidate blocked: {', '.join(reasons)}"
+    return None
+
+
+def usage_tokens(response) -> dict:
+    """Token counts from ``usage_metadata`` (same field names in both SDKs); 0 when absent"""
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None) or 0,
+        "output_tokens": getattr(usage, "candidates_token_count", None) or 0,
+        "total_tokens": getattr(usage, "total_token_count", None) or 0,
+    }
+
+
+def inline_bytes(part) -> bytes:
+    data = part.inline_data.data
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    return data
+
+
+def payload_from_response(response) -> Payload | None:
+    """Collect the first image part and all text parts of a model response"""
+    images = image_parts(response)
+    if not images:
+        return None
+    return Payload(image=inline_bytes(images[0]), texts=text_parts(response))
+
@@ -0,0 +1,21 @@
+"""
+Retry policy: decorrelated-jitter backoff with per-request and per-run deadlines
+"""
+
+import random
+from dataclasses import dataclass
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    # Seconds a single generate_content call may take before it is abandoned
+    request_timeout: float | None = 180.0
+    # Seconds the whole run may take; slides still pending then are failed
+    run_timeout: float | None = None
+
+    def next_delay(self, previous: float, rng=random) -> float:
+        """Decorrelated jitter: uniform(base, 3 * previous), capped at max_delay"""
+        return min(self.max_delay, rng.uniform(self.base_delay, max(self.base_delay, previous * 3)))
@@ -0,0 +1,109 @@
+"""
+Adaptive (AIMD) concurrency control
+
+The window of in-flight requests grows by ``increase / window`` per success
+(about +increase per round-trip) and is multiplied by ``decrease`` when the
+API answers 429/503. Only the first throttle of a window epoch shrinks it,
+so a burst of rejections from requests that were already in flight counts
+once. Retry-After hints pause new requests until the server's deadline.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+SUCCESS = "success"
+THROTTLED = "throttled"
+ERROR = "error"
+
+
+class Slot:
+    """Handle for one in-flight request; report the outcome before leaving the context"""
+
+    def __init__(self, epoch: int):
+        self.epoch = epoch
+        self.outcome = SUCCESS
+        self.retry_after = None
+
+    def throttled(self, retry_after: float = None) -> None:
+        self.outcome = THROTTLED
+        self.retry_after = retry_after
+
+    def failed(self) -> None:
+        self.outcome = ERROR
+
+
+class AIMDScheduler:
+    def __init__(self, initial: float = 2, minimum: float = 1, maximum: float = 16,
+                 increase: float = 1.0, decrease: float = 0.5):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self._window = min(max(initial, minimum), self.maximum)
+        self._in_flight = 0
+        self._epoch = 0
+        self._resume_at = 0.0
+        self._condition = None
+
+    @property
+    def window(self) -> float:
+        return self._window
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._window))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._resume_at - time.monotonic())
+
+    def _cond(self) -> asyncio.Condition:
+        # Created lazily so the scheduler can be built outside a running loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self) -> Slot:
+        cond = self._cond()
+        async with cond:
+            while True:
+                pause = self.paused_for
+                if pause <= 0 and self._in_flight < self.limit:
+                    break
+                try:
+                    await asyncio.wait_for(cond.wait(), timeout=pause or None)
+                except asyncio.TimeoutError:
+                    pass
+            self._in_flight += 1
+            return Slot(self._epoch)
+
+    async def release(self, slot: Slot) -> None:
+        cond = self._cond()
+        async with cond:
+            self._in_flight -= 1
+            if slot.outcome == SUCCESS:
+                self._window = min(self.maximum, self._window + self.increase / self._window)
+            elif slot.outcome == THROTTLED:
+                if slot.epoch == self._epoch:
+                    self._window = max(self.minimum, self._window * self.decrease)
+                    self._epoch += 1
+                if slot.retry_after:
+                    self._resume_at = max(self._resume_at, time.monotonic() + slot.retry_after)
+            cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        slot = await self.acquire()
+        try:
+            yield slot
+        except BaseException:
+            if slot.outcome == SUCCESS:
+                slot.failed()
+            raise
+        finally:
+            await self.release(slot)
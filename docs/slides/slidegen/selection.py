@@ -0,0 +1,86 @@
+"""
+Slide selection and static sharding
+
+    python -m slidegen --deck business --only 05_business
+    python -m slidegen --deck business --skip '0[1-3]_*'
+    python -m slidegen --deck business --deck protocol --shard 2/4 --async
+    python -m slidegen --deck business --deck protocol --check    # after merging every shard's output
+
+``--only`` / ``--skip`` take slide ids, ``deck:id`` or shell-style patterns.
+``--shard i/n`` (1 <= i <= n) keeps the slides whose ``deck:id`` hash falls
+into bucket i, so n hosts or CI jobs given the same decks generate disjoint
+subsets that together cover every slide, without coordinating. The split
+depends only on the ids: adding a slide never moves the others. Other
+restrictions (the budget's deferred slides) are passed to select() as
+``(deck, id)`` pairs, so they narrow these filters instead of replacing them.
+"""
+
+import fnmatch
+import hashlib
+from dataclasses import replace
+from pathlib import Path
+
+from .deck import Deck
+from .optimize import JPEG_SIGNATURE, PNG_SIGNATURE
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """'2/4' -> (2, 4); raises ValueError unless 1 <= i <= n"""
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"shard must look like i/n, got {value!r}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def shard_of(deck: Deck, slide_id: str, count: int) -> int:
+    """1-based shard of a slide, from the SHA-256 of ``deck:id``"""
+    digest = hashlib.sha256(f"{deck.name}:{slide_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def matches(deck: Deck, slide_id: str, patterns: list) -> bool:
+    return any(fnmatch.fnmatchcase(slide_id, p) or fnmatch.fnmatchcase(f"{deck.name}:{slide_id}", p)
+               for p in patterns)
+
+
+def select(decks: list, only: list = (), skip: list = (), shard: tuple = None, pairs: set = None) -> list:
+    """The decks reduced to the selected slides (and, given ``pairs``, to those ``(deck, id)``);
+    decks left without slides are dropped"""
+    selected = []
+    for deck in decks:
+        slides = [
+            slide for slide in deck.slides
+            if (pairs is None or (deck.name, slide.id) in pairs)
+            and (not only or matches(deck, slide.id, only))
+            and not matches(deck, slide.id, skip)
+            and (shard is None or shard_of(deck, slide.id, shard[1]) == shard[0])
+        ]
+        if slides:
+            selected.append(replace(deck, slides=slides))
+    return selected
+
+
+def unmatched(decks: list, patterns: list) -> list:
+    """Patterns that select no slide of any deck (most likely typos)"""
+    return [p for p in patterns if not any(matches(deck, slide.id, [p]) for deck in decks for slide in deck.slides)]
+
+
+def missing_outputs(decks: list) -> list:
+    """(deck, slide id, reason) for every slide without a readable PNG/JPEG output"""
+    missing = []
+    for deck in decks:
+        for slide in deck.slides:
+            path: Path = deck.output_path(slide)
+            try:
+                with open(path, "rb") as f:
+                    head = f.read(8)
+            except OSError:
+                missing.append((deck.name, slide.id, "missing"))
+                continue
+            if not head.startswith((PNG_SIGNATURE, JPEG_SIGNATURE)):
+                missing.append((deck.name, slide.id, "not an image" if head else "empty"))
+    return missing
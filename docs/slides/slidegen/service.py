@@ -0,0 +1,449 @@
+"""
+Long-running local generation service
+
+    python -m slidegen.service --port 8765
+    python -m slidegen.service --socket /tmp/slidegen.sock
+
+One process keeps a single SlideEngine warm (the shared google-genai client
+and its connection pool, resolved models, cache, metrics and history), so
+callers such as the Express server in src/server/ pay neither import nor
+client start-up per image. HTTP/1.1, JSON in and out:
+
+    POST   /jobs              {"items": [...], "priority": 0, "refresh": false}
+    GET    /jobs              all jobs with their status
+    GET    /jobs/<id>         one job
+    GET    /jobs/<id>/events  NDJSON status stream (chunked) until the job finishes
+    DELETE /jobs/<id>         cancel the job's items that have not started
+    GET    /health            queue length, in-flight requests and concurrency window
+
+An item is ``{"deck": "business"}`` (every slide), ``{"deck": "business",
+"slide": "01_title"}`` or an ad-hoc ``{"id": "banner", "prompt": "...",
+"deck": "business"}`` rendered in that deck's style into ``--output-dir``.
+Items of higher-priority jobs are started first; a new item is only started
+while the engine's AIMD window has room, so priorities hold under load. An
+item whose slide (same deck, id, prompt and refresh flag) is already being
+generated for another job waits for that generation instead of starting its own.
+
+Finished jobs are forgotten after ``--job-ttl`` seconds, and beyond the
+``--max-jobs`` most recent ones; each job keeps at most MAX_JOB_EVENTS
+events for replay, so a long-running service does not grow without bound.
+Ad-hoc prompts are recorded in their own ``service-<deck>`` manifests, which
+keep only the MAX_ADHOC_ENTRIES most recent slides.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import signal
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from .cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ResponseCache
+from .config import CACHE_DIR, DEFAULT_CONCURRENCY
+from .deck import Deck, Slide
+from .decks import DEFAULT_DECKS, get_deck
+from .engine import SlideEngine
+from .history import DEFAULT_HISTORY_PATH, HistoryStore
+from .metrics import DEFAULT_METRICS_PATH, MetricsRecorder
+from .ratelimit import SharedRateLimiter
+from .retry import RetryPolicy
+from .scheduler import AIMDScheduler
+
+SERVICE_OUTPUT_DIR = CACHE_DIR / "service"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+# Ad-hoc ids become file names
+ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,80}$")
+DEFAULT_JOB_TTL = 3600.0
+DEFAULT_MAX_JOBS = 1000
+# Older events of a job are dropped; a stream that falls this far behind skips them
+MAX_JOB_EVENTS = 1000
+# Manifest entries kept for ad-hoc prompts (each one is a new slide id)
+MAX_ADHOC_ENTRIES = 1000
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+DEFERRED = "deferred"
+CANCELLED = "cancelled"
+FINISHED = {DONE, FAILED, DEFERRED, CANCELLED}
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Item:
+    deck: Deck
+    slide: Slide
+    index: int
+    status: str = QUEUED
+    path: str = None
+    error: str = None
+
+    def to_dict(self) -> dict:
+        return {"deck": self.deck.name, "slide": self.slide.id, "status": self.status,
+                "path": self.path, "error": self.error}
+
+
+@dataclass
+class Job:
+    id: str
+    priority: int
+    items: list
+    refresh: bool = False
+    created: float = field(default_factory=time.time)
+    events: list = field(default_factory=list)
+    # Events dropped from the front of `events`
+    dropped: int = 0
+    finished_at: float = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def finished(self) -> bool:
+        return all(item.status in FINISHED for item in self.items)
+
+    @property
+    def emitted(self) -> int:
+        return self.dropped + len(self.events)
+
+    def emit(self, **event) -> None:
+        self.events.append({"ts": round(time.time(), 3), "job": self.id, **event})
+        if len(self.events) > MAX_JOB_EVENTS:
+            del self.events[0]
+            self.dropped += 1
+        if event.get("event") == "finished":
+            self.finished_at = time.time()
+        # Wake every stream waiting on this job, then re-arm
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {"id": self.id, "priority": self.priority, "created": self.created,
+                "finished": self.finished, "counts": counts, "items": [item.to_dict() for item in self.items]}
+
+
+class SlideService:
+    def __init__(self, engine: SlideEngine, output_dir: Path = SERVICE_OUTPUT_DIR,
+                 job_ttl: float = DEFAULT_JOB_TTL, max_jobs: int = DEFAULT_MAX_JOBS):
+        self.engine = engine
+        self.output_dir = Path(output_dir)
+        self.job_ttl = job_ttl
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.queue = asyncio.PriorityQueue()
+        self.running = set()
+        # (deck, slide, prompt, refresh) -> task generating it, shared by every item asking for it
+        self.generating = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    async def warm(self, deck_names) -> None:
+        """Create the backends (and shared client) and resolve their models before the first job"""
+        for name in deck_names:
+            try:
+                for backend in self.engine.chain_for(get_deck(name)):
+                    await backend.prepare()
+                    print(f"  🔥 {name}: {backend.model_name}")
+            except Exception as e:
+                print(f"  ⚠️ Could not warm up {name}: {e}")
+
+    def items_for(self, spec: dict) -> list:
+        if not isinstance(spec, dict):
+            raise RequestError(400, "each item must be an object")
+        try:
+            deck = get_deck(spec.get("deck", "business"))
+        except KeyError as e:
+            raise RequestError(400, str(e.args[0])) from None
+
+        if "prompt" in spec:
+            slide_id = spec.get("id") or uuid.uuid4().hex[:12]
+            if not ID_PATTERN.match(str(slide_id)):
+                raise RequestError(400, f"invalid id {slide_id!r} (letters, digits, '_' and '-')")
+            slide = Slide(slide_id, spec.get("title", slide_id), str(spec["prompt"]))
+            adhoc = replace(deck, name=f"service-{deck.name}", slides=[slide], output_dir=self.output_dir,
+                            filename_prefix=f"{deck.name}_",
+                            metadata={**deck.metadata, "manifest_limit": MAX_ADHOC_ENTRIES})
+            return [Item(adhoc, slide, 0)]
+        if "slide" in spec:
+            try:
+                slide = deck.slide(spec["slide"])
+            except KeyError as e:
+                raise RequestError(400, str(e.args[0])) from None
+            return [Item(deck, slide, deck.slides.index(slide))]
+        return [Item(deck, slide, i) for i, slide in enumerate(deck.slides)]
+
+    def prune(self) -> int:
+        """Forget finished jobs older than the TTL or beyond the most recent ``max_jobs``"""
+        finished = sorted((job for job in self.jobs.values() if job.finished_at is not None),
+                          key=lambda job: job.finished_at)
+        cutoff = time.time() - self.job_ttl
+        excess = len(finished) - self.max_jobs
+        removed = 0
+        for i, job in enumerate(finished):
+            if i < excess or job.finished_at < cutoff:
+                del self.jobs[job.id]
+                removed += 1
+        return removed
+
+    def submit(self, payload: dict) -> Job:
+        if not isinstance(payload, dict) or not isinstance(payload.get("items"), list) or not payload["items"]:
+            raise RequestError(400, 'expected {"items": [...]} with at least one item')
+        try:
+            priority = int(payload.get("priority", 0))
+        except (TypeError, ValueError):
+            raise RequestError(400, "priority must be an integer") from None
+        items = [item for spec in payload["items"] for item in self.items_for(spec)]
+
+        self.prune()
+        job = Job(uuid.uuid4().hex[:12], priority, items, refresh=bool(payload.get("refresh", False)))
+        self.jobs[job.id] = job
+        for item in items:
+            # Higher priority first, then submission order
+            self.queue.put_nowait((-priority, next(self._seq), job, item))
+        job.emit(event="queued", items=len(items), priority=priority)
+        self._wakeup.set()
+        return job
+
+    def cancel(self, job: Job) -> int:
+        cancelled = 0
+        for item in job.items:
+            if item.status == QUEUED:
+                item.status = CANCELLED
+                cancelled += 1
+                job.emit(event="item", **item.to_dict())
+        if cancelled and job.finished:
+            job.emit(event="finished", **job.to_dict()["counts"])
+        return cancelled
+
+    async def dispatch(self) -> None:
+        """Start queued items in priority order while the scheduler's window has room"""
+        scheduler = self.engine.scheduler
+        while True:
+            if self.queue.empty() or len(self.running) >= scheduler.limit:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            _, _, job, item = self.queue.get_nowait()
+            if item.status != QUEUED:
+                continue
+            task = asyncio.create_task(self.run_item(job, item))
+            self.running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self.running.discard(task)
+        self._wakeup.set()
+
+    def generation(self, item: Item, refresh: bool) -> asyncio.Task:
+        """The task generating the item's slide, started unless one is already running"""
+        key = (item.deck.name, item.slide.id, item.deck.full_prompt(item.slide), refresh)
+        task = self.generating.get(key)
+        if task is None:
+            task = asyncio.create_task(self.engine.generate_slide(item.deck, item.slide, item.index, refresh=refresh))
+            self.generating[key] = task
+            task.add_done_callback(lambda _: self.generating.pop(key, None))
+        return task
+
+    async def run_item(self, job: Job, item: Item) -> None:
+        item.status = RUNNING
+        job.emit(event="item", **item.to_dict())
+        item.deck.output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            # Shielded: the generation is shared with other jobs' items
+            result = await asyncio.shield(self.generation(item, job.refresh))
+        except Exception as e:
+            print(f"  ❌ Error ({item.slide.id}): {e}")
+            result, item.error = False, str(e)
+        if result:
+            item.status, item.path = DONE, str(item.deck.output_path(item.slide).resolve())
+        elif result is None:
+            item.status = DEFERRED
+        else:
+            item.status = FAILED
+            item.error = item.error or self.engine.manifest_for(item.deck).slides.get(item.slide.id, {}).get("error")
+        job.emit(event="item", **item.to_dict())
+        if job.finished:
+            job.emit(event="finished", **job.to_dict()["counts"])
+
+    def health(self) -> dict:
+        scheduler = self.engine.scheduler
+        return {"ok": True, "queued": sum(item.status == QUEUED for job in self.jobs.values() for item in job.items),
+                "running": len(self.running), "in_flight": scheduler.in_flight, "window": scheduler.window,
+                "jobs": len(self.jobs)}
+
+    async def route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+        if parts == ["health"] and method == "GET":
+            return await respond(writer, 200, self.health())
+        if parts == ["jobs"]:
+            if method == "POST":
+                try:
+                    payload = json.loads(body or b"{}")
+                except ValueError:
+                    raise RequestError(400, "body is not valid JSON") from None
+                job = self.submit(payload)
+                return await respond(writer, 202, job.to_dict())
+            if method == "GET":
+                return await respond(writer, 200, {"jobs": [job.to_dict() for job in self.jobs.values()]})
+            raise RequestError(405, f"{method} not allowed on /jobs")
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise RequestError(404, f"unknown job {parts[1]}")
+            if len(parts) == 3 and parts[2] == "events" and method == "GET":
+                return await self.stream(job, writer)
+            if len(parts) == 2 and method == "GET":
+                return await respond(writer, 200, job.to_dict())
+            if len(parts) == 2 and method == "DELETE":
+                return await respond(writer, 200, {"cancelled": self.cancel(job), **job.to_dict()})
+        raise RequestError(404, f"no route for {method} {path}")
+
+    async def stream(self, job: Job, writer: asyncio.StreamWriter) -> None:
+        """Replay the job's events, then follow it until it finishes"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        sent = 0
+        while True:
+            changed = job.changed
+            for event in job.events[max(0, sent - job.dropped):]:
+                line = json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"
+                writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            sent = job.emitted
+            await writer.drain()
+            if job.finished:
+                break
+            await changed.wait()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            if len(request_line) != 3:
+                return
+            method, path, _ = request_line
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                raise RequestError(400, "invalid Content-Length") from None
+            if length < 0:
+                raise RequestError(400, "invalid Content-Length")
+            if length > MAX_BODY_BYTES:
+                raise RequestError(413, f"body larger than {MAX_BODY_BYTES} bytes")
+            body = await reader.readexactly(length) if length else b""
+            await self.route(method.upper(), path, body, writer)
+        except RequestError as e:
+            await respond(writer, e.status, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"  ❌ Service error: {e}")
+            await respond(writer, 500, {"error": str(e)})
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, socket_path: Path = None) -> None:
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(self.handle, path=str(socket_path))
+            where = f"unix:{socket_path}"
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"http://{host}:{port}"
+        print(f"✅ slidegen service listening on {where}")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        dispatcher = asyncio.create_task(self.dispatch())
+        async with server:
+            await stop.wait()
+        dispatcher.cancel()
+        if self.running:
+            print(f"Waiting for {len(self.running)} running slide(s)...")
+            await asyncio.gather(*self.running, return_exceptions=True)
+        # The manifests also compact themselves every COMPACT_EVERY changes
+        await self.engine.io(self.engine.compact_manifests)
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
+
+
+async def respond(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="slidegen.service", description="Local slide generation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", type=Path, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--output-dir", type=Path, default=SERVICE_OUTPUT_DIR,
+                        help=f"where ad-hoc prompts are rendered (default: {SERVICE_OUTPUT_DIR})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"max in-flight requests (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--warm", action="append", metavar="DECK",
+                        help=f"decks whose backends are created at start-up (default: {', '.join(DEFAULT_DECKS)})")
+    parser.add_argument("--rate-limit", type=float, metavar="RPM",
+                        help="requests per minute shared with every other slidegen process using the API key")
+    parser.add_argument("--job-ttl", type=float, default=DEFAULT_JOB_TTL, metavar="SECONDS",
+                        help=f"forget finished jobs after this long (default: {DEFAULT_JOB_TTL:.0f})")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS,
+                        help=f"keep at most this many finished jobs (default: {DEFAULT_MAX_JOBS})")
+    parser.add_argument("--no-cache", action="store_true", help="always call the model")
+    parser.add_argument("--no-metrics", action="store_true", help="do not record per-attempt metrics")
+    parser.add_argument("--no-history", action="store_true", help="do not record generations in the history")
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else ResponseCache(DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES)
+    metrics = None if args.no_metrics else MetricsRecorder(DEFAULT_METRICS_PATH)
+    history = None if args.no_history else HistoryStore(DEFAULT_HISTORY_PATH,
+                                                        run_id=metrics.run_id if metrics else None)
+    engine = SlideEngine(cache=cache, scheduler=AIMDScheduler(initial=2, maximum=args.concurrency),
+                         retry=RetryPolicy(), metrics=metrics, history=history,
+                         rate_limiter=SharedRateLimiter(args.rate_limit) if args.rate_limit else None)
+    service = SlideService(engine, args.output_dir, args.job_ttl, args.max_jobs)
+
+    async def run() -> None:
+        await service.warm(args.warm or DEFAULT_DECKS)
+        await service.serve(args.host, args.port, args.socket)
+
+    try:
+        asyncio.run(run())
+    finally:
+        if metrics is not None:
+            metrics.close()
+        if history is not None:
+            history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
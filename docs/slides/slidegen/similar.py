@@ -0,0 +1,214 @@
+"""
+Near-duplicate prompt lookup for the response cache
+
+The exact cache misses a slide whose prompt only changed in wording. With
+``--similar offer|reuse`` every generated image's prompt is also indexed in
+.cache/similar.jsonl, and on an exact miss the new prompt is compared with
+the indexed ones:
+
+  - the quoted text of a prompt ("..." or 「...」: titles, labels, product
+    names) is what ends up on the image, so it must be identical; a prompt
+    that only differs in a product name or a label never matches
+  - the remaining prose is compared by cosine similarity of character
+    3-grams (lowercased, runs of whitespace collapsed), computed locally;
+    character n-grams work for Japanese as well as for English
+  - similarity is the smaller of the cosine between the style prefixes and
+    the cosine between the prose, so a different style never matches
+  - only entries of the same model are considered unless ``any_model``
+
+At or above the threshold (default 0.65) ``reuse`` restores the earlier
+image from the cache; ``offer`` only reports it and generates as usual.
+
+Entries are keyed by cache key and appended to the index one line at a time
+under a lock; the file is compacted to the newest ``max_entries`` entries
+once it has grown to twice that.
+
+    python -m slidegen.similar --deck business-v2     # best indexed match per slide
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from .config import CACHE_DIR
+from .output import atomic_write, locked
+
+DEFAULT_INDEX_PATH = CACHE_DIR / "similar.jsonl"
+# Same-labelled rewrites of a slide score ~0.70-0.75, different slides <= 0.5
+DEFAULT_THRESHOLD = 0.65
+DEFAULT_MAX_ENTRIES = 5000
+NGRAM = 3
+QUOTED_RE = re.compile(r'"([^"\n]+)"|「([^」\n]+)」')
+
+MODES = ("offer", "reuse")
+
+
+def ngrams(text: str, n: int = NGRAM) -> Counter:
+    text = " ".join(text.lower().split())
+    return Counter(text[i:i + n] for i in range(max(1, len(text) - n + 1)))
+
+
+def weigh(counts: Counter) -> dict:
+    """Sublinear TF, L2-normalized"""
+    vector = {gram: 1 + math.log(count) for gram, count in counts.items()}
+    norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+    return {gram: w / norm for gram, w in vector.items()}
+
+
+def cosine(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(gram, 0.0) for gram, w in a.items())
+
+
+def labels(prompt: str) -> list:
+    """The distinct quoted strings of a prompt, sorted"""
+    return sorted({" ".join((a or b).split()) for a, b in QUOTED_RE.findall(prompt)})
+
+
+def prose(prompt: str) -> str:
+    """The prompt without its quoted strings"""
+    return QUOTED_RE.sub(" ", prompt)
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class Match:
+    key: str
+    score: float
+    deck: str
+    slide: str
+    model: str
+
+
+class SimilarityIndex:
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH, threshold: float = DEFAULT_THRESHOLD,
+                 any_model: bool = False, reuse: bool = False, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.any_model = any_model
+        # False: matches are only offered (reported), True: the engine restores them
+        self.reuse = reuse
+        self.max_entries = max_entries
+        self._vectors = {}
+        self.load()
+
+    def load(self) -> None:
+        self.prefixes = {}
+        # Cache key -> entry, in insertion (age) order
+        self.entries = {}
+        self.lines = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.lines += 1
+                    if "text" in record:
+                        self.prefixes[record["prefix"]] = record["text"]
+                    else:
+                        self.entries.pop(record["key"], None)
+                        self.entries[record["key"]] = record
+        except OSError:
+            pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def _vector(self, text: str) -> dict:
+        # Memoized per process: the index is compared against many slides
+        if text not in self._vectors:
+            self._vectors[text] = weigh(ngrams(text))
+        return self._vectors[text]
+
+    def _append(self, fd: int, record: dict) -> None:
+        os.write(fd, (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.lines += 1
+
+    def add(self, key: str, model: str, prefix: str, prompt: str, deck: str = "", slide: str = "") -> None:
+        prefix_hash = _hash(prefix)
+        entry = {"key": key, "model": model, "prefix": prefix_hash, "labels": _hash("\n".join(labels(prompt))),
+                 "prompt": prompt, "deck": deck, "slide": slide, "ts": round(time.time(), 3)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with locked(self.path.with_name(self.path.name + ".lock")):
+            with open(self.path, "ab") as f:
+                if prefix_hash not in self.prefixes:
+                    self._append(f.fileno(), {"prefix": prefix_hash, "text": prefix})
+                    self.prefixes[prefix_hash] = prefix
+                self._append(f.fileno(), entry)
+            self.entries.pop(key, None)
+            self.entries[key] = entry
+            if self.lines >= 2 * self.max_entries:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the index with the newest ``max_entries`` entries (caller holds the lock)"""
+        self.load()
+        keep = list(self.entries.values())[-self.max_entries:]
+        used = {entry["prefix"] for entry in keep}
+        records = [{"prefix": h, "text": text} for h, text in self.prefixes.items() if h in used] + keep
+        atomic_write(self.path, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8"))
+        self.load()
+
+    def matches(self, model: str, prefix: str, prompt: str, exclude: str = None) -> list:
+        """Indexed entries with the same quoted text scoring at or above the threshold, best first"""
+        label_hash = _hash("\n".join(labels(prompt)))
+        candidates = [entry for entry in self.entries.values()
+                      if entry["labels"] == label_hash and entry["key"] != exclude
+                      and (self.any_model or entry["model"] == model)]
+        if not candidates:
+            return []
+
+        query_prefix = self._vector(prefix)
+        prefix_scores = {h: cosine(query_prefix, self._vector(self.prefixes.get(h, "")))
+                         for h in {entry["prefix"] for entry in candidates}}
+        query = self._vector(prose(prompt))
+        found = []
+        for entry in candidates:
+            if prefix_scores[entry["prefix"]] < self.threshold:
+                continue
+            score = min(prefix_scores[entry["prefix"]], cosine(query, self._vector(prose(entry["prompt"]))))
+            if score >= self.threshold:
+                found.append(Match(entry["key"], score, entry["deck"], entry["slide"], entry["model"]))
+        return sorted(found, key=lambda match: -match.score)
+
+
+def main(argv=None) -> int:
+    from .decks import DECKS, get_deck
+
+    parser = argparse.ArgumentParser(prog="slidegen.similar", description="Closest indexed prompt per slide")
+    parser.add_argument("--deck", action="append", default=[], metavar="NAME",
+                        help=f"deck to check (repeatable; available: {', '.join(DECKS)})")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--threshold", type=float, default=0.0, help="only show matches at or above this")
+    parser.add_argument("--any-model", action="store_true", help="also match images of other models")
+    args = parser.parse_args(argv)
+
+    index = SimilarityIndex(args.index, args.threshold, args.any_model)
+    if not index.entries:
+        print(f"No prompts indexed yet in {args.index} (generate with --similar offer|reuse)")
+        return 1
+    for name in args.deck or list(DECKS):
+        deck = get_deck(name)
+        for slide in deck.slides:
+            found = index.matches(deck.model, deck.style_prefix, deck.prompt_separator + slide.prompt)
+            best = f"{found[0].score:.3f} {found[0].deck}:{found[0].slide} ({found[0].model})" if found else "-"
+            print(f"{deck.name}:{slide.id:<28} {best}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Compile omakase-ai-infographic-sequence.yaml into a Deck
+
+The YAML (global_style_definition plus one ``slide_XX_name`` block of
+visual_elements / text_elements per slide) is turned into a style prefix and
+one prompt per slide, in the same layout as the hand-written decks.
+
+The compiled form is stored in .cache/specs/<sha256>.json, keyed on the
+SHA-256 of the YAML file and COMPILER_VERSION, so later runs skip YAML
+parsing entirely (PyYAML is only needed when the file changed). Every slide
+carries a fingerprint over the style and its own YAML block; editing one
+slide only changes that slide's fingerprint.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from .config import CACHE_DIR, IMAGES_DIR, SLIDES_DIR
+from .deck import Deck, Slide
+from .manifest import file_sha256
+from .output import atomic_write
+
+DEFAULT_SPEC_PATH = SLIDES_DIR / "omakase-ai-infographic-sequence.yaml"
+DEFAULT_SPEC_CACHE_DIR = CACHE_DIR / "specs"
+# Bump when the prompt layout changes so cached compilations are rebuilt
+COMPILER_VERSION = 1
+
+SLIDE_KEY_PREFIX = "slide_"
+
+VISUAL_FIELDS = (
+    ("main_subject_metaphor", "Main subject"),
+    ("supporting_elements", "Supporting elements"),
+    ("background_setting", "Background"),
+    ("state_description", "Mood"),
+)
+
+
+def fingerprint(*parts) -> str:
+    """Stable short hash over JSON-serializable parts"""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _lines(text: str) -> list:
+    return [line.strip() for line in str(text).splitlines() if line.strip()]
+
+
+def compile_style(root: dict) -> str:
+    style = root.get("global_style_definition", {})
+    language = root.get("metadata", {}).get("language", "")
+
+    lines = ["Create a hand-drawn whiteboard-style infographic illustration.", "", "STYLE REQUIREMENTS:"]
+    lines += [f"- {key.replace('_', ' ').capitalize()}: {value}" for key, value in style.get("art_style", {}).items()]
+
+    palette = dict(style.get("color_palette", {}))
+    if "background" in palette:
+        lines.append(f"- {palette.pop('background')} background")
+    for role, color in palette.pop("primary_colors", {}).items():
+        lines.append(f"- {color} for {role.replace('_', ' ')}")
+    lines += [f"- {value}" for value in palette.values()]
+
+    if language:
+        lines.append(f"- ALL visible text labels MUST be in {language.upper()}")
+    lines.append("- High resolution, detailed illustration")
+    return "\n".join(lines) + "\n\n"
+
+
+def compile_slide(block: dict) -> str:
+    description = block.get("prompt_description", {})
+    visual = description.get("visual_elements", {})
+    text = description.get("text_elements", {})
+
+    lines = [f'Create an infographic slide: "{block.get("concept_title", "")}"', "", "VISUAL ELEMENTS:"]
+    for key, label in VISUAL_FIELDS:
+        if visual.get(key):
+            lines.append(f"- {label}:")
+            lines += [f"  {line}" for line in _lines(visual[key])]
+
+    lines += ["", "TEXT LABELS (hand-written style):"]
+    for label in text.get("main_labels", []):
+        placement = f" ({label['attached_to']})" if label.get("attached_to") else ""
+        lines.append(f'- "{label["text"]}"{placement}')
+    if text.get("explanatory_annotation"):
+        lines.append(f'- Annotation: "{text["explanatory_annotation"]}"')
+    return "\n".join(lines) + "\n"
+
+
+def compile_spec(data: dict) -> dict:
+    """Turn the parsed YAML into {"title", "style_prefix", "slides": [{id, title, prompt, fingerprint}]}"""
+    root = data.get("visual_communication_format", data)
+    style_prefix = compile_style(root)
+    style_source = [root.get("global_style_definition"), root.get("metadata", {}).get("language")]
+
+    slides = []
+    for key, block in root.items():
+        if not key.startswith(SLIDE_KEY_PREFIX) or not isinstance(block, dict):
+            continue
+        slides.append({
+            "id": key[len(SLIDE_KEY_PREFIX):],
+            "title": block.get("concept_title", ""),
+            "prompt": compile_slide(block),
+            "fingerprint": fingerprint(COMPILER_VERSION, style_source, block),
+        })
+
+    return {
+        "title": root.get("metadata", {}).get("format_name", ""),
+        "style_prefix": style_prefix,
+        "slides": slides,
+    }
+
+
+def load_spec(path: Path = DEFAULT_SPEC_PATH, cache_dir: Path = DEFAULT_SPEC_CACHE_DIR) -> dict:
+    """Compiled spec for ``path``, from the cache when the file is unchanged"""
+    sha256 = file_sha256(path)
+    key = fingerprint(COMPILER_VERSION, sha256)
+    cached = cache_dir / f"{key}.json"
+    try:
+        return json.loads(cached.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        compiled = compile_spec(yaml.safe_load(f))
+    compiled["source_sha256"] = sha256
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write(cached, json.dumps(compiled, ensure_ascii=False, indent=2).encode("utf-8"))
+    return compiled
+
+
+def deck_from_spec(name: str, path: Path = DEFAULT_SPEC_PATH, output_dir: Path = IMAGES_DIR,
+                   cache_dir: Path = DEFAULT_SPEC_CACHE_DIR, **kwargs) -> Deck:
+    compiled = load_spec(path, cache_dir)
+    return Deck(
+        name=name,
+        title=compiled["title"],
+        style_prefix=compiled["style_prefix"],
+        slides=[Slide(**slide) for slide in compiled["slides"]],
+        output_dir=output_dir,
+        metadata={"spec": str(path), "spec_sha256": compiled["source_sha256"]},
+        **kwargs,
+    )
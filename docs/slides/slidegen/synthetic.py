@@ -0,0 +1,26 @@
+"""
+Synthetic PNG payloads for benchmarks (no Pillow required)
+"""
+
+import random
+import struct
+import zlib
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def synthetic_png(size_bytes: int, seed: int = 0) -> bytes:
+    """A valid RGB PNG of roughly ``size_bytes`` filled with incompressible noise"""
+    # Noise barely compresses, so width*height*3 ~= the encoded size
+    side = max(1, int((size_bytes / 3) ** 0.5))
+    rng = random.Random(seed)
+    rows = b"".join(b"\x00" + rng.randbytes(side * 3) for _ in range(side))
+    header = struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(rows, 1))
+        + _chunk(b"IEND", b"")
+    )
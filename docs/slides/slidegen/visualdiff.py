@@ -0,0 +1,329 @@
+"""
+Perceptual-hash index and visual diff between runs
+
+    python -m slidegen.visualdiff index                          # dHash of every slide output
+    python -m slidegen.visualdiff dupes --distance 4             # identical / near-identical outputs
+    python -m slidegen.visualdiff diff --deck business --rev HEAD  # working tree vs committed images
+    python -m slidegen.visualdiff diff old-run/ new-run/         # two output directories, by file name
+
+``index`` keeps a 64-bit difference hash (dHash) of every output image in
+.cache/phash.json, recomputing only files whose size or mtime changed, and
+``dupes`` lists pairs whose hashes are within ``--distance`` bits (with equal
+SHA-256 reported as identical) as candidates for deduplication.
+
+``diff`` compares each slide with its earlier version: both are scaled to
+COMPARE_WIDTH, then SSIM (box window, computed on integral images with NumPy),
+mean absolute pixel difference, the share of pixels that changed by more
+than PIXEL_THRESHOLD and the dHash distance give a verdict of identical,
+near-identical, minor or changed. Decoding and comparison run in a
+ProcessPoolExecutor. Requires Pillow and NumPy.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .config import CACHE_DIR, SLIDES_DIR
+from .manifest import file_sha256
+from .output import atomic_write
+
+DEFAULT_INDEX_PATH = CACHE_DIR / "phash.json"
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+COMPARE_WIDTH = 512
+SSIM_WINDOW = 8
+# dHash grid: HASH_SIZE x HASH_SIZE bits
+HASH_SIZE = 8
+# Bits of dHash distance still considered the same picture
+NEAR_DISTANCE = 4
+NEAR_SSIM = 0.98
+MINOR_SSIM = 0.90
+# Per-channel difference (0-255) above which a pixel counts as changed
+PIXEL_THRESHOLD = 32
+
+IDENTICAL = "identical"
+NEAR_IDENTICAL = "near-identical"
+MINOR = "minor"
+CHANGED = "changed"
+NEW = "new"
+MISSING = "missing"
+
+
+def _open(source):
+    """RGB image from a path or encoded bytes"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+        return image.convert("RGB")
+
+
+def dhash(image) -> int:
+    import numpy as np
+    from PIL import Image
+
+    small = np.asarray(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _box_mean(x, window: int):
+    """Mean over every window x window box, from an integral image"""
+    import numpy as np
+
+    c = np.pad(x, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    w = window
+    return (c[w:, w:] - c[:-w, w:] - c[w:, :-w] + c[:-w, :-w]) / (w * w)
+
+
+def ssim(a, b, window: int = SSIM_WINDOW) -> float:
+    """Mean SSIM of two equally sized grayscale arrays in 0-255"""
+    import numpy as np
+
+    a, b = a.astype(np.float64), b.astype(np.float64)
+    window = max(1, min(window, *a.shape))
+    mu_a, mu_b = _box_mean(a, window), _box_mean(b, window)
+    var_a = _box_mean(a * a, window) - mu_a ** 2
+    var_b = _box_mean(b * b, window) - mu_b ** 2
+    cov = _box_mean(a * b, window) - mu_a * mu_b
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    index = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(index.mean())
+
+
+def compare(old, new) -> dict:
+    """SSIM, pixel difference and dHash distance of two images (paths or encoded bytes)"""
+    import numpy as np
+    from PIL import Image
+
+    a, b = _open(old), _open(new)
+    width = min(COMPARE_WIDTH, b.width)
+    size = (width, max(1, round(b.height * width / b.width)))
+    a_small, b_small = (np.asarray(image.resize(size, Image.BILINEAR), dtype=np.int16) for image in (a, b))
+    diff = np.abs(a_small - b_small)
+    luma = np.array([0.299, 0.587, 0.114])
+    return {
+        "ssim": round(ssim(a_small @ luma, b_small @ luma), 4),
+        "pixel_diff": round(float(diff.mean()) / 255, 4),
+        "changed_pixels": round(float((diff.max(axis=2) > PIXEL_THRESHOLD).mean()), 4),
+        "dhash_distance": hamming(dhash(a), dhash(b)),
+        "resized": a.size != b.size,
+    }
+
+
+def verdict(row: dict) -> str:
+    if row["ssim"] >= NEAR_SSIM and row["dhash_distance"] <= NEAR_DISTANCE:
+        return NEAR_IDENTICAL
+    return MINOR if row["ssim"] >= MINOR_SSIM else CHANGED
+
+
+def _sha256(source) -> str:
+    return hashlib.sha256(source).hexdigest() if isinstance(source, bytes) else file_sha256(source)
+
+
+def _compare_pair(name: str, old, new: str) -> dict:
+    """One report row; runs in a worker process"""
+    row = {"name": name, "new": new}
+    if old is None:
+        return {**row, "verdict": NEW}
+    if not Path(new).exists():
+        return {**row, "verdict": MISSING}
+    if _sha256(old) == file_sha256(new):
+        return {**row, "verdict": IDENTICAL, "ssim": 1.0, "pixel_diff": 0.0, "changed_pixels": 0.0,
+                "dhash_distance": 0, "resized": False}
+    row.update(compare(old, new))
+    return {**row, "verdict": verdict(row)}
+
+
+def diff(pairs: list, workers: int = None) -> list:
+    """Report rows for (name, old path or bytes or None, new path) pairs, in order"""
+    import numpy  # noqa: F401
+    import PIL  # noqa: F401  (fail before queuing work when a dependency is missing)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_compare_pair, name, old, str(new)) for name, old, new in pairs]
+        return [future.result() for future in futures]
+
+
+def git_blobs(rev: str, paths: list) -> list:
+    """Contents of each path at ``rev`` (None where it did not exist), read with one git process"""
+    root = Path(subprocess.run(["git", "-C", str(SLIDES_DIR), "rev-parse", "--show-toplevel"],
+                               capture_output=True, text=True, check=True).stdout.strip())
+    specs = "".join(f"{rev}:{Path(os.path.relpath(path, root)).as_posix()}\n" for path in paths)
+    out = subprocess.run(["git", "-C", str(root), "cat-file", "--batch"], input=specs.encode("utf-8"),
+                         capture_output=True, check=True).stdout
+
+    blobs, offset = [], 0
+    for _ in paths:
+        end = out.index(b"\n", offset)
+        header = out[offset:end].split()
+        offset = end + 1
+        if len(header) != 3 or header[1] != b"blob":
+            blobs.append(None)
+            continue
+        size = int(header[2])
+        blobs.append(out[offset:offset + size])
+        offset += size + 1
+    return blobs
+
+
+def deck_pairs(decks: list, rev: str = "HEAD") -> list:
+    outputs = [(f"{deck.name}:{slide.id}", deck.output_path(slide)) for deck in decks for slide in deck.slides]
+    blobs = git_blobs(rev, [path for _, path in outputs])
+    return [(name, blob, path) for (name, path), blob in zip(outputs, blobs)]
+
+
+def dir_pairs(old_dir: Path, new_dir: Path) -> list:
+    pairs = []
+    for new in sorted(Path(new_dir).iterdir()):
+        if new.suffix.lower() in IMAGE_SUFFIXES:
+            old = Path(old_dir) / new.name
+            pairs.append((new.name, old if old.exists() else None, new))
+    return pairs
+
+
+def _fingerprint(path: str) -> dict:
+    """Index entry of one image; runs in a worker process"""
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    image = _open(data)
+    return {"sha256": hashlib.sha256(data).hexdigest(), "bytes": stat.st_size, "mtime": stat.st_mtime,
+            "dhash": f"{dhash(image):016x}", "width": image.width, "height": image.height}
+
+
+class PHashIndex:
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH):
+        self.path = Path(path)
+        try:
+            self.images = json.loads(self.path.read_text(encoding="utf-8")).get("images", {})
+        except (OSError, ValueError):
+            self.images = {}
+
+    @staticmethod
+    def name(path: Path) -> str:
+        """Relative to docs/slides when inside it, else absolute"""
+        path = Path(path).resolve()
+        return str(path.relative_to(SLIDES_DIR)) if path.is_relative_to(SLIDES_DIR) else str(path)
+
+    def update(self, paths: list, workers: int = None) -> int:
+        """(Re)hash the images that are new or changed since the last update; returns how many"""
+        import numpy  # noqa: F401
+        import PIL  # noqa: F401
+
+        stale = []
+        for path in paths:
+            entry = self.images.get(self.name(path))
+            stat = path.stat()
+            if not entry or entry["bytes"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+                stale.append(path)
+        if stale:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for path, entry in zip(stale, pool.map(_fingerprint, map(str, stale))):
+                    self.images[self.name(path)] = entry
+        current = {self.name(path) for path in paths}
+        self.images = {name: entry for name, entry in self.images.items() if name in current}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, json.dumps({"images": self.images}, indent=2).encode("utf-8"))
+        return len(stale)
+
+    def duplicates(self, distance: int = NEAR_DISTANCE) -> list:
+        """(name, name, dHash distance, identical) for every pair within ``distance`` bits"""
+        entries = sorted((name, int(entry["dhash"], 16), entry["sha256"]) for name, entry in self.images.items())
+        pairs = []
+        for i, (name_a, hash_a, sha_a) in enumerate(entries):
+            for name_b, hash_b, sha_b in entries[i + 1:]:
+                bits = hamming(hash_a, hash_b)
+                if bits <= distance:
+                    pairs.append((name_a, name_b, bits, sha_a == sha_b))
+        return sorted(pairs, key=lambda pair: (not pair[3], pair[2], pair[0]))
+
+
+def output_paths(decks: list, dirs: list = ()) -> list:
+    """Existing outputs of ``decks`` plus the images in ``dirs``, each path once"""
+    paths = {deck.output_path(slide) for deck in decks for slide in deck.slides}
+    for directory in dirs:
+        paths |= {path for path in Path(directory).iterdir() if path.suffix.lower() in IMAGE_SUFFIXES}
+    return sorted(path for path in paths if path.exists())
+
+
+def report(rows: list, changed_only: bool = False) -> None:
+    print(f"{'slide':<40} {'verdict':<15} {'SSIM':>6} {'diff %':>7} {'changed %':>9} {'dHash':>5}")
+    for row in rows:
+        if changed_only and row["verdict"] in (IDENTICAL, NEAR_IDENTICAL):
+            continue
+        if "ssim" not in row:
+            print(f"{row['name']:<40} {row['verdict']:<15}")
+            continue
+        print(f"{row['name']:<40} {row['verdict']:<15} {row['ssim']:>6.3f} {row['pixel_diff']:>7.2%} "
+              f"{row['changed_pixels']:>9.2%} {row['dhash_distance']:>5}")
+    counts = {}
+    for row in rows:
+        counts[row["verdict"]] = counts.get(row["verdict"], 0) + 1
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+def main(argv=None) -> int:
+    from .decks import DECKS, get_deck
+
+    parser = argparse.ArgumentParser(prog="slidegen.visualdiff", description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("index", "update the perceptual-hash index"),
+                            ("dupes", "update the index and list identical / near-identical images")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--deck", action="append", default=[], metavar="NAME",
+                             help="decks whose outputs are indexed (default: every deck)")
+        command.add_argument("--dir", action="append", default=[], type=Path, help="also index this directory")
+        command.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH)
+        if name == "dupes":
+            command.add_argument("--distance", type=int, default=NEAR_DISTANCE,
+                                 help=f"max differing dHash bits (default: {NEAR_DISTANCE})")
+    compare_command = commands.add_parser("diff", help="per-slide visual diff between two runs")
+    compare_command.add_argument("dirs", nargs="*", type=Path, metavar="DIR", help="OLD_DIR NEW_DIR")
+    compare_command.add_argument("--deck", action="append", default=[], metavar="NAME",
+                                 help=f"compare this deck's outputs with --rev (available: {', '.join(DECKS)})")
+    compare_command.add_argument("--rev", default="HEAD", help="git revision of the earlier images (default: HEAD)")
+    compare_command.add_argument("--changed-only", action="store_true", help="hide identical and near-identical")
+    compare_command.add_argument("--json", type=Path, help="also write the rows to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "diff":
+            if len(args.dirs) == 2:
+                pairs = dir_pairs(*args.dirs)
+            elif not args.dirs and args.deck:
+                pairs = deck_pairs([get_deck(name) for name in args.deck], args.rev)
+            else:
+                parser.error("diff needs OLD_DIR NEW_DIR or at least one --deck")
+            rows = diff(pairs, args.workers)
+            report(rows, args.changed_only)
+            if args.json:
+                args.json.write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+            return 0
+
+        decks = [get_deck(name) for name in args.deck] if args.deck else list(DECKS.values())
+        index = PHashIndex(args.index)
+        paths = output_paths(decks, args.dir)
+        updated = index.update(paths, args.workers)
+        print(f"✅ {len(paths)} image(s) indexed, {updated} rehashed ({args.index})")
+        if args.command == "dupes":
+            for name_a, name_b, bits, identical in index.duplicates(args.distance):
+                kind = IDENTICAL if identical else f"{NEAR_IDENTICAL} ({bits} bits)"
+                print(f"  ♻️ {name_a} ~ {name_b}: {kind}")
+    except ImportError:
+        print("❌ Visual diff needs Pillow and NumPy: pip install pillow numpy")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+SQLite work queue with leased jobs
+
+    python -m slidegen --deck business --deck protocol --catalog --enqueue
+    python -m slidegen --worker --async &      # as many workers (and hosts sharing the file) as wanted
+    python -m slidegen --worker --async
+    python -m slidegen.workqueue status
+    python -m slidegen.workqueue requeue
+
+Each slide is one row of .cache/queue.sqlite3, unique per deck, catalog
+root and slide (every catalog deck is called "catalog").
+A worker leases the oldest queued job (or one whose lease expired because
+its worker crashed) in a single IMMEDIATE transaction, keeps the lease alive
+while generating and then completes or fails it. A failed job is re-queued
+until it has used ``max_attempts`` leases, unless its error is permanent
+(blocked prompt, 400...): that fails it right away. Completion is idempotent: a job
+finished by two workers (after a lease expired mid-generation) is done once.
+Enqueueing a slide that is already queued or leased changes nothing; a done
+or failed one is queued again.
+
+The async worker runs every queue call in a thread (a busy database can
+hold a call for up to the 30 s sqlite timeout); calls on the shared
+connection are serialized by a lock.
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .config import CACHE_DIR
+
+DEFAULT_QUEUE_PATH = CACHE_DIR / "queue.sqlite3"
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA_VERSION = 1
+COLUMNS = ("id, deck, slide, source, refresh, status, attempts, max_attempts, lease_owner, lease_expires, error, "
+           "enqueued_at, updated_at")
+TABLE = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    deck TEXT NOT NULL,
+    slide TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    refresh INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (deck, source, slide)
+)
+"""
+INDEX = "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)"
+
+
+@dataclass
+class Job:
+    id: int
+    deck: str
+    slide: str
+    source: str
+    refresh: bool
+    attempts: int
+    owner: str
+
+
+def serialized(method):
+    """Run a WorkQueue method under the queue's lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(self, path: Path = DEFAULT_QUEUE_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; multi-statement updates open their own IMMEDIATE transaction.
+        # Shared by worker threads, one call at a time (re-entrant: lease() may recurse)
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._create()
+
+    def _create(self) -> None:
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.db.execute("PRAGMA user_version").fetchone()[0]
+            migrate = version < SCHEMA_VERSION and self.db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs'").fetchone()
+            if migrate:
+                # Version 0 was unique per (deck, slide), so jobs of two catalogs clashed
+                self.db.execute("ALTER TABLE jobs RENAME TO jobs_v0")
+                self.db.execute("DROP INDEX IF EXISTS jobs_status")
+            self.db.execute(TABLE)
+            self.db.execute(INDEX)
+            if migrate:
+                old = COLUMNS.replace("source", "COALESCE(source, '')")
+                self.db.execute(f"INSERT INTO jobs ({COLUMNS}) SELECT {old} FROM jobs_v0")
+                self.db.execute("DROP TABLE jobs_v0")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    @serialized
+    def enqueue(self, decks: list, refresh=frozenset()) -> int:
+        """Queue every slide of ``decks`` that is not queued or leased already; returns the jobs queued"""
+        now = time.time()
+        before = self.db.total_changes
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            for deck in decks:
+                source = deck.metadata.get("catalog") or ""
+                for slide in deck.slides:
+                    forced = slide.id in refresh or f"{deck.name}:{slide.id}" in refresh
+                    self.db.execute(
+                        "INSERT INTO jobs (deck, slide, source, refresh, status, max_attempts, enqueued_at, updated_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (deck, source, slide) DO UPDATE SET"
+                        " status = excluded.status, attempts = 0, error = NULL,"
+                        " refresh = excluded.refresh, max_attempts = excluded.max_attempts,"
+                        " updated_at = excluded.updated_at WHERE jobs.status IN (?, ?)",
+                        (deck.name, slide.id, source, int(forced), QUEUED, self.max_attempts, now, now, DONE, FAILED),
+                    )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return self.db.total_changes - before
+
+    @serialized
+    def lease(self, owner: str, seconds: float = DEFAULT_LEASE_SECONDS) -> Job | None:
+        """Claim the oldest queued (or expired) job for ``owner``; None when nothing is claimable"""
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                "SELECT * FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (QUEUED, LEASED, now),
+            ).fetchone()
+            if row is None:
+                self.db.execute("COMMIT")
+                return None
+            if row["status"] == LEASED and row["attempts"] >= row["max_attempts"]:
+                # Its last worker died mid-lease: no attempts left
+                self.db.execute("UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                                "WHERE id = ?", (FAILED, f"lease of {row['lease_owner']} expired", now, row["id"]))
+                self.db.execute("COMMIT")
+                return self.lease(owner, seconds)
+            self.db.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (LEASED, owner, now + seconds, now, row["id"]),
+            )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return Job(row["id"], row["deck"], row["slide"], row["source"], bool(row["refresh"]),
+                   row["attempts"] + 1, owner)
+
+    @serialized
+    def renew(self, job: Job, seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend the lease; False if it expired and another worker took the job"""
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (time.time() + seconds, time.time(), job.id, LEASED, job.owner),
+        )
+        return cursor.rowcount == 1
+
+    @serialized
+    def complete(self, job: Job) -> bool:
+        """Mark the job done (whoever holds the lease now); False if it already was"""
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = ?, error = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status != ?",
+            (DONE, time.time(), job.id, DONE),
+        )
+        return cursor.rowcount == 1
+
+    @serialized
+    def fail(self, job: Job, error: str, retry: bool = True) -> str | None:
+        """Re-queue the job, or fail it for good once its attempts are used up; None if the lease was lost"""
+        row = self.db.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job.id,)).fetchone()
+        status = QUEUED if retry and row and row["attempts"] < row["max_attempts"] else FAILED
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (status, error, time.time(), job.id, LEASED, job.owner),
+        )
+        return status if cursor.rowcount == 1 else None
+
+    @serialized
+    def release(self, job: Job) -> None:
+        """Give a job back without counting the attempt (e.g. the budget ran out)"""
+        self.db.execute(
+            "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_owner = NULL, lease_expires = NULL, "
+            "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (QUEUED, time.time(), job.id, LEASED, job.owner),
+        )
+
+    @serialized
+    def pending(self) -> int:
+        """Jobs not yet done or failed (queued or leased)"""
+        return self.db.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, LEASED)).fetchone()[0]
+
+    @serialized
+    def counts(self) -> dict:
+        return {row["status"]: row["count"] for row in self.db.execute(
+            "SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")}
+
+    @serialized
+    def requeue(self, failed_only: bool = True) -> int:
+        where = "status = ?" if failed_only else "status != ?"
+        cursor = self.db.execute(
+            f"UPDATE jobs SET status = ?, attempts = 0, error = NULL, lease_owner = NULL, lease_expires = NULL, "
+            f"updated_at = ? WHERE {where}",
+            (QUEUED, time.time(), FAILED if failed_only else LEASED),
+        )
+        return cursor.rowcount
+
+    @serialized
+    def purge(self) -> int:
+        return self.db.execute("DELETE FROM jobs WHERE status = ?", (DONE,)).rowcount
+
+    def close(self) -> None:
+        self.db.close()
+
+
+async def work(engine, queue: WorkQueue, resolve, concurrency: int = 1,
+               lease_seconds: float = DEFAULT_LEASE_SECONDS, owner: str = None, poll: float = 5.0) -> dict:
+    """Consume ``queue`` with ``engine`` until no job is queued or leased
+
+    ``resolve(job)`` returns the Deck of a job. Returns counts of done,
+    failed, requeued and released jobs for this worker.
+    """
+    owner = owner or worker_id()
+    stats = {"done": 0, "failed": 0, "requeued": 0, "released": 0}
+    stopped = asyncio.Event()
+
+    async def keep_alive(job: Job) -> None:
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            if not await asyncio.to_thread(queue.renew, job, lease_seconds):
+                print(f"  ⚠️ Lease lost ({job.deck}:{job.slide}); finishing anyway")
+                return
+
+    async def run(job: Job) -> None:
+        try:
+            deck = resolve(job)
+            slide = deck.slide(job.slide)
+        except (KeyError, OSError) as e:
+            error = str(e.args[0]) if isinstance(e, KeyError) else str(e)
+            await asyncio.to_thread(queue.fail, job, error, False)
+            stats["failed"] += 1
+            print(f"  ❌ {job.deck}:{job.slide}: {error}")
+            return
+
+        deck.output_dir.mkdir(parents=True, exist_ok=True)
+        heartbeat = asyncio.create_task(keep_alive(job))
+        try:
+            result = await engine.generate_slide(deck, slide, deck.slides.index(slide), refresh=job.refresh)
+        except Exception as e:
+            result = False
+            print(f"  ❌ Error ({job.slide}): {e}")
+        finally:
+            heartbeat.cancel()
+
+        if result:
+            await asyncio.to_thread(queue.complete, job)
+            stats["done"] += 1
+        elif result is None:
+            # Deferred by the budget: hand the job back and stop leasing
+            await asyncio.to_thread(queue.release, job)
+            stats["released"] += 1
+            stopped.set()
+        else:
+            entry = engine.manifest_for(deck).slides.get(slide.id, {})
+            # Permanent errors (blocked prompt, 400...) are not worth another lease
+            status = await asyncio.to_thread(queue.fail, job, entry.get("error") or "generation failed",
+                                             entry.get("retryable", True))
+            if status == QUEUED:
+                stats["requeued"] += 1
+                print(f"  🔁 Re-queued {job.deck}:{job.slide} (attempt {job.attempts} failed)")
+            elif status == FAILED:
+                stats["failed"] += 1
+
+    async def lane() -> None:
+        while not stopped.is_set():
+            job = await asyncio.to_thread(queue.lease, owner, lease_seconds)
+            if job is None:
+                if not await asyncio.to_thread(queue.pending):
+                    return
+                # Everything left is leased by other workers: wait for them or for an expired lease
+                await asyncio.sleep(poll)
+                continue
+            await run(job)
+
+    try:
+        await asyncio.gather(*(lane() for _ in range(max(1, concurrency))))
+    finally:
+        engine.compact_manifests()
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="slidegen.workqueue", description="Inspect the generation work queue")
+    parser.add_argument("--db", type=Path, default=DEFAULT_QUEUE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="jobs per status and the latest failures")
+    requeue = commands.add_parser("requeue", help="queue jobs again")
+    requeue.add_argument("--all", action="store_true", help="every job that is not leased, not only failed ones")
+    commands.add_parser("purge", help="delete done jobs")
+    args = parser.parse_args(argv)
+
+    if not args.db.exists():
+        print(f"No queue yet at {args.db}")
+        return 1
+    queue = WorkQueue(args.db)
+    if args.command == "status":
+        counts = queue.counts()
+        print("  ".join(f"{status}: {counts.get(status, 0)}" for status in (QUEUED, LEASED, DONE, FAILED)))
+        now = time.time()
+        for row in queue.db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id", (LEASED,)):
+            print(f"  ⏱️ {row['deck']}:{row['slide']} leased by {row['lease_owner']} "
+                  f"({row['lease_expires'] - now:+.0f}s, attempt {row['attempts']})")
+        for row in queue.db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY updated_at DESC LIMIT 20",
+                                    (FAILED,)):
+            print(f"  ❌ {row['deck']}:{row['slide']} after {row['attempts']} attempt(s): {(row['error'] or '')[:80]}")
+    elif args.command == "requeue":
+        print(f"🔁 {queue.requeue(failed_only=not args.all)} job(s) queued again")
+    else:
+        print(f"{queue.purge()} done job(s) deleted")
+    queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
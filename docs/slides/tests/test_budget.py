@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from slidegen.bench import SimulationConfig, simulated_deck
+from slidegen.budget import IMAGE_OUTPUT_TOKENS, RESERVATION_TTL, Budget, BudgetExhausted, BudgetTracker
+
+
+def tracker(tmp_path, **limits) -> BudgetTracker:
+    return BudgetTracker(Budget(**limits), tmp_path / "budget.json")
+
+
+def test_request_limit_is_a_hard_stop(tmp_path):
+    budget = tracker(tmp_path, max_requests=2)
+    budget.reserve("gemini-2.5-flash-image", "prompt")
+    budget.reserve("gemini-2.5-flash-image", "prompt")
+    with pytest.raises(BudgetExhausted, match="request limit of 2"):
+        budget.reserve("gemini-2.5-flash-image", "prompt")
+    assert budget.stopped
+
+
+def test_unsent_release_gives_the_request_back(tmp_path):
+    budget = tracker(tmp_path, max_requests=1)
+    budget.release(budget.reserve("m", "prompt"), sent=False)
+    assert budget.state["requests"] == 0 and budget.state["reserved"] == {}
+    budget.release(budget.reserve("m", "prompt"))
+    assert budget.state["requests"] == 1
+    with pytest.raises(BudgetExhausted):
+        budget.reserve("m", "prompt")
+
+
+def test_in_flight_reservations_count_against_the_token_limit(tmp_path):
+    budget = tracker(tmp_path, max_tokens=IMAGE_OUTPUT_TOKENS + 100)
+    budget.reserve("m", "short prompt")
+    with pytest.raises(BudgetExhausted, match="token limit"):
+        budget.reserve("m", "short prompt")
+
+
+def test_charge_replaces_the_estimate_with_usage(tmp_path):
+    budget = tracker(tmp_path, max_tokens=100_000)
+    reservation = budget.reserve("gemini-2.5-flash-image", "prompt")
+    budget.charge("gemini-2.5-flash-image", 40, 1290, reservation=reservation)
+    state = json.loads((tmp_path / "budget.json").read_text())
+    assert state["reserved"] == {}
+    assert (state["prompt_tokens"], state["output_tokens"], state["requests"]) == (40, 1290, 1)
+    assert state["cost"] == pytest.approx(0.039 + 40 * 0.30 / 1_000_000)
+
+
+def test_trackers_on_one_file_share_usage(tmp_path):
+    first, second = tracker(tmp_path, max_requests=3), tracker(tmp_path, max_requests=3)
+    first.reserve("m", "prompt")
+    second.reserve("m", "prompt")
+    first.reserve("m", "prompt")
+    with pytest.raises(BudgetExhausted):
+        second.reserve("m", "prompt")
+
+
+def test_reservations_of_crashed_processes_expire(tmp_path):
+    budget = tracker(tmp_path, max_tokens=IMAGE_OUTPUT_TOKENS + 100)
+    budget.reserve("m", "prompt")
+    state = json.loads((tmp_path / "budget.json").read_text())
+    for reservation in state["reserved"].values():
+        reservation["at"] -= RESERVATION_TTL + 1
+    (tmp_path / "budget.json").write_text(json.dumps(state))
+    budget.reserve("m", "prompt")
+
+
+def test_deferred_slides_are_queued_once(tmp_path):
+    deck = simulated_deck(SimulationConfig(slides=2), tmp_path / "out")
+    budget = tracker(tmp_path)
+    budget.defer(deck, "01_bench")
+    budget.defer(deck, "01_bench")
+    budget.defer(deck, "02_bench")
+    assert [d["slide"] for d in tracker(tmp_path).deferred()] == ["01_bench", "02_bench"]
+    budget.completed(deck, "01_bench")
+    assert [d["slide"] for d in tracker(tmp_path).deferred()] == ["02_bench"]
@@ -0,0 +1,75 @@
+import contextlib
+import io
+
+from slidegen.bench import SimulatedBackend, SimulatedError, SimulationConfig, simulated_deck
+from slidegen.engine import SlideEngine
+from slidegen.manifest import DONE
+from slidegen.retry import RetryPolicy
+from slidegen.scheduler import AIMDScheduler
+
+
+class FailingBackend(SimulatedBackend):
+    def __init__(self, config, code):
+        super().__init__(config)
+        self.code = code
+
+    async def generate(self, prompt):
+        self.calls += 1
+        raise SimulatedError(self.code, "simulated")
+
+
+def engine_for(tmp_path, backend, **kwargs) -> SlideEngine:
+    return SlideEngine(scheduler=AIMDScheduler(initial=4, maximum=4), backend_factory=lambda deck: backend,
+                       retry=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.002),
+                       manifest_dir=tmp_path / "manifests", **kwargs)
+
+
+def generate(engine, deck, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engine.generate([deck], **kwargs)[deck.name]
+
+
+def test_resume_skips_complete_slides(tmp_path):
+    config = SimulationConfig(slides=5, latency_ms=1, sigma=0, size_kb=1)
+    deck = simulated_deck(config, tmp_path / "out")
+    backend = SimulatedBackend(config)
+    assert generate(engine_for(tmp_path, backend), deck) == [True] * 5
+    assert backend.calls == 5
+
+    # A fresh engine (a later run) only regenerates the slide whose output changed
+    deck.output_path(deck.slides[2]).write_bytes(b"edited")
+    assert generate(engine_for(tmp_path, backend), deck, resume=True) == [True] * 5
+    assert backend.calls == 6
+
+
+def test_transient_errors_are_retried_then_recorded_as_retryable(tmp_path):
+    config = SimulationConfig(slides=1)
+    deck = simulated_deck(config, tmp_path / "out")
+    backend = FailingBackend(config, 500)
+    engine = engine_for(tmp_path, backend)
+    assert generate(engine, deck) == [False]
+    assert backend.calls == 3
+    entry = engine.manifest_for(deck).slides[deck.slides[0].id]
+    assert entry["retryable"] is True and entry["error"].startswith("gave up after attempt 3")
+
+
+def test_permanent_errors_are_not_retried(tmp_path):
+    config = SimulationConfig(slides=1)
+    deck = simulated_deck(config, tmp_path / "out")
+    backend = FailingBackend(config, 400)
+    engine = engine_for(tmp_path, backend)
+    assert generate(engine, deck) == [False]
+    assert backend.calls == 1
+    entry = engine.manifest_for(deck).slides[deck.slides[0].id]
+    assert entry["retryable"] is False and entry["error"].startswith("permanent error on attempt 1")
+
+
+def test_throttling_shrinks_the_window(tmp_path):
+    config = SimulationConfig(slides=6, latency_ms=1, sigma=0, size_kb=1, capacity=1, retry_after=0.001)
+    deck = simulated_deck(config, tmp_path / "out")
+    backend = SimulatedBackend(config)
+    engine = engine_for(tmp_path, backend)
+    engine.retry.max_attempts = 20
+    assert generate(engine, deck) == [True] * 6
+    assert backend.rejected and engine.scheduler.window < 4
+    assert engine.manifest_for(deck).status(deck.slides[0].id) == DONE
@@ -0,0 +1,79 @@
+import json
+
+from slidegen.manifest import COMPACT_EVERY, DONE, FAILED, RunManifest, file_sha256
+
+
+def output(tmp_path, name="slide.png", data=b"\x89PNG image"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+def test_log_is_replayed_over_the_snapshot(tmp_path):
+    manifest = RunManifest.load(tmp_path / "deck.json", "deck")
+    manifest.start("a", "key-a")
+    manifest.done("a", output(tmp_path), source="model")
+    manifest.start("b", "key-b")
+    manifest.failed("b", "gave up", retryable=False)
+    assert not (tmp_path / "deck.json").exists()
+
+    reloaded = RunManifest.load(tmp_path / "deck.json", "deck")
+    assert reloaded.status("a") == DONE and reloaded.status("b") == FAILED
+    assert reloaded.slides["b"]["retryable"] is False
+    assert reloaded.logged == 4
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    manifest = RunManifest.load(tmp_path / "deck.json", "deck")
+    manifest.start("a", "key-a")
+    with open(tmp_path / "deck.jsonl", "a") as f:
+        f.write('{"id": "b", "entr')
+    assert set(RunManifest.load(tmp_path / "deck.json", "deck").slides) == {"a"}
+
+
+def test_compaction_keeps_other_writers_entries(tmp_path):
+    first = RunManifest.load(tmp_path / "deck.json", "deck")
+    second = RunManifest.load(tmp_path / "deck.json", "deck")
+    first.start("a", "key-a")
+    second.start("b", "key-b")
+    first.compact()
+
+    assert (tmp_path / "deck.jsonl").stat().st_size == 0
+    snapshot = json.loads((tmp_path / "deck.json").read_text())
+    assert set(snapshot["slides"]) == {"a", "b"}
+    assert set(first.slides) == {"a", "b"}
+
+
+def test_log_compacts_itself(tmp_path):
+    manifest = RunManifest.load(tmp_path / "deck.json", "deck")
+    for i in range(COMPACT_EVERY + 5):
+        manifest.start(f"s{i % 10}", "key")
+    assert manifest.logged == 5
+    assert RunManifest.load(tmp_path / "deck.json", "deck").logged == 5
+
+
+def test_limit_keeps_the_newest_entries(tmp_path):
+    manifest = RunManifest.load(tmp_path / "deck.json", "deck", limit=3)
+    for i in range(6):
+        manifest.start(f"s{i}", "key")
+        manifest.slides[f"s{i}"]["started_at"] = i
+        manifest.save(f"s{i}")
+    manifest.compact()
+    assert sorted(manifest.slides) == ["s3", "s4", "s5"]
+
+
+def test_complete_only_with_same_key_and_unchanged_output(tmp_path):
+    path = output(tmp_path)
+    manifest = RunManifest.load(tmp_path / "deck.json", "deck")
+    manifest.start("a", "key-a")
+    manifest.done("a", path, source="model")
+    assert manifest.slides["a"]["sha256"] == file_sha256(path)
+
+    assert manifest.is_complete("a", "key-a", path)
+    assert not manifest.is_complete("a", "key-b", path)
+    path.write_bytes(b"\x89PNG edited")
+    assert not manifest.is_complete("a", "key-a", path)
+    manifest.rewritten("a", path)
+    assert manifest.is_complete("a", "key-a", path)
+    path.unlink()
+    assert not manifest.is_complete("a", "key-a", path)
@@ -0,0 +1,41 @@
+from slidegen.puml import DEFAULT_PUML_PATH, parse_sequence, slides_from_sequence
+
+HEADER = """@startuml
+title Demo
+participant "Alice" as A
+participant "Bob" as B
+"""
+LOGIN = "== Login ==\nA -> B: hello\nB --> A: ok\n"
+TALK = "== Talk ==\nA -> B: talk\n"
+
+
+def slide_ids(*phases) -> list:
+    return [slide.id for slide in slides_from_sequence(parse_sequence(HEADER + "".join(phases) + "@enduml\n"))]
+
+
+def test_ids_come_from_titles():
+    assert slide_ids(LOGIN, TALK) == ["login", "talk"]
+
+
+def test_inserting_a_phase_keeps_the_other_ids():
+    assert slide_ids(TALK, LOGIN, "== Setup ==\nB -> A: setup\n") == ["talk", "login", "setup"]
+
+
+def test_repeated_title_keeps_the_first_id_bare():
+    before = slide_ids(LOGIN, TALK)
+    after = slide_ids(LOGIN, TALK, "== Login ==\nA -> B: again\n")
+    assert after[:2] == before
+    assert after[2].startswith("login_") and len(after[2]) == len("login_") + 8
+    # The suffix depends on the phase's content, not on its position
+    assert slide_ids(LOGIN, "== Login ==\nA -> B: again\n", TALK)[1] == after[2]
+
+
+def test_identical_phases_get_distinct_ids():
+    ids = slide_ids(LOGIN, LOGIN, LOGIN)
+    assert len(set(ids)) == 3 and ids[0] == "login"
+
+
+def test_protocol_ids_are_unique():
+    sequence = parse_sequence(DEFAULT_PUML_PATH.read_text(encoding="utf-8"))
+    ids = [slide.id for slide in slides_from_sequence(sequence)]
+    assert len(ids) == len(set(ids)) == len(sequence.phases)
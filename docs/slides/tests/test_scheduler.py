@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from slidegen.bench import SimulatedError
+from slidegen.errors import BlockedError, EmptyImageError, is_retryable, is_throttle, retry_after
+from slidegen.retry import RetryPolicy
+from slidegen.scheduler import AIMDScheduler
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_window_grows_additively_on_success():
+    scheduler = AIMDScheduler(initial=2, maximum=16)
+
+    async def succeed(n):
+        for _ in range(n):
+            async with scheduler.slot():
+                pass
+
+    run(succeed(2))
+    assert scheduler.window == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    run(succeed(200))
+    assert scheduler.window == 16
+
+
+def test_throttles_of_one_epoch_shrink_the_window_once():
+    scheduler = AIMDScheduler(initial=8, minimum=1, maximum=16)
+
+    async def burst():
+        slots = [await scheduler.acquire() for _ in range(4)]
+        for slot in slots:
+            slot.throttled()
+            await scheduler.release(slot)
+
+    run(burst())
+    assert scheduler.window == 4
+    run(burst())
+    assert scheduler.window == 2
+
+
+def test_window_never_drops_below_minimum():
+    scheduler = AIMDScheduler(initial=1, minimum=1)
+
+    async def throttle():
+        slot = await scheduler.acquire()
+        slot.throttled()
+        await scheduler.release(slot)
+
+    run(throttle())
+    assert scheduler.window == 1
+
+
+def test_retry_after_pauses_new_slots():
+    scheduler = AIMDScheduler(initial=4)
+
+    async def throttle():
+        slot = await scheduler.acquire()
+        slot.throttled(retry_after=30)
+        await scheduler.release(slot)
+
+    run(throttle())
+    assert 29 < scheduler.paused_for <= 30
+
+
+def test_errors_inside_a_slot_are_not_successes():
+    scheduler = AIMDScheduler(initial=2)
+
+    async def fail():
+        async with scheduler.slot():
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run(fail())
+    assert scheduler.window == 2 and scheduler.in_flight == 0
+
+
+@pytest.mark.parametrize("error, retryable, throttle", [
+    (SimulatedError(429, "RESOURCE_EXHAUSTED"), True, True),
+    (SimulatedError(503, "UNAVAILABLE"), True, True),
+    (SimulatedError(500, "INTERNAL"), True, False),
+    (SimulatedError(408, "TIMEOUT"), True, False),
+    (SimulatedError(400, "INVALID_ARGUMENT"), False, False),
+    (SimulatedError(403, "PERMISSION_DENIED"), False, False),
+    (BlockedError("SAFETY"), False, False),
+    (EmptyImageError("no image"), True, False),
+    (asyncio.TimeoutError(), True, False),
+    (ConnectionResetError(), True, False),
+    (ValueError("bug"), False, False),
+])
+def test_error_classification(error, retryable, throttle):
+    assert is_retryable(error) is retryable
+    assert is_throttle(error) is throttle
+
+
+def test_retry_after_from_header_and_retry_info():
+    assert retry_after(SimulatedError(429, "RESOURCE_EXHAUSTED", retry_after=7)) == 7
+    details = {"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "12s"}]}}
+    assert retry_after(SimpleNamespace(details=details)) == 12
+    assert retry_after(SimulatedError(429, "RESOURCE_EXHAUSTED")) is None
+
+
+def test_backoff_stays_within_bounds():
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    delay = policy.base_delay
+    for _ in range(50):
+        delay = policy.next_delay(delay)
+        assert policy.base_delay <= delay <= policy.max_delay
@@ -0,0 +1,48 @@
+from dataclasses import replace
+
+import pytest
+
+from slidegen.deck import Slide
+from slidegen.decks import get_deck
+from slidegen.selection import parse_shard, select, shard_of
+
+
+def ids(decks) -> set:
+    return {(deck.name, slide.id) for deck in decks for slide in deck.slides}
+
+
+@pytest.fixture
+def decks():
+    return [get_deck("business"), get_deck("protocol")]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5])
+def test_shards_are_disjoint_and_cover_every_slide(decks, count):
+    shards = [ids(select(decks, shard=(i, count))) for i in range(1, count + 1)]
+    assert set().union(*shards) == ids(decks)
+    assert sum(len(shard) for shard in shards) == len(ids(decks))
+
+
+def test_adding_a_slide_moves_no_other_slide(decks):
+    business = decks[0]
+    grown = replace(business, slides=business.slides + [Slide("99_extra", "Extra", "prompt")])
+    for i in (1, 2, 3):
+        before = ids(select([business], shard=(i, 3)))
+        after = ids(select([grown], shard=(i, 3)))
+        assert before == after - {("business", "99_extra")}
+    assert ("business", "99_extra") in ids(select([grown], shard=(shard_of(grown, "99_extra", 3), 3)))
+
+
+def test_only_skip_and_pairs_narrow_each_other(decks):
+    assert ids(select(decks, only=["01_title"])) == {("business", "01_title")}
+    assert ids(select(decks, only=["business:0[1-3]_*"], skip=["02_*"])) == {
+        ("business", "01_title"), ("business", "03_solution")}
+    pairs = {("business", "01_title"), ("business", "07_moat")}
+    assert ids(select(decks, skip=["07_moat"], pairs=pairs)) == {("business", "01_title")}
+    assert select(decks, only=["nothing"]) == []
+
+
+@pytest.mark.parametrize("value", ["0/3", "4/3", "2", "a/b"])
+def test_invalid_shards_are_rejected(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
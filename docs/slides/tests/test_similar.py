@@ -0,0 +1,69 @@
+import pytest
+
+from slidegen.catalog import CATALOG_DIR, deck_from_catalog
+from slidegen.decks import get_deck
+from slidegen.similar import SimilarityIndex, labels, prose
+
+
+def index_of(tmp_path, deck, **kwargs) -> SimilarityIndex:
+    index = SimilarityIndex(tmp_path / "similar.jsonl", **kwargs)
+    for slide in deck.slides:
+        index.add(f"{deck.name}:{slide.id}", deck.model, deck.style_prefix, deck.prompt_separator + slide.prompt,
+                  deck.name, slide.id)
+    return index
+
+
+def best(index, deck, slide_id):
+    slide = deck.slide(slide_id)
+    found = index.matches(deck.model, deck.style_prefix, deck.prompt_separator + slide.prompt)
+    return found[0] if found else None
+
+
+def test_labels_and_prose():
+    prompt = 'Title "omakase.ai" with 「カートに入れて」 and "omakase.ai" again'
+    assert labels(prompt) == ["omakase.ai", "カートに入れて"]
+    assert "omakase" not in prose(prompt)
+
+
+@pytest.mark.parametrize("slide_id", ["01_title", "07_moat"])
+def test_reworded_slide_matches_its_original(tmp_path, slide_id):
+    # business-v2 is drawn by another model
+    index = index_of(tmp_path, get_deck("business"), any_model=True)
+    v2 = get_deck("business-v2")
+    match = best(index, v2, slide_id)
+    assert match is not None and match.slide == slide_id
+
+
+def test_reworded_slide_with_other_labels_does_not_match(tmp_path):
+    # 04_market's v2 rewrite drops the "$9.9B" label: a different image
+    index = index_of(tmp_path, get_deck("business"), any_model=True, threshold=0.0)
+    assert best(index, get_deck("business-v2"), "04_market") is None
+
+
+@pytest.mark.skipif(not CATALOG_DIR.is_dir(), reason="catalog not checked out")
+def test_products_with_other_names_never_match(tmp_path):
+    catalog = deck_from_catalog()
+    index = SimilarityIndex(tmp_path / "similar.jsonl", threshold=0.0)
+    matcha = catalog.slide("matcha_matcha-latte")
+    index.add("matcha", catalog.model, catalog.style_prefix, matcha.prompt, catalog.name, matcha.id)
+    assert best(index, catalog, "hojicha_hojicha-latte") is None
+    assert best(index, catalog, "matcha_matcha-latte").key == "matcha"
+
+
+def test_other_model_only_with_any_model(tmp_path):
+    business = get_deck("business")
+    index = index_of(tmp_path, business)
+    slide = business.slide("01_title")
+    assert index.matches("other-model", business.style_prefix, business.prompt_separator + slide.prompt) == []
+    index.any_model = True
+    assert index.matches("other-model", business.style_prefix, business.prompt_separator + slide.prompt)
+
+
+def test_index_persists_and_compacts(tmp_path):
+    index = SimilarityIndex(tmp_path / "similar.jsonl", max_entries=3)
+    for i in range(10):
+        index.add(f"k{i}", "m", "style", f'slide "{i}"')
+    assert "k9" in index and "k0" not in index
+    reloaded = SimilarityIndex(tmp_path / "similar.jsonl", max_entries=3)
+    assert set(reloaded.entries) <= {f"k{i}" for i in range(10)} and "k9" in reloaded
+    assert reloaded.lines < 2 * 3 + 2
@@ -0,0 +1,98 @@
+import asyncio
+import contextlib
+import io
+from dataclasses import replace
+
+from slidegen.bench import SimulatedBackend, SimulatedError, SimulationConfig, simulated_deck
+from slidegen.engine import SlideEngine
+from slidegen.retry import RetryPolicy
+from slidegen.workqueue import DONE, FAILED, LEASED, QUEUED, WorkQueue, work
+
+
+def queue_with(tmp_path, slides=2, max_attempts=3):
+    deck = simulated_deck(SimulationConfig(slides=slides, latency_ms=1, sigma=0, size_kb=1), tmp_path / "out")
+    queue = WorkQueue(tmp_path / "queue.sqlite3", max_attempts=max_attempts)
+    queue.enqueue([deck])
+    return deck, queue
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    _, queue = queue_with(tmp_path, slides=1)
+    crashed = queue.lease("crashed", seconds=-1)
+    assert crashed.attempts == 1 and queue.counts() == {LEASED: 1}
+
+    job = queue.lease("alive")
+    assert job.id == crashed.id and job.attempts == 2
+    # The crashed worker comes back: its lease is gone, but completion stays idempotent
+    assert not queue.renew(crashed) and queue.fail(crashed, "late") is None
+    assert queue.complete(job) and not queue.complete(crashed)
+    assert queue.counts() == {DONE: 1}
+
+
+def test_expired_lease_without_attempts_left_fails(tmp_path):
+    _, queue = queue_with(tmp_path, slides=1, max_attempts=1)
+    queue.lease("crashed", seconds=-1)
+    assert queue.lease("alive") is None
+    assert queue.counts() == {FAILED: 1}
+
+
+def test_failures_are_requeued_until_attempts_run_out(tmp_path):
+    _, queue = queue_with(tmp_path, slides=1, max_attempts=2)
+    assert queue.fail(queue.lease("w"), "500") == QUEUED
+    assert queue.fail(queue.lease("w"), "500") == FAILED
+    assert queue.lease("w") is None
+
+
+def test_permanent_failures_are_not_requeued(tmp_path):
+    _, queue = queue_with(tmp_path, slides=1)
+    assert queue.fail(queue.lease("w"), "400", retry=False) == FAILED
+
+
+def test_release_does_not_use_an_attempt(tmp_path):
+    _, queue = queue_with(tmp_path, slides=1, max_attempts=1)
+    queue.release(queue.lease("w"))
+    assert queue.lease("w").attempts == 1
+
+
+def test_enqueue_requeues_finished_jobs_only(tmp_path):
+    deck, queue = queue_with(tmp_path)
+    job = queue.lease("w")
+    assert queue.enqueue([deck]) == 0
+    queue.complete(job)
+    assert queue.enqueue([deck]) == 1
+    assert queue.counts() == {QUEUED: 2}
+
+
+def test_catalogs_do_not_share_jobs(tmp_path):
+    deck = simulated_deck(SimulationConfig(slides=1), tmp_path / "out")
+    queue = WorkQueue(tmp_path / "queue.sqlite3")
+    first = replace(deck, name="catalog", metadata={"catalog": "/catalogs/a"})
+    second = replace(deck, name="catalog", metadata={"catalog": "/catalogs/b"})
+    assert queue.enqueue([first, second]) == 2
+    assert {queue.lease("w").source for _ in range(2)} == {"/catalogs/a", "/catalogs/b"}
+
+
+def test_workers_drain_the_queue(tmp_path):
+    config = SimulationConfig(slides=6, latency_ms=1, sigma=0, size_kb=1)
+    deck, queue = queue_with(tmp_path, slides=6)
+    engine = SlideEngine(concurrency=2, backend_factory=lambda d: SimulatedBackend(config),
+                         manifest_dir=tmp_path / "manifests")
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = asyncio.run(work(engine, queue, lambda job: deck, concurrency=2, poll=0.01))
+    assert stats["done"] == 6 and queue.counts() == {DONE: 6}
+
+
+def test_worker_fails_permanent_errors_at_once(tmp_path):
+    class Rejecting(SimulatedBackend):
+        async def generate(self, prompt):
+            self.calls += 1
+            raise SimulatedError(400, "INVALID_ARGUMENT")
+
+    deck, queue = queue_with(tmp_path, slides=1)
+    backend = Rejecting(SimulationConfig())
+    engine = SlideEngine(backend_factory=lambda d: backend, retry=RetryPolicy(base_delay=0.001),
+                         manifest_dir=tmp_path / "manifests")
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = asyncio.run(work(engine, queue, lambda job: deck, poll=0.01))
+    assert stats == {"done": 0, "failed": 1, "requeued": 0, "released": 0}
+    assert backend.calls == 1